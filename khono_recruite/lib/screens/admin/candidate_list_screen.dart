@@ -3,6 +3,8 @@ import 'package:flutter/material.dart';
 import 'package:provider/provider.dart';
 import 'package:google_fonts/google_fonts.dart';
 import '../../services/auth_service.dart';
+import '../../services/paged_list.dart';
+import '../../widgets/load_more_button.dart';
 import '../../utils/api_endpoints.dart';
 import '../../providers/theme_provider.dart';
 
@@ -16,6 +18,10 @@ class CandidateListScreen extends StatefulWidget {
 class _CandidateListScreenState extends State<CandidateListScreen> {
   List<dynamic> candidates = [];
   bool loading = true;
+  bool loadingMore = false;
+  String? nextCursor;
+  int? total;
+  bool totalIsEstimate = false;
 
   // Track hovered card
   int? hoveredIndex;
@@ -26,25 +32,38 @@ class _CandidateListScreenState extends State<CandidateListScreen> {
     fetchCandidates();
   }
 
-  Future<void> fetchCandidates() async {
+  // First page of candidates, or the next one with [more].
+  Future<void> fetchCandidates({bool more = false}) async {
+    if (more && (nextCursor == null || loadingMore)) return;
+    if (more) setState(() => loadingMore = true);
     try {
       final response = await AuthService.authorizedGet(
-        "${ApiEndpoints.adminBase}/candidates/all",
+        PagedList.pageUri("${ApiEndpoints.adminBase}/candidates/all",
+                cursor: more ? nextCursor : null)
+            .toString(),
       );
       if (response.statusCode == 200) {
-        final data = jsonDecode(response.body);
+        final page = PagedList.fromResponse(response, envelope: 'candidates');
         setState(() {
-          candidates = data['candidates'];
+          if (more) {
+            candidates.addAll(page.items);
+          } else {
+            candidates = page.items;
+            total = page.total;
+            totalIsEstimate = page.totalIsEstimate;
+          }
+          nextCursor = page.nextCursor;
           loading = false;
+          loadingMore = false;
         });
       } else {
-        setState(() => loading = false);
+        setState(() => loading = loadingMore = false);
         ScaffoldMessenger.of(context).showSnackBar(
           const SnackBar(content: Text('Failed to load candidates')),
         );
       }
     } catch (e) {
-      setState(() => loading = false);
+      setState(() => loading = loadingMore = false);
       ScaffoldMessenger.of(context)
           .showSnackBar(SnackBar(content: Text('Error: $e')));
     }
@@ -191,7 +210,7 @@ class _CandidateListScreenState extends State<CandidateListScreen> {
                                     ),
                                   ),
                                   Text(
-                                    "${candidates.length} candidates registered",
+                                    "${PagedList.totalLabel(total, totalIsEstimate, candidates.length)} candidates registered",
                                     style: GoogleFonts.inter(
                                       color: themeProvider.isDarkMode
                                           ? Colors.grey.shade400
@@ -244,8 +263,8 @@ class _CandidateListScreenState extends State<CandidateListScreen> {
                                 child: Wrap(
                                   spacing: 20,
                                   runSpacing: 20,
-                                  children:
-                                      candidates.asMap().entries.map((entry) {
+                                  children: [
+                                    ...candidates.asMap().entries.map((entry) {
                                     int index = entry.key;
                                     var c = entry.value;
 
@@ -574,7 +593,17 @@ class _CandidateListScreenState extends State<CandidateListScreen> {
                                         ),
                                       ),
                                     );
-                                  }).toList(),
+                                  }),
+                                    if (nextCursor != null)
+                                      SizedBox(
+                                        width: double.infinity,
+                                        child: LoadMoreButton(
+                                          loading: loadingMore,
+                                          onPressed: () =>
+                                              fetchCandidates(more: true),
+                                        ),
+                                      ),
+                                  ],
                                 ),
                               );
                             },
@@ -3,6 +3,8 @@ import 'package:provider/provider.dart';
 import '../../widgets/custom_button.dart';
 import '../../widgets/custom_textfield.dart';
 import '../../services/admin_service.dart';
+import '../../services/paged_list.dart';
+import '../../widgets/load_more_button.dart';
 import '../../providers/theme_provider.dart';
 
 class JobManagement extends StatefulWidget {
@@ -18,6 +20,10 @@ class _JobManagementState extends State<JobManagement> {
   final AdminService admin = AdminService();
   List<Map<String, dynamic>> jobs = [];
   bool loading = true;
+  bool loadingMore = false;
+  String? nextCursor;
+  int? total;
+  bool totalIsEstimate = false;
 
   @override
   void initState() {
@@ -28,8 +34,11 @@ class _JobManagementState extends State<JobManagement> {
   Future<void> fetchJobs() async {
     setState(() => loading = true);
     try {
-      final data = await admin.listJobs();
-      jobs = List<Map<String, dynamic>>.from(data);
+      final page = await admin.listJobs();
+      jobs = page.items;
+      nextCursor = page.nextCursor;
+      total = page.total;
+      totalIsEstimate = page.totalIsEstimate;
     } catch (e) {
       ScaffoldMessenger.of(context)
           .showSnackBar(SnackBar(content: Text("Error fetching jobs: $e")));
@@ -37,6 +46,20 @@ class _JobManagementState extends State<JobManagement> {
     setState(() => loading = false);
   }
 
+  Future<void> fetchMoreJobs() async {
+    if (nextCursor == null || loadingMore) return;
+    setState(() => loadingMore = true);
+    try {
+      final page = await admin.listJobs(cursor: nextCursor);
+      jobs.addAll(page.items);
+      nextCursor = page.nextCursor;
+    } catch (e) {
+      ScaffoldMessenger.of(context)
+          .showSnackBar(SnackBar(content: Text("Error fetching jobs: $e")));
+    }
+    setState(() => loadingMore = false);
+  }
+
   void openJobForm({Map<String, dynamic>? job}) {
     showDialog(
       context: context,
@@ -87,7 +110,17 @@ class _JobManagementState extends State<JobManagement> {
                           ),
                         ],
                       ),
-                      const SizedBox(height: 20),
+                      const SizedBox(height: 8),
+                      Text(
+                        "${PagedList.totalLabel(total, totalIsEstimate, jobs.length)} jobs",
+                        style: TextStyle(
+                          color: themeProvider.isDarkMode
+                              ? Colors.grey.shade400
+                              : Colors.black54,
+                          fontSize: 14,
+                        ),
+                      ),
+                      const SizedBox(height: 12),
                       Divider(
                           color: themeProvider.isDarkMode
                               ? Colors.grey.shade800
@@ -109,8 +142,15 @@ class _JobManagementState extends State<JobManagement> {
                                 ),
                               )
                             : ListView.builder(
-                                itemCount: jobs.length,
+                                itemCount:
+                                    jobs.length + (nextCursor != null ? 1 : 0),
                                 itemBuilder: (_, index) {
+                                  if (index == jobs.length) {
+                                    return LoadMoreButton(
+                                      loading: loadingMore,
+                                      onPressed: fetchMoreJobs,
+                                    );
+                                  }
                                   final job = jobs[index];
                                   return Card(
                                     color: (themeProvider.isDarkMode
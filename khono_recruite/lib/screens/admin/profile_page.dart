@@ -179,12 +179,22 @@ class _ProfilePageState extends State<ProfilePage>
   Future<void> _loadBackupCodes() async {
     try {
       final result = await AuthService.getBackupCodes();
-      if (result.containsKey('backup_codes')) {
-        setState(() {
-          _backupCodes = List<String>.from(result['backup_codes']);
-          _backupCodesRemaining = _backupCodes.length;
-        });
+      final codes = List<String>.from(result['backup_codes'] ?? []);
+      setState(() {
+        _backupCodesRemaining =
+            result['backup_codes_remaining'] ?? codes.length;
+        if (codes.isNotEmpty) _backupCodes = codes;
+      });
+      if (codes.isNotEmpty) {
         _showBackupCodesDialog();
+      } else {
+        // Codes are stored hashed and only shown once, when generated
+        ScaffoldMessenger.of(context).showSnackBar(
+          SnackBar(
+            content: Text(
+                "$_backupCodesRemaining backup codes remaining. Regenerate to get a new set."),
+          ),
+        );
       }
     } catch (e) {
       ScaffoldMessenger.of(context).showSnackBar(
@@ -200,7 +210,8 @@ class _ProfilePageState extends State<ProfilePage>
       if (result.containsKey('backup_codes')) {
         setState(() {
           _backupCodes = List<String>.from(result['backup_codes']);
-          _backupCodesRemaining = _backupCodes.length;
+          _backupCodesRemaining =
+              result['backup_codes_remaining'] ?? _backupCodes.length;
         });
         _showBackupCodesDialog();
         ScaffoldMessenger.of(context).showSnackBar(
@@ -4,6 +4,8 @@ import 'package:http/http.dart' as http;
 import 'package:google_fonts/google_fonts.dart';
 import 'package:provider/provider.dart';
 import '../../services/auth_service.dart';
+import '../../services/paged_list.dart';
+import '../../widgets/load_more_button.dart';
 import '../../providers/theme_provider.dart';
 
 class UserManagementScreen extends StatefulWidget {
@@ -15,6 +17,10 @@ class UserManagementScreen extends StatefulWidget {
 
 class _UserManagementScreenState extends State<UserManagementScreen> {
   List<Map<String, dynamic>> users = [];
+  String? nextCursor;
+  int? totalUsers;
+  bool totalIsEstimate = false;
+  bool loadingMore = false;
   List<String> roles = ["Admin", "HR", "Recruiter", "Viewer"];
 
   @override
@@ -31,13 +37,17 @@ class _UserManagementScreenState extends State<UserManagementScreen> {
     });
   }
 
-  Future<void> _fetchUsersFromBackend() async {
+  // First page of users, or the next one with [more].
+  Future<void> _fetchUsersFromBackend({bool more = false}) async {
+    if (more && (nextCursor == null || loadingMore)) return;
+    if (more) setState(() => loadingMore = true);
     try {
       final token = await AuthService.getAccessToken();
       if (token == null) return;
 
       final response = await http.get(
-        Uri.parse("http://127.0.0.1:5000/api/admin/users"),
+        PagedList.pageUri("http://127.0.0.1:5000/api/admin/users",
+            cursor: more ? nextCursor : null),
         headers: {
           "Content-Type": "application/json",
           "Authorization": "Bearer $token",
@@ -45,13 +55,22 @@ class _UserManagementScreenState extends State<UserManagementScreen> {
       );
 
       if (response.statusCode == 200) {
-        final data = jsonDecode(response.body);
+        final page = PagedList.fromResponse(response);
         setState(() {
-          users = List<Map<String, dynamic>>.from(data);
+          if (more) {
+            users.addAll(page.items);
+          } else {
+            users = page.items;
+            totalUsers = page.total;
+            totalIsEstimate = page.totalIsEstimate;
+          }
+          nextCursor = page.nextCursor;
         });
       }
     } catch (e) {
       debugPrint("Error fetching users: $e");
+    } finally {
+      if (more) setState(() => loadingMore = false);
     }
   }
 
@@ -1003,7 +1022,7 @@ class _UserManagementScreenState extends State<UserManagementScreen> {
                             ),
                           ),
                           Text(
-                            "${users.length} active users",
+                            "${PagedList.totalLabel(totalUsers, totalIsEstimate, users.length)} active users",
                             style: GoogleFonts.inter(
                               color: themeProvider.isDarkMode
                                   ? Colors.grey.shade400
@@ -1074,8 +1093,15 @@ class _UserManagementScreenState extends State<UserManagementScreen> {
                           ),
                         )
                       : ListView.builder(
-                          itemCount: users.length,
-                          itemBuilder: (ctx, index) => buildUserCard(index),
+                          itemCount:
+                              users.length + (nextCursor != null ? 1 : 0),
+                          itemBuilder: (ctx, index) => index == users.length
+                              ? LoadMoreButton(
+                                  loading: loadingMore,
+                                  onPressed: () =>
+                                      _fetchUsersFromBackend(more: true),
+                                )
+                              : buildUserCard(index),
                         ),
                 ),
               ],
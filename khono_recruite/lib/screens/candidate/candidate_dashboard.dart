@@ -13,6 +13,8 @@ import 'dart:typed_data';
 
 // Import your existing services
 import '../../services/candidate_service.dart';
+import '../../services/paged_list.dart';
+import '../../widgets/load_more_button.dart';
 import 'job_details_page.dart';
 import 'assessments_results_screen.dart';
 import '../../screens/candidate/user_profile_page.dart';
@@ -41,10 +43,16 @@ class _CandidateDashboardState extends State<CandidateDashboard>
   // Your existing data states
   List<Map<String, dynamic>> availableJobs = [];
   bool loadingJobs = true;
+  bool loadingMoreJobs = false;
+  String? jobsCursor;
+  int? totalJobs;
+  bool totalJobsIsEstimate = false;
   List<dynamic> applications = [];
   bool loadingApplications = true;
   List<Map<String, dynamic>> notifications = [];
   bool loadingNotifications = true;
+  String? notificationsCursor;
+  int unreadNotifications = 0;
   Map<String, dynamic>? candidateProfile;
 
   // Your existing filter states
@@ -236,11 +244,14 @@ class _CandidateDashboardState extends State<CandidateDashboard>
 
     _safeSetState(() => loadingJobs = true);
     try {
-      final jobs = await CandidateService.getAvailableJobs(widget.token);
+      final page = await CandidateService.getAvailableJobs(widget.token);
       if (!mounted) return;
 
       _safeSetState(() {
-        availableJobs = List<Map<String, dynamic>>.from(jobs);
+        availableJobs = page.items;
+        jobsCursor = page.nextCursor;
+        totalJobs = page.total;
+        totalJobsIsEstimate = page.totalIsEstimate;
       });
     } catch (e) {
       debugPrint("Error fetching jobs: $e");
@@ -253,6 +264,28 @@ class _CandidateDashboardState extends State<CandidateDashboard>
     }
   }
 
+  Future<void> fetchMoreJobs() async {
+    if (!mounted || jobsCursor == null || loadingMoreJobs) return;
+
+    _safeSetState(() => loadingMoreJobs = true);
+    try {
+      final page = await CandidateService.getAvailableJobs(widget.token,
+          cursor: jobsCursor);
+      if (!mounted) return;
+
+      _safeSetState(() {
+        availableJobs.addAll(page.items);
+        jobsCursor = page.nextCursor;
+      });
+    } catch (e) {
+      debugPrint("Error fetching more jobs: $e");
+    } finally {
+      if (mounted) {
+        _safeSetState(() => loadingMoreJobs = false);
+      }
+    }
+  }
+
   Future<void> fetchApplications() async {
     if (!mounted) return;
 
@@ -280,11 +313,13 @@ class _CandidateDashboardState extends State<CandidateDashboard>
 
     _safeSetState(() => loadingNotifications = true);
     try {
-      final data = await CandidateService.getNotifications(widget.token);
+      final page = await CandidateService.getNotifications(widget.token);
       if (!mounted) return;
 
       _safeSetState(() {
-        notifications = data;
+        notifications = page.items;
+        notificationsCursor = page.nextCursor;
+        unreadNotifications = page.unreadCount ?? 0;
       });
     } catch (e) {
       debugPrint("Error fetching notifications: $e");
@@ -297,6 +332,23 @@ class _CandidateDashboardState extends State<CandidateDashboard>
     }
   }
 
+  Future<void> fetchMoreNotifications() async {
+    if (!mounted || notificationsCursor == null) return;
+
+    try {
+      final page = await CandidateService.getNotifications(widget.token,
+          cursor: notificationsCursor);
+      if (!mounted) return;
+
+      _safeSetState(() {
+        notifications.addAll(page.items);
+        notificationsCursor = page.nextCursor;
+      });
+    } catch (e) {
+      debugPrint("Error fetching more notifications: $e");
+    }
+  }
+
   Future<void> fetchCandidateProfile() async {
     if (!mounted) return;
 
@@ -574,16 +626,27 @@ class _CandidateDashboardState extends State<CandidateDashboard>
                 ))
             .toList(),
         SizedBox(height: 32),
-        Center(
-          child: ElevatedButton(
-            onPressed: () {
-              // Navigate to full jobs list
-              _safeSetState(() => _currentTab = 1);
-            },
-            style: ElevatedButton.styleFrom(backgroundColor: primaryColor),
-            child: Text('Browse More Jobs'),
+        if (_currentTab == 0)
+          Center(
+            child: ElevatedButton(
+              onPressed: () {
+                // Navigate to full jobs list
+                _safeSetState(() => _currentTab = 1);
+              },
+              style: ElevatedButton.styleFrom(backgroundColor: primaryColor),
+              child: Text('Browse More Jobs'),
+            ),
+          )
+        else ...[
+          Center(
+            child: Text(
+              'Showing ${availableJobs.length} of ${PagedList.totalLabel(totalJobs, totalJobsIsEstimate, availableJobs.length)} jobs',
+              style: TextStyle(color: Colors.black54),
+            ),
           ),
-        ),
+          if (jobsCursor != null)
+            LoadMoreButton(loading: loadingMoreJobs, onPressed: fetchMoreJobs),
+        ],
       ],
     );
   }
@@ -912,7 +975,7 @@ class _CandidateDashboardState extends State<CandidateDashboard>
                           }
                         },
                       ),
-                      if (notifications.isNotEmpty)
+                      if (unreadNotifications > 0)
                         Positioned(
                           right: 8,
                           top: 8,
@@ -925,7 +988,7 @@ class _CandidateDashboardState extends State<CandidateDashboard>
                             constraints:
                                 BoxConstraints(minWidth: 16, minHeight: 16),
                             child: Text(
-                              notifications.length.toString(),
+                              unreadNotifications.toString(),
                               style:
                                   TextStyle(color: Colors.white, fontSize: 10),
                               textAlign: TextAlign.center,
@@ -1619,31 +1682,46 @@ class _CandidateDashboardState extends State<CandidateDashboard>
   }
 
   void _showNotificationsDialog() {
+    bool loadingMore = false;
     showDialog(
       context: context,
-      builder: (context) => AlertDialog(
-        title: Text('Notifications'),
-        content: Container(
-          width: double.maxFinite,
-          child: ListView.builder(
-            shrinkWrap: true,
-            itemCount: notifications.length,
-            itemBuilder: (context, index) {
-              final notif = notifications[index];
-              return ListTile(
-                leading: Icon(Icons.notifications, color: primaryColor),
-                title: Text(notif['title'] ?? 'Notification'),
-                subtitle: Text(notif['message'] ?? ''),
-              );
-            },
+      // StatefulBuilder so "Load more" can redraw the open dialog
+      builder: (context) => StatefulBuilder(
+        builder: (context, setDialogState) => AlertDialog(
+          title: Text('Notifications'),
+          content: Container(
+            width: double.maxFinite,
+            child: ListView.builder(
+              shrinkWrap: true,
+              itemCount:
+                  notifications.length + (notificationsCursor != null ? 1 : 0),
+              itemBuilder: (context, index) {
+                if (index == notifications.length) {
+                  return LoadMoreButton(
+                    loading: loadingMore,
+                    onPressed: () async {
+                      setDialogState(() => loadingMore = true);
+                      await fetchMoreNotifications();
+                      setDialogState(() => loadingMore = false);
+                    },
+                  );
+                }
+                final notif = notifications[index];
+                return ListTile(
+                  leading: Icon(Icons.notifications, color: primaryColor),
+                  title: Text(notif['title'] ?? 'Notification'),
+                  subtitle: Text(notif['message'] ?? ''),
+                );
+              },
+            ),
           ),
+          actions: [
+            TextButton(
+              onPressed: () => Navigator.of(context).pop(),
+              child: Text('Close'),
+            ),
+          ],
         ),
-        actions: [
-          TextButton(
-            onPressed: () => Navigator.of(context).pop(),
-            child: Text('Close'),
-          ),
-        ],
       ),
     );
   }
@@ -3,6 +3,8 @@ import 'package:provider/provider.dart';
 import 'package:percent_indicator/percent_indicator.dart';
 import 'package:google_fonts/google_fonts.dart';
 import '../../services/admin_service.dart';
+import '../../services/paged_list.dart';
+import '../../widgets/load_more_button.dart';
 import '../../providers/theme_provider.dart';
 
 class CVReviewsScreen extends StatefulWidget {
@@ -16,6 +18,10 @@ class _CVReviewsScreenState extends State<CVReviewsScreen> {
   final AdminService admin = AdminService();
   List<Map<String, dynamic>> cvReviews = [];
   bool loading = true;
+  bool loadingMore = false;
+  String? nextCursor;
+  int? total;
+  bool totalIsEstimate = false;
 
   @override
   void initState() {
@@ -26,9 +32,12 @@ class _CVReviewsScreenState extends State<CVReviewsScreen> {
   Future<void> fetchCVReviews() async {
     setState(() => loading = true);
     try {
-      final data = await admin.listCVReviews();
+      final page = await admin.listCVReviews();
       setState(() {
-        cvReviews = List<Map<String, dynamic>>.from(data);
+        cvReviews = page.items;
+        nextCursor = page.nextCursor;
+        total = page.total;
+        totalIsEstimate = page.totalIsEstimate;
       });
     } catch (e) {
       debugPrint("Error fetching CV reviews: $e");
@@ -37,6 +46,22 @@ class _CVReviewsScreenState extends State<CVReviewsScreen> {
     }
   }
 
+  Future<void> fetchMoreCVReviews() async {
+    if (nextCursor == null || loadingMore) return;
+    setState(() => loadingMore = true);
+    try {
+      final page = await admin.listCVReviews(cursor: nextCursor);
+      setState(() {
+        cvReviews.addAll(page.items);
+        nextCursor = page.nextCursor;
+      });
+    } catch (e) {
+      debugPrint("Error fetching CV reviews: $e");
+    } finally {
+      setState(() => loadingMore = false);
+    }
+  }
+
   Color getScoreColor(double score) {
     if (score >= 70) return Colors.green;
     if (score >= 50) return Colors.orange;
@@ -198,7 +223,7 @@ class _CVReviewsScreenState extends State<CVReviewsScreen> {
                                         ),
                                       ),
                                       Text(
-                                        "${cvReviews.length} candidates reviewed",
+                                        "${PagedList.totalLabel(total, totalIsEstimate, cvReviews.length)} candidates reviewed",
                                         style: GoogleFonts.inter(
                                           color: themeProvider.isDarkMode
                                               ? Colors.grey.shade400
@@ -634,6 +659,11 @@ class _CVReviewsScreenState extends State<CVReviewsScreen> {
                                 },
                               ),
                             ),
+                            if (nextCursor != null)
+                              LoadMoreButton(
+                                loading: loadingMore,
+                                onPressed: fetchMoreCVReviews,
+                              ),
                           ],
                         ),
                 ),
@@ -1,10 +1,8 @@
-import 'dart:convert';
 import 'package:flutter/material.dart';
 import 'package:provider/provider.dart';
 import '../../services/admin_service.dart';
 import '../../services/auth_service.dart';
-import 'package:http/http.dart' as http;
-import '../../utils/api_endpoints.dart';
+import '../../widgets/load_more_button.dart';
 import '../../providers/theme_provider.dart';
 
 class NotificationsScreen extends StatefulWidget {
@@ -18,7 +16,10 @@ class _NotificationsScreenState extends State<NotificationsScreen> {
   final AdminService admin = AdminService();
   List<Map<String, dynamic>> notifications = [];
   bool loading = true;
+  bool loadingMore = false;
   String? errorMessage;
+  String? nextCursor;
+  int? unreadCount;
 
   @override
   void initState() {
@@ -34,8 +35,12 @@ class _NotificationsScreenState extends State<NotificationsScreen> {
 
     try {
       final userId = await AuthService.getUserId();
-      final data = await getNotifications(userId);
-      setState(() => notifications = List<Map<String, dynamic>>.from(data));
+      final page = await admin.getNotifications(userId);
+      setState(() {
+        notifications = page.items;
+        nextCursor = page.nextCursor;
+        unreadCount = page.unreadCount;
+      });
     } catch (e) {
       debugPrint("Error fetching notifications: $e");
       setState(() => errorMessage = "Failed to load notifications");
@@ -44,44 +49,21 @@ class _NotificationsScreenState extends State<NotificationsScreen> {
     }
   }
 
-  Future<List<Map<String, dynamic>>> getNotifications(int userId) async {
-    final token = await AuthService.getAccessToken();
-    final res = await http.get(
-      Uri.parse("${ApiEndpoints.getNotifications}/$userId"),
-      headers: {
-        'Content-Type': 'application/json',
-        'Authorization': 'Bearer $token',
-      },
-    );
-
-    if (res.statusCode == 200) {
-      final body = jsonDecode(res.body);
-
-      if (body is List) {
-        return body.map((e) => Map<String, dynamic>.from(e)).toList();
-      }
-
-      if (body is Map && body.containsKey('notifications')) {
-        final list = body['notifications'];
-        if (list is List) {
-          return list.map((e) => Map<String, dynamic>.from(e)).toList();
-        }
-      }
-
-      if (body is Map && body.containsKey('data')) {
-        final list = body['data'];
-        if (list is List) {
-          return list.map((e) => Map<String, dynamic>.from(e)).toList();
-        }
-      }
-
-      if (body is Map<String, dynamic>) {
-        return [body];
-      }
+  Future<void> fetchMoreNotifications() async {
+    if (nextCursor == null || loadingMore) return;
+    setState(() => loadingMore = true);
 
-      throw Exception("Unexpected notifications format: ${body.runtimeType}");
-    } else {
-      throw Exception("Failed to load notifications: ${res.body}");
+    try {
+      final userId = await AuthService.getUserId();
+      final page = await admin.getNotifications(userId, cursor: nextCursor);
+      setState(() {
+        notifications.addAll(page.items);
+        nextCursor = page.nextCursor;
+      });
+    } catch (e) {
+      debugPrint("Error fetching notifications: $e");
+    } finally {
+      setState(() => loadingMore = false);
     }
   }
 
@@ -102,7 +84,9 @@ class _NotificationsScreenState extends State<NotificationsScreen> {
           backgroundColor: Colors.transparent,
           appBar: AppBar(
             title: Text(
-              "Notifications",
+              unreadCount != null && unreadCount! > 0
+                  ? "Notifications ($unreadCount unread)"
+                  : "Notifications",
               style: TextStyle(
                 color: themeProvider.isDarkMode ? Colors.white : Colors.black,
               ),
@@ -150,8 +134,15 @@ class _NotificationsScreenState extends State<NotificationsScreen> {
                           onRefresh: fetchNotifications,
                           child: ListView.builder(
                             padding: const EdgeInsets.all(16),
-                            itemCount: notifications.length,
+                            itemCount: notifications.length +
+                                (nextCursor != null ? 1 : 0),
                             itemBuilder: (_, index) {
+                              if (index == notifications.length) {
+                                return LoadMoreButton(
+                                  loading: loadingMore,
+                                  onPressed: fetchMoreNotifications,
+                                );
+                              }
                               final n = notifications[index];
                               final createdAt = n['created_at'] != null
                                   ? DateTime.parse(n['created_at'])
@@ -2,6 +2,8 @@ import 'package:flutter/material.dart';
 import 'dart:convert';
 import 'package:http/http.dart' as http;
 import '../../services/auth_service.dart';
+import '../../services/paged_list.dart';
+import '../../widgets/load_more_button.dart';
 
 class UserManagementScreen extends StatefulWidget {
   const UserManagementScreen({Key? key}) : super(key: key);
@@ -12,6 +14,10 @@ class UserManagementScreen extends StatefulWidget {
 
 class _UserManagementScreenState extends State<UserManagementScreen> {
   List<Map<String, dynamic>> users = [];
+  String? nextCursor;
+  int? totalUsers;
+  bool totalIsEstimate = false;
+  bool loadingMore = false;
   List<String> roles = ["Admin", "HR", "Recruiter", "Viewer"];
 
   @override
@@ -28,13 +34,17 @@ class _UserManagementScreenState extends State<UserManagementScreen> {
     });
   }
 
-  Future<void> _fetchUsersFromBackend() async {
+  // First page of users, or the next one with [more].
+  Future<void> _fetchUsersFromBackend({bool more = false}) async {
+    if (more && (nextCursor == null || loadingMore)) return;
+    if (more) setState(() => loadingMore = true);
     try {
       final token = await AuthService.getAccessToken();
       if (token == null) return;
 
       final response = await http.get(
-        Uri.parse("http://127.0.0.1:5000/api/admin/users"),
+        PagedList.pageUri("http://127.0.0.1:5000/api/admin/users",
+            cursor: more ? nextCursor : null),
         headers: {
           "Content-Type": "application/json",
           "Authorization": "Bearer $token",
@@ -42,13 +52,22 @@ class _UserManagementScreenState extends State<UserManagementScreen> {
       );
 
       if (response.statusCode == 200) {
-        final data = jsonDecode(response.body);
+        final page = PagedList.fromResponse(response);
         setState(() {
-          users = List<Map<String, dynamic>>.from(data);
+          if (more) {
+            users.addAll(page.items);
+          } else {
+            users = page.items;
+            totalUsers = page.total;
+            totalIsEstimate = page.totalIsEstimate;
+          }
+          nextCursor = page.nextCursor;
         });
       }
     } catch (e) {
       debugPrint("Error fetching users: $e");
+    } finally {
+      if (more) setState(() => loadingMore = false);
     }
   }
 
@@ -372,8 +391,9 @@ class _UserManagementScreenState extends State<UserManagementScreen> {
     return Scaffold(
       backgroundColor: Colors.white,
       appBar: AppBar(
-        title: const Text("User Management",
-            style: TextStyle(color: Colors.black)),
+        title: Text(
+            "User Management (${PagedList.totalLabel(totalUsers, totalIsEstimate, users.length)})",
+            style: const TextStyle(color: Colors.black)),
         backgroundColor: Colors.white,
         elevation: 1,
         iconTheme: const IconThemeData(color: Colors.black),
@@ -389,9 +409,14 @@ class _UserManagementScreenState extends State<UserManagementScreen> {
       body: Padding(
         padding: const EdgeInsets.all(16),
         child: ListView.separated(
-          itemCount: users.length,
+          itemCount: users.length + (nextCursor != null ? 1 : 0),
           separatorBuilder: (_, __) => const SizedBox(height: 12),
-          itemBuilder: (ctx, index) => buildUserCard(index),
+          itemBuilder: (ctx, index) => index == users.length
+              ? LoadMoreButton(
+                  loading: loadingMore,
+                  onPressed: () => _fetchUsersFromBackend(more: true),
+                )
+              : buildUserCard(index),
         ),
       ),
     );
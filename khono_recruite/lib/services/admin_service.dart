@@ -2,18 +2,20 @@ import 'dart:convert';
 import 'package:http/http.dart' as http;
 import '../utils/api_endpoints.dart';
 import 'auth_service.dart';
+import 'paged_list.dart';
 
 class AdminService {
   final Map<String, String> headers = {'Content-Type': 'application/json'};
 
   // ---------- JOBS ----------
-  Future<List<dynamic>> listJobs() async {
+  // One page of jobs; pass the previous page's nextCursor for the next one.
+  Future<PagedList> listJobs({String? cursor}) async {
     final token = await AuthService.getAccessToken();
     final res = await http.get(
-      Uri.parse(ApiEndpoints.adminJobs),
+      PagedList.pageUri(ApiEndpoints.adminJobs, cursor: cursor),
       headers: {...headers, 'Authorization': 'Bearer $token'},
     );
-    if (res.statusCode == 200) return json.decode(res.body);
+    if (res.statusCode == 200) return PagedList.fromResponse(res);
     throw Exception('Failed to load jobs: ${res.body}');
   }
 
@@ -51,13 +53,13 @@ class AdminService {
   }
 
   // ---------- CANDIDATES ----------
-  Future<List<dynamic>> listCandidates() async {
+  Future<PagedList> listCandidates({String? cursor}) async {
     final token = await AuthService.getAccessToken();
     final res = await http.get(
-      Uri.parse('${ApiEndpoints.adminBase}/candidates'),
+      PagedList.pageUri('${ApiEndpoints.adminBase}/candidates', cursor: cursor),
       headers: {...headers, 'Authorization': 'Bearer $token'},
     );
-    if (res.statusCode == 200) return json.decode(res.body);
+    if (res.statusCode == 200) return PagedList.fromResponse(res);
     throw Exception('Failed to fetch candidates: ${res.body}');
   }
 
@@ -170,7 +172,9 @@ class AdminService {
   }
 
   // ---------- NOTIFICATIONS ----------
-  Future<List<Map<String, dynamic>>> getNotifications(int userId) async {
+  // One page of a user's inbox, newest first; pass the previous page's
+  // nextCursor for the next one. unreadCount covers the whole inbox.
+  Future<PagedList> getNotifications(int userId, {String? cursor}) async {
     // Get the saved access token
     final token = await AuthService.getAccessToken();
     if (token == null) {
@@ -185,34 +189,30 @@ class AdminService {
 
     // Make GET request
     final res = await http.get(
-      Uri.parse("${ApiEndpoints.adminBase}/notifications/$userId"),
+      PagedList.pageUri("${ApiEndpoints.adminBase}/notifications/$userId",
+          cursor: cursor),
       headers: requestHeaders,
     );
 
     if (res.statusCode == 200) {
-      final Map<String, dynamic> data = jsonDecode(res.body);
-
-      // Extract the list from 'notifications' key
-      final List<dynamic> notificationsList = data['notifications'] ?? [];
-
-      return notificationsList
-          .map((e) => Map<String, dynamic>.from(e))
-          .toList();
+      return PagedList.fromResponse(res, envelope: 'notifications');
     } else {
       throw Exception('Failed to fetch notifications: ${res.body}');
     }
   }
 
   // ---------- CV REVIEWS ----------
-  Future<List<Map<String, dynamic>>> listCVReviews() async {
+  // One page of the review queue, newest first; pass the previous page's
+  // nextCursor for the next one.
+  Future<PagedList> listCVReviews({String? cursor}) async {
     final token = await AuthService.getAccessToken();
     final res = await http.get(
-      Uri.parse('${ApiEndpoints.adminBase}/cv-reviews'),
+      PagedList.pageUri('${ApiEndpoints.adminBase}/cv-reviews', cursor: cursor),
       headers: {...headers, 'Authorization': 'Bearer $token'},
     );
 
     if (res.statusCode == 200) {
-      return List<Map<String, dynamic>>.from(json.decode(res.body));
+      return PagedList.fromResponse(res);
     }
     throw Exception('Failed to fetch CV reviews: ${res.body}');
   }
@@ -1,6 +1,7 @@
 import 'dart:convert';
 import 'package:http/http.dart' as http;
 import '../utils/api_endpoints.dart';
+import 'paged_list.dart';
 
 class CandidateService {
   // ---------- SUBMIT ENROLLMENT ----------
@@ -18,10 +19,11 @@ class CandidateService {
   }
 
   // ----------------- GET AVAILABLE JOBS -----------------
-  static Future<List<Map<String, dynamic>>> getAvailableJobs(
-      String token) async {
+  // One page of jobs; pass the previous page's nextCursor for the next one.
+  static Future<PagedList> getAvailableJobs(String token,
+      {String? cursor}) async {
     final response = await http.get(
-      Uri.parse("http://127.0.0.1:5000/api/candidate/jobs"),
+      PagedList.pageUri(ApiEndpoints.getAvailableJobs, cursor: cursor),
       headers: {
         'Content-Type': 'application/json',
         'Authorization': 'Bearer $token',
@@ -29,11 +31,7 @@ class CandidateService {
     );
 
     if (response.statusCode == 200) {
-      final List<dynamic> data = jsonDecode(response.body);
-      // Cast each item to Map<String, dynamic>
-      return data
-          .map<Map<String, dynamic>>((item) => Map<String, dynamic>.from(item))
-          .toList();
+      return PagedList.fromResponse(response);
     } else {
       throw Exception('Failed to fetch jobs: ${response.statusCode}');
     }
@@ -84,10 +82,12 @@ class CandidateService {
   }
 
   // ---------- GET NOTIFICATIONS ----------
-  static Future<List<Map<String, dynamic>>> getNotifications(
-      String token) async {
+  // One page of the inbox, newest first; unreadCount covers the whole inbox.
+  static Future<PagedList> getNotifications(String token,
+      {String? cursor}) async {
     final response = await http.get(
-      Uri.parse("${ApiEndpoints.candidateBase}/notifications"),
+      PagedList.pageUri("${ApiEndpoints.candidateBase}/notifications",
+          cursor: cursor),
       headers: {
         'Content-Type': 'application/json',
         'Authorization': 'Bearer $token',
@@ -95,10 +95,7 @@ class CandidateService {
     );
 
     if (response.statusCode == 200) {
-      final List<dynamic> data = jsonDecode(response.body);
-      return data
-          .map<Map<String, dynamic>>((item) => Map<String, dynamic>.from(item))
-          .toList();
+      return PagedList.fromResponse(response);
     } else {
       throw Exception('Failed to fetch notifications: ${response.statusCode}');
     }
@@ -0,0 +1,64 @@
+import 'dart:convert';
+import 'package:http/http.dart' as http;
+
+/// One page of a cursor-paginated list endpoint.
+///
+/// Plain-list endpoints return the rows as the body and send paging info in
+/// the X-Next-Cursor / X-Total-Count headers; enveloped ones return
+/// `{<envelope>: [...], "total", "total_is_estimate", "next_cursor"}`.
+/// Notification inboxes also report their unread count (X-Unread-Count
+/// header or `unread_count` in the body).
+class PagedList {
+  final List<Map<String, dynamic>> items;
+  final String? nextCursor;
+  final int? total;
+  final bool totalIsEstimate;
+  final int? unreadCount;
+
+  const PagedList(
+    this.items, {
+    this.nextCursor,
+    this.total,
+    this.totalIsEstimate = false,
+    this.unreadCount,
+  });
+
+  bool get hasMore => nextCursor != null;
+
+  factory PagedList.fromResponse(http.Response res, {String? envelope}) {
+    final body = jsonDecode(res.body);
+    if (envelope != null) {
+      return PagedList(
+        List<Map<String, dynamic>>.from(body[envelope] ?? []),
+        nextCursor: body['next_cursor'],
+        total: body['total'],
+        totalIsEstimate: body['total_is_estimate'] == true,
+        unreadCount: body['unread_count'],
+      );
+    }
+    final total = res.headers['x-total-count'];
+    final unread = res.headers['x-unread-count'];
+    return PagedList(
+      List<Map<String, dynamic>>.from(body),
+      nextCursor: res.headers['x-next-cursor'],
+      total: total != null ? int.tryParse(total) : null,
+      totalIsEstimate: res.headers['x-total-count-estimated'] == 'true',
+      unreadCount: unread != null ? int.tryParse(unread) : null,
+    );
+  }
+
+  /// [url] with the cursor of the page to fetch (if any) in its query string.
+  static Uri pageUri(String url, {String? cursor}) {
+    final uri = Uri.parse(url);
+    if (cursor == null) return uri;
+    return uri.replace(
+        queryParameters: {...uri.queryParameters, 'cursor': cursor});
+  }
+
+  /// Total for headings, e.g. "1234" or "~1234" when the server estimated it.
+  /// Falls back to [loaded] when the endpoint didn't send a total.
+  static String totalLabel(int? total, bool estimated, int loaded) {
+    if (total == null) return '$loaded';
+    return estimated ? '~$total' : '$total';
+  }
+}
@@ -0,0 +1,33 @@
+import 'package:flutter/material.dart';
+
+/// Footer for paged lists: fetches the next page, or shows a spinner while
+/// one is loading.
+class LoadMoreButton extends StatelessWidget {
+  final bool loading;
+  final VoidCallback onPressed;
+
+  const LoadMoreButton({
+    super.key,
+    required this.loading,
+    required this.onPressed,
+  });
+
+  @override
+  Widget build(BuildContext context) {
+    return Padding(
+      padding: const EdgeInsets.symmetric(vertical: 16),
+      child: Center(
+        child: loading
+            ? const CircularProgressIndicator(color: Colors.redAccent)
+            : TextButton.icon(
+                onPressed: onPressed,
+                icon: const Icon(Icons.expand_more, color: Colors.redAccent),
+                label: const Text(
+                  "Load more",
+                  style: TextStyle(color: Colors.redAccent),
+                ),
+              ),
+      ),
+    );
+  }
+}
@@ -1,7 +1,21 @@
-from flask import Flask
-from .extensions import db, jwt, mail, cloudinary_client, mongo_client, migrate, cors, bcrypt, oauth, limiter
+from flask import Flask, jsonify
+from .extensions import db, jwt, mail, cloudinary_client, mongo_client, migrate, cors, bcrypt, oauth, limiter, socketio
 from .models import *
+from .services.audit_writer import audit_writer
+from .services.audit_policy import audit_policy
+from .services.audit_archive import audit_cli
+from .services.notification_service import notification_archiver, notifications_cli
+from .services.mail_dispatcher import mail_dispatcher, mail_cli
+from .services.template_registry import email_templates
+from .services.password_hasher import password_hasher
+from .services.user_repository import users_cli
+from .services.verification_store import drain_verification_codes_command
+from .services.backup_codes import migrate_backup_codes_command
+from .services.oidc_metadata import oidc_metadata, sso_cli
+from .utils.query_budget import check_query_budgets_command
+from .cli.benchmarks import bench_cli
 from .routes import auth, admin_routes, candidate_routes, ai_routes, mfa_routes, sso_routes, analytics_routes  # import sso_routes
+from .routes import socket_events  # registers Socket.IO handlers
 
 def create_app():
     app = Flask(__name__)
@@ -11,16 +25,30 @@ def create_app():
     db.init_app(app)
     jwt.init_app(app)
     mail.init_app(app)
+    mail_dispatcher.init_app(app)
+    email_templates.init_app(app)  # compiles and validates email_templates/*.html
     oauth.init_app(app)  # important for OAuth providers
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
+    oidc_metadata.init_app(app)  # before the OAuth clients are registered
     cloudinary_client.init_app(app)
     migrate.init_app(app, db)
     limiter.init_app(app)
+    socketio.init_app(
+        app,
+        message_queue=app.config.get("SOCKETIO_MESSAGE_QUEUE"),
+        cors_allowed_origins="*"
+    )
+    audit_writer.init_app(app)
+    audit_policy.init_app(app)
+    notification_archiver.init_app(app)  # archives read notifications in the background
     cors.init_app(
         app,
         origins=["*"],  # Allow all origins for development
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
+        # Paging info of plain-list endpoints (utils/listing.py, notifications)
+        expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated", "X-Unread-Count"],
         supports_credentials=True
     )
 
@@ -36,4 +64,21 @@ def create_app():
     sso_routes.register_sso_provider(app)      # initialize Auth0 / SSO provider
     app.register_blueprint(sso_routes.sso_bp)  # SSO routes
 
+    # ---------------- Error Handlers ----------------
+    @app.errorhandler(429)
+    def rate_limit_exceeded(e):
+        # X-RateLimit-* and Retry-After headers are added by the limiter
+        return jsonify({"error": "Too many requests", "limit": str(e.description)}), 429
+
+    # ---------------- CLI Commands ----------------
+    app.cli.add_command(audit_cli)  # flask audit archive
+    app.cli.add_command(notifications_cli)  # flask notifications archive
+    app.cli.add_command(mail_cli)  # flask mail retry / flask mail sink
+    users_cli.add_command(drain_verification_codes_command)  # flask users drain-verification-codes
+    users_cli.add_command(migrate_backup_codes_command)  # flask users migrate-backup-codes
+    app.cli.add_command(users_cli)  # flask users ensure-indexes
+    app.cli.add_command(sso_cli)  # flask sso refresh-metadata / flask sso stub-idp
+    app.cli.add_command(check_query_budgets_command)  # flask check-query-budgets
+    app.cli.add_command(bench_cli)  # flask bench fanout / ...
+
     return app
@@ -0,0 +1,415 @@
+# cli/benchmarks.py
+"""
+Load tests and micro-benchmarks: `flask bench <name>`.
+
+Kept out of the service modules so nothing here is imported on the request
+path beyond registering the group; heavy or optional dependencies are
+imported inside the commands. Some commands create (and clean up) synthetic
+rows, so run them against a staging database, not production.
+"""
+import threading
+import time
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+bench_cli = click.Group("bench", help="Load tests and micro-benchmarks (run against staging).")
+
+
+# ------------------- Timing helpers -------------------
+def time_calls(fn, iterations):
+    """Seconds taken by `iterations` sequential calls of fn()."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return time.perf_counter() - start
+
+
+def run_concurrently(fn, jobs, concurrency, app=None):
+    """
+    Call fn(job) for every job from `concurrency` threads (each inside an app
+    context when `app` is given, with the session removed after every job).
+    Returns (elapsed seconds, per-job latencies in ms, error messages).
+    """
+    from app.extensions import db
+
+    jobs = iter(jobs)
+    lock = threading.Lock()
+    timings, errors = [], []
+
+    def work():
+        while True:
+            with lock:
+                job = next(jobs, None)
+            if job is None:
+                return
+            start = time.perf_counter()
+            try:
+                fn(job)
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    timings.append(elapsed)
+            except Exception as e:
+                with lock:
+                    errors.append(f"{type(e).__name__}: {e}")
+            finally:
+                if app is not None:
+                    db.session.remove()
+
+    def worker():
+        if app is None:
+            return work()
+        with app.app_context():
+            work()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - started, timings, errors
+
+
+def percentiles(timings_ms):
+    """Latency summary (p50 / p95 / p99 / max) of a list of ms timings."""
+    if not timings_ms:
+        return "no samples"
+    timings = sorted(timings_ms)
+    pct = lambda p: timings[min(len(timings) - 1, int(len(timings) * p))]
+    return f"p50={pct(0.50):.1f}ms p95={pct(0.95):.1f}ms p99={pct(0.99):.1f}ms max={timings[-1]:.1f}ms"
+
+
+# ------------------- Notifications -------------------
+@bench_cli.command("fanout")
+@click.option("--clients", default="10,100,1000", show_default=True, help="Comma-separated connected-client counts.")
+@click.option("--roles", type=int, default=4, show_default=True, help="Role rooms the clients are spread over.")
+@click.option("--emits", type=int, default=200, show_default=True, help="Emits timed per room type.")
+@with_appcontext
+def bench_fanout_command(clients, roles, emits):
+    """
+    Emit latency as connected Socket.IO clients grow. Connects N in-process
+    test clients, each authenticated as its own user and spread over `roles`
+    role rooms, then times emits to one user room, to one role room and (the
+    old behaviour) to every client. Emits use a bench-only event name, so real
+    clients sharing the message queue ignore them.
+    """
+    from flask_jwt_extended import create_access_token
+    from app.extensions import socketio
+    from app.services.notification_service import user_room, role_room
+
+    app = current_app._get_current_object()
+    payload = {"id": 0, "message": "bench", "is_read": False, "created_at": datetime.utcnow().isoformat()}
+
+    def per_emit_ms(room_for):
+        rooms = iter(range(emits))
+        seconds = time_calls(lambda: socketio.emit("bench_fanout", payload, to=room_for(next(rooms))), emits)
+        return seconds / emits * 1000
+
+    click.echo(f"{'clients':>8} {'user room':>12} {'role room':>12} {'broadcast':>12}  (ms/emit)")
+    for n in [int(c) for c in clients.split(",") if c.strip()]:
+        connected = []
+        for i in range(n):
+            token = create_access_token(identity=str(i + 1), additional_claims={"role": f"bench{i % roles}"})
+            connected.append(socketio.test_client(app, auth={"token": token}))
+        rejected = sum(1 for c in connected if not c.is_connected())
+        if rejected:
+            raise click.ClickException(f"{rejected} of {n} test clients were rejected on connect")
+
+        try:
+            user_ms = per_emit_ms(lambda k: user_room(k % n + 1))
+            role_ms = per_emit_ms(lambda k: role_room(f"bench{k % roles}"))
+            broadcast_ms = per_emit_ms(lambda k: None)
+        finally:
+            for c in connected:
+                c.disconnect()
+        click.echo(f"{n:>8} {user_ms:12.3f} {role_ms:12.3f} {broadcast_ms:12.3f}")
+
+
+# ------------------- Mail -------------------
+@bench_cli.command("templates")
+@click.option("--count", type=int, default=10000, show_default=True)
+@with_appcontext
+def bench_templates_command(count):
+    """Time rendering `count` personalised application status emails."""
+    from flask import render_template
+    from app.services.template_registry import email_templates
+
+    name = "email_templates/application_status_update.html"
+    shared = {"status": "approved", "position_title": "Software Engineer"}
+    names = iter([f"Candidate {i}" for i in range(count)] * 3)
+
+    timings = {
+        "render_template": time_calls(
+            lambda: render_template(name, candidate_name=next(names), **shared), count),
+        "precompiled": time_calls(
+            lambda: email_templates.render(name, candidate_name=next(names), **shared), count),
+        "precompiled + fragment cache": time_calls(
+            lambda: email_templates.render_personalised(name, shared, {"candidate_name": next(names)}), count),
+    }
+    for label, seconds in timings.items():
+        click.echo(f"{label:<30} {seconds:8.3f}s  ({count / seconds:,.0f} emails/s)")
+
+
+# ------------------- Auth -------------------
+@bench_cli.command("role-required")
+@click.option("--iterations", type=int, default=10000, show_default=True)
+@click.option("--user-id", type=int, default=None, help="User to authenticate as (default: first admin).")
+@with_appcontext
+def bench_role_required_command(iterations, user_id):
+    """Measure role_required overhead per request, with a warm and a cold access cache."""
+    from flask_jwt_extended import create_access_token
+    from app.models import User
+    from app.utils.decorators import role_required
+    from app.utils.access_cache import invalidate_user_access
+
+    user = User.query.get(user_id) if user_id else User.query.filter_by(role="admin").first()
+    if not user:
+        raise click.ClickException("No user to benchmark with")
+
+    token = create_access_token(identity=str(user.id), additional_claims={"role": user.role})
+    view = role_required([user.role])(lambda: "ok")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def cold_view():
+        invalidate_user_access(user.id)
+        view()
+
+    with current_app.test_request_context("/", headers=headers):
+        time_calls(view, iterations)  # warm up
+        for label, fn in (("warm cache", view), ("cold cache (DB lookup)", cold_view)):
+            seconds = time_calls(fn, iterations)
+            click.echo(f"{label:<24} {seconds / iterations * 1e6:8.1f} µs/request")
+
+
+@bench_cli.command("login")
+@click.option("--logins", type=int, default=200, show_default=True, help="Password verifications to run.")
+@click.option("--concurrency", type=int, default=32, show_default=True, help="Simultaneous login threads.")
+@with_appcontext
+def bench_login_command(logins, concurrency):
+    """
+    Run a login storm (bcrypt verifications from many threads) and measure how
+    quickly an unrelated request is served before and during it.
+    """
+    from app.services.password_hasher import password_hasher
+
+    hashed = password_hasher.hash("load-test-password")
+    client = current_app.test_client()
+
+    def probe(samples=50):
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            client.get("/api/__load_probe__")  # 404 through the full request stack
+            timings.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+        return percentiles(timings)
+
+    result = []
+    storm = threading.Thread(target=lambda: result.append(run_concurrently(
+        lambda _: password_hasher.verify("load-test-password", hashed), range(logins), concurrency
+    )), daemon=True)
+
+    baseline = probe()
+    storm.start()
+    during = probe()
+    storm.join()
+    elapsed, timings, errors = result[0]
+
+    busy = sum(1 for e in errors if e.startswith("HashingBusyError"))
+    click.echo(f"{logins} logins x {concurrency} threads in {elapsed:.2f}s ({logins / elapsed:.1f}/s), {busy} rejected as busy")
+    if len(errors) > busy:
+        click.echo(f"{len(errors) - busy} failed, first: {next(e for e in errors if not e.startswith('HashingBusyError'))}")
+    click.echo(f"verify latency      {percentiles(timings)}")
+    click.echo(f"probe before storm  {baseline}")
+    click.echo(f"probe during storm  {during}")
+    click.echo(f"hasher: {password_hasher.metrics()}")
+
+
+# ------------------- Users -------------------
+@bench_cli.command("email-lookup")
+@click.option("--rows", type=int, default=1_000_000, show_default=True)
+@click.option("--lookups", type=int, default=1000, show_default=True)
+@with_appcontext
+def bench_email_lookup_command(rows, lookups):
+    """
+    Compare lower(email) lookups with and without the functional index on a
+    temporary table of `rows` users (PostgreSQL; the real users table is untouched).
+    """
+    from sqlalchemy import text
+    from app.extensions import db
+
+    with db.engine.connect() as conn:
+        conn.execute(text("CREATE TEMP TABLE bench_users (id serial PRIMARY KEY, email varchar(150) UNIQUE NOT NULL)"))
+        conn.execute(text(
+            "INSERT INTO bench_users (email) SELECT 'User' || g || '@Example.com' FROM generate_series(1, :rows) g"
+        ), {"rows": rows})
+        conn.execute(text("ANALYZE bench_users"))
+
+        def run(label):
+            step = max(1, rows // lookups)
+            ids = iter(range(1, rows + 1, step))
+            count = len(range(1, rows + 1, step))
+            seconds = time_calls(lambda: conn.execute(
+                text("SELECT id FROM bench_users WHERE lower(email) = :email"),
+                {"email": f"user{next(ids)}@example.com"}
+            ).first(), count)
+            plan = conn.execute(text(
+                "EXPLAIN SELECT id FROM bench_users WHERE lower(email) = 'user1@example.com'"
+            )).scalar()
+            click.echo(f"{label:<22} {seconds / count * 1000:8.3f} ms/lookup   {plan}")
+
+        run("unique(email) only")
+        conn.execute(text("CREATE UNIQUE INDEX ON bench_users (lower(email))"))
+        conn.execute(text("ANALYZE bench_users"))
+        run("unique(lower(email))")
+        conn.rollback()
+
+
+@bench_cli.command("deferred-columns")
+@click.option("--iterations", type=int, default=10, show_default=True)
+@click.option("--users", type=int, default=200, show_default=True, help="Candidates looked up per iteration.")
+@with_appcontext
+def bench_deferred_columns_command(iterations, users):
+    """
+    Memory and latency of the old list_cv_reviews entity loads and of
+    per-request candidate lookups with the large Candidate / Application
+    columns deferred, against the same queries with them loaded (as every
+    query did before). Read-only; run it on a database with realistic CVs.
+    """
+    import tracemalloc
+    from sqlalchemy.orm import undefer, undefer_group
+    from app.extensions import db
+    from app.models import Candidate, Application
+
+    user_ids = [row.user_id for row in db.session.query(Candidate.user_id)
+                .filter(Candidate.user_id.isnot(None)).limit(users)]
+
+    def cv_reviews(full):
+        # The entity loads list_cv_reviews used to make: every application, then each candidate
+        app_options = [undefer_group("large")] if full else [undefer(Application.cv_parser_result)]
+        candidate_options = [undefer_group("large")] if full else []
+        for app in Application.query.options(*app_options).all():
+            app.cv_parser_result
+            if app.candidate_id:
+                Candidate.query.options(*candidate_options).get(app.candidate_id)
+
+    def candidate_lookups(full):
+        # get_current_candidate / role checks: one candidate by user id
+        options = [undefer_group("large")] if full else []
+        for user_id in user_ids:
+            Candidate.query.options(*options).filter_by(user_id=user_id).first()
+
+    def run(label, fn, full):
+        timings, peaks = [], []
+        for _ in range(iterations):
+            db.session.expunge_all()
+            tracemalloc.start()
+            timings.append(time_calls(lambda: fn(full), 1))
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        db.session.rollback()
+        click.echo(f"{label:<34} {sum(timings) / iterations * 1000:9.1f} ms  "
+                   f"{max(peaks) / 1024 / 1024:8.2f} MiB peak")
+
+    run("cv reviews, all columns", cv_reviews, True)
+    run("cv reviews, deferred", cv_reviews, False)
+    run(f"candidate by user x{len(user_ids)}, all columns", candidate_lookups, True)
+    run(f"candidate by user x{len(user_ids)}, deferred", candidate_lookups, False)
+
+
+# ------------------- SSO -------------------
+@bench_cli.command("sso-provisioning")
+@click.option("--users", "user_count", type=int, default=5000, show_default=True, help="Distinct users logging in.")
+@click.option("--concurrency", type=int, default=50, show_default=True, help="Simultaneous login threads.")
+@click.option("--repeat", type=int, default=1, show_default=True, help="Logins per user (2+ exercises the existing-user path).")
+@click.option("--keep", is_flag=True, help="Keep the generated users instead of deleting them.")
+@click.confirmation_option(prompt="This creates @sso-bench.invalid users in the configured database. Continue?")
+@with_appcontext
+def bench_sso_provisioning_command(user_count, concurrency, repeat, keep):
+    """
+    Simulate a morning login storm: `users` SSO users provisioned from
+    `concurrency` threads, reporting throughput and latency percentiles.
+    Generated accounts use @sso-bench.invalid and are removed afterwards.
+    """
+    from sqlalchemy import text
+    from app.extensions import db
+    from app.services.provisioning_service import ProvisioningService
+
+    def login(i):
+        ProvisioningService.provision(
+            f"user{i}@sso-bench.invalid", "Bench", f"User {i}",
+            provider="sso", provider_user_id=f"bench-{i}", ensure_candidate=True
+        )
+
+    jobs = [i for _ in range(repeat) for i in range(user_count)]
+    elapsed, timings, errors = run_concurrently(
+        login, jobs, concurrency, app=current_app._get_current_object()
+    )
+
+    if timings:
+        click.echo(f"{len(timings)} logins x {concurrency} threads in {elapsed:.2f}s ({len(timings) / elapsed:.1f}/s)")
+        click.echo(f"latency {percentiles(timings)}")
+    if errors:
+        click.echo(f"{len(errors)} failed, first: {errors[0]}")
+
+    if not keep:
+        bench = "SELECT id FROM users WHERE email LIKE '%@sso-bench.invalid'"
+        db.session.execute(text(f"DELETE FROM oauth_connections WHERE user_id IN ({bench})"))
+        db.session.execute(text(f"DELETE FROM candidates WHERE user_id IN ({bench})"))
+        db.session.execute(text("DELETE FROM users WHERE email LIKE '%@sso-bench.invalid'"))
+        db.session.commit()
+
+
+# ------------------- MFA -------------------
+@bench_cli.command("mfa-qr")
+@click.option("--enrollments", type=int, default=1000, show_default=True)
+@click.option("--concurrency", type=int, default=8, show_default=True)
+@with_appcontext
+def bench_mfa_qr_command(enrollments, concurrency):
+    """
+    Mass-enrollment throughput of QR rendering: the previous PIL PNG path
+    (if Pillow is installed), the zlib PNG and SVG renderers, and a repeat
+    request served from a cached setup (JSON decode only; nothing is written
+    to Redis).
+    """
+    import base64
+    import json
+    import pyotp
+    from app.services.mfa_service import MFAService
+    from app.utils.qr_render import png_data_uri, svg_data_uri
+
+    uris = [MFAService.get_qr_code_uri(f"user{i}@example.com", pyotp.random_base32(), "KhonoRecruit")
+            for i in range(enrollments)]
+
+    def run(label, render):
+        elapsed, _, errors = run_concurrently(render, uris, concurrency)
+        if errors:
+            raise click.ClickException(f"{label}: {len(errors)} renders failed, first: {errors[0]}")
+        size = len(render(uris[0]))
+        click.echo(f"{label:<16} {enrollments / elapsed:8.1f} enrollments/s  {size:6d} chars per response")
+
+    try:
+        import io
+        import qrcode
+
+        def pil_png(uri):
+            qr = qrcode.QRCode(version=1, box_size=10, border=5)
+            qr.add_data(uri)
+            qr.make(fit=True)
+            buffer = io.BytesIO()
+            qr.make_image(fill_color="black", back_color="white").save(buffer, format="PNG")
+            return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+        run("PIL png (old)", pil_png)
+    except ImportError:
+        click.echo("PIL png (old)    skipped: Pillow is not installed")
+
+    run("zlib png", png_data_uri)
+    run("svg", svg_data_uri)
+
+    # The cached setup as MFAService stores it, decoded per request
+    cached = json.dumps({"secret": "", "uri": uris[0], "png": png_data_uri(uris[0])})
+    run("cached repeat", lambda uri: json.loads(cached)["png"])
@@ -1,4 +1,5 @@
 import os
+import json
 from datetime import timedelta
 from dotenv import load_dotenv
 
@@ -16,13 +17,38 @@ class Config:
     MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/recruitment_cv')
     
     # Redis
-    #REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+    # Socket.IO: set to a Redis URL so every gunicorn worker can emit to every
+    # client. Leave empty for a single process (events stay in-process).
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
     
     # JWT
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     JWT_TOKEN_LOCATION = ["headers", "query_string"]  # Allow token in headers or query string
     JWT_QUERY_STRING_NAME = "access_token"            # Query param name
+    VERIFICATION_CODE_TTL = int(os.getenv('VERIFICATION_CODE_TTL', 1800))  # seconds an email verification code is valid
+    VERIFICATION_MAX_ATTEMPTS = int(os.getenv('VERIFICATION_MAX_ATTEMPTS', 5))  # wrong guesses before the code is burned
+    MFA_TOTP_VALID_WINDOW = int(os.getenv('MFA_TOTP_VALID_WINDOW', 1))  # 30s steps accepted either side of now
+    MFA_MAX_FAILURES = int(os.getenv('MFA_MAX_FAILURES', 5))  # wrong MFA codes (per user) before a lockout
+    MFA_FAILURE_WINDOW = int(os.getenv('MFA_FAILURE_WINDOW', 900))  # seconds failures are counted over
+    MFA_LOCKOUT_BASE = int(os.getenv('MFA_LOCKOUT_BASE', 30))  # first lockout in seconds, doubled per repeat
+    MFA_LOCKOUT_MAX = int(os.getenv('MFA_LOCKOUT_MAX', 3600))
+    MFA_SETUP_TTL = int(os.getenv('MFA_SETUP_TTL', 900))  # seconds a pending enrollment's secret/QR is reused
+    AUTH_ACCESS_CACHE_TTL = int(os.getenv('AUTH_ACCESS_CACHE_TTL', 60))  # seconds role/active status is cached per user
+    AUTH_ACCESS_CACHE_SIZE = int(os.getenv('AUTH_ACCESS_CACHE_SIZE', 10000))
+    SESSION_PROFILE_CACHE_TTL = int(os.getenv('SESSION_PROFILE_CACHE_TTL', 300))  # seconds /api/auth/me is cached per user (in Redis)
+    LIST_DEFAULT_LIMIT = int(os.getenv('LIST_DEFAULT_LIMIT', 100))  # rows per page on list endpoints without ?limit=
+    LIST_MAX_LIMIT = int(os.getenv('LIST_MAX_LIMIT', 500))
+    LIST_EXACT_COUNT_BELOW = int(os.getenv('LIST_EXACT_COUNT_BELOW', 1000))  # estimated totals under this are counted exactly
+    QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'False').lower() == 'true'  # raise (not log) when a view exceeds its query budget; set in CI
+
+    # Password hashing (bcrypt on a bounded worker pool)
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))  # existing hashes are upgraded on next login
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 4))  # concurrent bcrypt operations per process
+    PASSWORD_HASH_QUEUE_MAX = int(os.getenv('PASSWORD_HASH_QUEUE_MAX', 64))  # waiting operations before 503
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))  # seconds
     
     # Email
     MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
@@ -30,6 +56,18 @@ class Config:
     MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'True').lower() == 'true'
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+
+    # Mail dispatcher (worker pool with persistent SMTP connections)
+    MAIL_ASYNC_ENABLED = os.getenv('MAIL_ASYNC_ENABLED', 'True').lower() == 'true'  # False sends inline
+    MAIL_WORKERS = int(os.getenv('MAIL_WORKERS', 4))
+    MAIL_QUEUE_MAXSIZE = int(os.getenv('MAIL_QUEUE_MAXSIZE', 1000))  # overflow goes to the mail_outbox table
+    MAIL_RATE_LIMIT = float(os.getenv('MAIL_RATE_LIMIT', 5))  # messages per second across all workers, 0 = unlimited
+    MAIL_SMTP_IDLE_TIMEOUT = float(os.getenv('MAIL_SMTP_IDLE_TIMEOUT', 60))  # seconds before an idle connection is closed
+    MAIL_MAX_RETRIES = int(os.getenv('MAIL_MAX_RETRIES', 5))
+    MAIL_RETRY_BACKOFF = int(os.getenv('MAIL_RETRY_BACKOFF', 60))  # seconds, doubled per attempt
+    MAIL_RETRY_INTERVAL = float(os.getenv('MAIL_RETRY_INTERVAL', 30))  # how often the outbox is polled
+    EMAIL_TEMPLATE_CACHE_SIZE = int(os.getenv('EMAIL_TEMPLATE_CACHE_SIZE', 256))  # cached shared renders for bulk sends
+    EMAIL_TEMPLATES_STRICT = os.getenv('EMAIL_TEMPLATES_STRICT', 'False').lower() == 'true'  # fail startup on a broken template
     
     # OAuth Configuration
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
@@ -53,12 +91,51 @@ class Config:
     SSO_JWT_SECRET = os.getenv('SSO_JWT_SECRET', 'our-super-secret-code-123')  # Same as hub!
     PORTAL_HUB_URL = os.getenv('PORTAL_HUB_URL', 'http://localhost:5001')  # Hub address
     
-    RATELIMIT_STORAGE_URI = "memory://"
+    # Rate limiting: shared Redis counters so limits hold across gunicorn workers and restarts
+    RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI', REDIS_URL)  # memory:// for a single local process
+    RATELIMIT_STRATEGY = os.getenv('RATELIMIT_STRATEGY', 'sliding-window-counter')
+    RATELIMIT_IN_MEMORY_FALLBACK_ENABLED = True  # per-process counters while Redis is unreachable
+    RATELIMIT_STORAGE_OPTIONS = {"socket_connect_timeout": 1, "socket_timeout": 1}
+    RATELIMIT_HEADERS_ENABLED = True  # X-RateLimit-Limit / -Remaining / -Reset and Retry-After
+    RATELIMIT_KEY_PREFIX = "ratelimit"
+    RATELIMIT_LOGIN_PER_EMAIL = os.getenv('RATELIMIT_LOGIN_PER_EMAIL', '5 per minute')
+    RATELIMIT_AI_CHAT = os.getenv('RATELIMIT_AI_CHAT', '20 per minute')
+    RATELIMIT_PARSE_CV = os.getenv('RATELIMIT_PARSE_CV', '5 per minute;30 per hour')
+    RATELIMIT_UPLOAD_RESUME = os.getenv('RATELIMIT_UPLOAD_RESUME', '10 per minute;50 per hour')
+
+    # Notifications
+    NOTIFICATION_RECIPIENT_CACHE_TTL = int(os.getenv('NOTIFICATION_RECIPIENT_CACHE_TTL', 300))  # seconds
+    NOTIFICATION_UNREAD_TTL = int(os.getenv('NOTIFICATION_UNREAD_TTL', 3600))  # seconds a cached unread count lives
+    NOTIFICATION_ARCHIVE_DAYS = int(os.getenv('NOTIFICATION_ARCHIVE_DAYS', 30))  # read notifications older than this are archived
+    NOTIFICATION_ARCHIVE_INTERVAL = int(os.getenv('NOTIFICATION_ARCHIVE_INTERVAL', 3600))  # seconds between background archive runs; 0 disables
+
+    # Applications
+    APPLICATION_BULK_MAX = int(os.getenv('APPLICATION_BULK_MAX', 1000))  # max applications per bulk status change
+
+    # Audit log writer (buffered, bulk inserts from a background thread)
+    AUDIT_ASYNC_ENABLED = os.getenv('AUDIT_ASYNC_ENABLED', 'True').lower() == 'true'
+    AUDIT_QUEUE_MAXSIZE = int(os.getenv('AUDIT_QUEUE_MAXSIZE', 10000))
+    AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', 200))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', 1.0))  # seconds
+    AUDIT_QUEUE_POLICY = os.getenv('AUDIT_QUEUE_POLICY', 'block')  # 'block' (wait briefly, then drop) or 'drop'
+    AUDIT_QUEUE_BLOCK_TIMEOUT = float(os.getenv('AUDIT_QUEUE_BLOCK_TIMEOUT', 0.5))  # seconds
+    # Fraction (0-1) of individual events written per action; security events ignore this
+    AUDIT_SAMPLE_RATES = json.loads(os.getenv('AUDIT_SAMPLE_RATES', '{}'))
+    AUDIT_READ_SAMPLE_RATE = float(os.getenv('AUDIT_READ_SAMPLE_RATE', 0.0))  # read events are still counted
+    AUDIT_AGGREGATE_INTERVAL = float(os.getenv('AUDIT_AGGREGATE_INTERVAL', 60))  # seconds per read-event summary row
+    AUDIT_RETENTION_DAYS = int(os.getenv('AUDIT_RETENTION_DAYS', 180))  # older months go to AUDIT_ARCHIVE_DIR
+    AUDIT_ARCHIVE_DIR = os.getenv('AUDIT_ARCHIVE_DIR', 'archives/audit_logs')
     
     SSO_CLIENT_ID = os.getenv('SSO_CLIENT_ID') 
     SSO_CLIENT_SECRET = os.getenv('SSO_CLIENT_SECRET')
     SSO_METADATA_URL = os.getenv('SSO_METADATA_URL')
     SSO_USERINFO_URL = os.getenv('SSO_USERINFO_URL')
+    OIDC_METADATA_TTL = int(os.getenv('OIDC_METADATA_TTL', 3600))  # seconds before discovery/JWKS are refetched
+    OIDC_REFRESH_MARGIN = int(os.getenv('OIDC_REFRESH_MARGIN', 300))  # refresh in the background this long before expiry
+    OIDC_RETRY_INTERVAL = int(os.getenv('OIDC_RETRY_INTERVAL', 30))  # after a failed refresh (stale copy is kept)
+    OIDC_JWKS_MIN_REFRESH = int(os.getenv('OIDC_JWKS_MIN_REFRESH', 30))  # unknown kid refetches at most this often
+    OIDC_HTTP_TIMEOUT = float(os.getenv('OIDC_HTTP_TIMEOUT', 5))
+    OIDC_CACHE_DIR = os.getenv('OIDC_CACHE_DIR')  # default: <instance>/oidc_cache
     
 class DevelopmentConfig(Config):
     DEBUG = True
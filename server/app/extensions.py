@@ -7,7 +7,6 @@ from flask_migrate import Migrate
 from flask_cors import CORS
 from pymongo import MongoClient
 from authlib.integrations.flask_client import OAuth  # <-- updated
-import redis
 import firebase_admin
 from flask_socketio import SocketIO
 from flask_bcrypt import Bcrypt
@@ -15,6 +14,8 @@ from flask_bcrypt import Bcrypt
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from app.utils.password_validator import PasswordValidator
+from app.utils.memory_store import make_redis_client
+import os
 
 
 
@@ -27,6 +28,7 @@ oauth = OAuth()  # <-- Authlib OAuth
 cors = CORS()
 validator = PasswordValidator()   # ← IMPORTANT
 bcrypt = Bcrypt()
+socketio = SocketIO()
 
 # ------------------- Cloudinary Client -------------------
 class CloudinaryClient:
@@ -47,6 +49,7 @@ class CloudinaryClient:
 cloudinary_client = CloudinaryClient()
 
 
+# Default key is the client IP; see utils/rate_limit.py for per-email and per-user keys
 limiter = Limiter(key_func=get_remote_address)
 # ------------------- MongoDB Client -------------------
 mongo_client = MongoClient('mongodb://localhost:27017/')
@@ -54,12 +57,8 @@ mongo_db = mongo_client['recruitment_cv']
 
 
 # ------------------- Redis Client -------------------
-redis_client = redis.Redis(
-    host='localhost',  # update if using a different host
-    port=6379,         # default Redis port
-    db=0,
-    decode_responses=True  # makes Redis return strings instead of bytes
-)
+# REDIS_URL=memory:// swaps in an in-process stand-in for local runs and tests
+redis_client = make_redis_client(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
 
 
 
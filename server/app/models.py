@@ -1,5 +1,6 @@
 from app.extensions import db
 from datetime import datetime
+from sqlalchemy import event, DDL
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.dialects.postgresql import JSONB
 
@@ -25,7 +26,6 @@ class User(db.Model):
     mfa_secret = db.Column(db.String(32), nullable=True)
     mfa_enabled = db.Column(db.Boolean, default=False)
     mfa_verified = db.Column(db.Boolean, default=False)
-    mfa_backup_codes = db.Column(db.JSON, nullable=True)  # 🆕 ADD THIS LINE
 
     # 🔗 Relationships
     candidates = db.relationship('Candidate', back_populates='user', lazy=True)
@@ -33,6 +33,14 @@ class User(db.Model):
     oauth_connections = db.relationship('OAuthConnection', back_populates='user', lazy=True)
     managed_interviews = db.relationship('Interview', back_populates='hiring_manager', lazy=True)
 
+    __table_args__ = (
+        # Case-insensitive lookups (UserRepository.get_by_email) filter on lower(email)
+        db.Index('uq_users_email_lower', db.func.lower(email), unique=True),
+        # Keyset pages of GET /api/admin/users
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+        db.Index('ix_users_role_id', 'role', 'id'),
+    )
+
     def to_dict(self):
         """Return sanitized user data for API responses."""
         return {
@@ -51,6 +59,23 @@ class User(db.Model):
         }
 
 
+
+# ------------------- MFA BACKUP CODES -------------------
+class MFABackupCode(db.Model):
+    """One single-use MFA recovery code; only its HMAC is stored."""
+    __tablename__ = 'mfa_backup_codes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    code_hash = db.Column(db.String(64), nullable=False)
+    used_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('uq_mfa_backup_codes_user_hash', 'user_id', 'code_hash', unique=True),
+    )
+
+
 class OAuthConnection(db.Model):
     __tablename__ = 'oauth_connections'
     
@@ -99,6 +124,12 @@ class Requisition(db.Model):
 
     applications = db.relationship('Application', back_populates='requisition', lazy=True)
 
+    __table_args__ = (
+        # Keyset pages of the job lists (newest first) and the category filter
+        db.Index('ix_requisitions_created_at_id', 'created_at', 'id'),
+        db.Index('ix_requisitions_category_created_at', 'category', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -141,9 +172,11 @@ class Candidate(db.Model):
     linkedin = db.Column(db.String(250), nullable=True)        # ✅ added
     github = db.Column(db.String(250), nullable=True)          # ✅ added
     cv_url = db.Column(db.String(500))
-    cv_text = db.Column(db.Text)
+    # Large columns are deferred (group "large"): they load on first access, or
+    # with the query when it asks for them via undefer_group("large").
+    cv_text = db.deferred(db.Column(db.Text), group="large")
     portfolio = db.Column(db.String(500))
-    cover_letter = db.Column(db.Text)
+    cover_letter = db.deferred(db.Column(db.Text), group="large")
     profile_picture = db.Column(db.String(1024), nullable=True)
 
     # Structured sections
@@ -152,8 +185,8 @@ class Candidate(db.Model):
     work_experience = db.Column(JSON, default=[])
     certifications = db.Column(JSON, default=[])
     languages = db.Column(JSON, default=[])
-    documents = db.Column(JSON, default=[])
-    profile = db.Column(JSON, default={})
+    documents = db.deferred(db.Column(JSON, default=[]), group="large")
+    profile = db.deferred(db.Column(JSON, default={}), group="large")
 
     cv_score = db.Column(db.Integer, default=0)
     dark_mode = db.Column(db.Boolean, default=False)
@@ -167,6 +200,13 @@ class Candidate(db.Model):
     assessments = db.relationship('AssessmentResult', back_populates='candidate', lazy=True)
     analyses = db.relationship('CVAnalysis', back_populates='candidate', lazy=True)
 
+    __table_args__ = (
+        # One candidate row per user; SSO provisioning upserts on it
+        db.Index('uq_candidates_user_id', user_id, unique=True),
+        # Candidate lists sorted / filtered by score
+        db.Index('ix_candidates_cv_score_id', db.func.coalesce(cv_score, 0), id),
+    )
+
     def to_dict(self):
         """Return candidate data for API responses."""
         return {
@@ -210,10 +250,11 @@ class Application(db.Model):
     requisition_id = db.Column(db.Integer, db.ForeignKey('requisitions.id'))
     status = db.Column(db.String(50), default='applied')  # could be 'draft', 'applied', 'reviewed', etc.
     is_draft = db.Column(db.Boolean, default=False)
-    draft_data = db.Column(JSON, nullable=True)  # store partial info before submission
+    # Deferred like Candidate's large columns (group "large")
+    draft_data = db.deferred(db.Column(JSON, nullable=True), group="large")  # store partial info before submission
     resume_url = db.Column(db.String(500))
     cv_score = db.Column(db.Float, default=0)
-    cv_parser_result = db.Column(JSON, default={})
+    cv_parser_result = db.deferred(db.Column(JSON, default={}), group="large")
     assessment_score = db.Column(db.Float, default=0)
     overall_score = db.Column(db.Float, default=0)
     recommendation = db.Column(db.String(50))
@@ -227,6 +268,12 @@ class Application(db.Model):
     interviews = db.relationship('Interview', back_populates='application', lazy=True)
     assessment_results = db.relationship('AssessmentResult', back_populates='application', lazy=True)
 
+    __table_args__ = (
+        # CV review queue: newest first, optionally per requisition / status
+        db.Index('ix_applications_requisition_id_id', requisition_id, id),
+        db.Index('ix_applications_status_id', status, id),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -298,6 +345,7 @@ class Interview(db.Model):
     hiring_manager = db.relationship('User', back_populates='managed_interviews')
 
     def to_dict(self):
+        """Load lists with utils.loaders.INTERVIEW_DICT; this walks candidate.user and hiring_manager."""
         return {
             "id": self.id,
             "candidate_id": self.candidate_id,
@@ -346,6 +394,12 @@ class Notification(db.Model):
 
     user = db.relationship('User', back_populates='notifications')
 
+    __table_args__ = (
+        # Inbox pages are keyset-paginated on (user_id, created_at, id)
+        db.Index('ix_notifications_user_created_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_notifications_user_unread', 'user_id', postgresql_where=db.text('is_read = false')),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -355,30 +409,53 @@ class Notification(db.Model):
             "created_at": self.created_at.isoformat()
         }
 
-    
-# ------------------- VERIFICATION CODE -------------------
-class VerificationCode(db.Model):
-    __tablename__ = 'verification_codes'
+
+class NotificationArchive(db.Model):
+    """Read notifications moved out of the inbox table after NOTIFICATION_ARCHIVE_DAYS."""
+    __tablename__ = 'notifications_archive'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    message = db.Column(db.String(500), nullable=False)
+    is_read = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+
+class MailOutbox(db.Model):
+    """Emails that could not be delivered yet; retried by the mail dispatcher with backoff."""
+    __tablename__ = 'mail_outbox'
     id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(150), nullable=False)
-    code = db.Column(db.String(10), nullable=False)
-    is_used = db.Column(db.Boolean, default=False)
+    subject = db.Column(db.String(500), nullable=False)
+    recipients = db.Column(JSONB, nullable=False, default=list)
+    html_body = db.Column(db.Text)
+    text_body = db.Column(db.Text)
+    sender = db.Column(db.String(255))
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending | failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    expires_at = db.Column(db.DateTime, nullable=False)
 
-    def is_valid(self):
-        return not self.is_used and datetime.utcnow() < self.expires_at
+    __table_args__ = (
+        db.Index('ix_mail_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
 
     def to_dict(self):
         return {
             "id": self.id,
-            "email": self.email,
-            "code": self.code,
-            "is_used": self.is_used,
-            "created_at": self.created_at.isoformat(),
-            "expires_at": self.expires_at.isoformat()
+            "subject": self.subject,
+            "recipients": self.recipients,
+            "status": self.status,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "next_attempt_at": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None
         }
-        
+
+    
+# Verification codes live in Redis (services/verification_store.py).
+
 class Conversation(db.Model):
     __tablename__ = "conversations"
     id = db.Column(db.Integer, primary_key=True)
@@ -409,8 +486,22 @@ class AuditLog(db.Model):
     ip_address = db.Column(db.String(100), nullable=True)
     user_agent = db.Column(db.String(500), nullable=True)
     extra_data = db.Column(JSON, nullable=True)  # <- renamed from metadata
+    category = db.Column(db.String(20), default='activity')  # security | activity | read
+    severity = db.Column(db.String(20), default='medium')    # high | medium | low
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_audit_logs_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_audit_logs_admin_id_timestamp', 'admin_id', 'timestamp'),
+        db.Index('ix_audit_logs_action_timestamp', 'action', 'timestamp'),
+        db.Index('ix_audit_logs_category_timestamp', 'category', 'timestamp'),
+        # Trigram indexes so the admin screen's ILIKE '%...%' filters don't scan the table
+        db.Index('ix_audit_logs_action_trgm', 'action',
+                 postgresql_using='gin', postgresql_ops={'action': 'gin_trgm_ops'}),
+        db.Index('ix_audit_logs_details_trgm', 'details',
+                 postgresql_using='gin', postgresql_ops={'details': 'gin_trgm_ops'}),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -421,9 +512,19 @@ class AuditLog(db.Model):
             "ip_address": self.ip_address,
             "user_agent": self.user_agent,
             "extra_data": self.extra_data,  # <- updated here too
+            "category": self.category,
+            "severity": self.severity,
             "timestamp": self.timestamp.isoformat(),
         }
 
+
+# Trigram indexes need the pg_trgm extension before the table is created
+event.listen(
+    AuditLog.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
+
 # ------------------- SHARED NOTE -------------------
 class SharedNote(db.Model):
     __tablename__ = "shared_notes"
@@ -473,10 +574,14 @@ class Meeting(db.Model):
     cancelled = db.Column(db.Boolean, default=False)
     cancelled_at = db.Column(db.DateTime, nullable=True)
     cancelled_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    # Per-recipient delivery of invitation/cancellation emails:
+    # {"a@x.com": {"kind": "invitation", "status": "sent" | "failed" | "pending" | "queued", "error": ..., "updated_at": ...}}
+    email_status = db.Column(JSONB, nullable=False, default=dict)
 
     organizer = db.relationship("User", backref=db.backref("organized_meetings", lazy=True), foreign_keys=[organizer_id])
 
     def to_dict(self):
+        """Load lists with utils.loaders.MEETING_DICT; this reads the organizer."""
         return {
             "id": self.id,
             "title": self.title,
@@ -497,5 +602,6 @@ class Meeting(db.Model):
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "cancelled": self.cancelled,
             "cancelled_at": self.cancelled_at.isoformat() if self.cancelled_at else None,
-            "cancelled_by": self.cancelled_by
+            "cancelled_by": self.cancelled_by,
+            "email_status": self.email_status or {}
         }
@@ -1,14 +1,30 @@
-from flask import Blueprint, request, jsonify, current_app
+import json
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.extensions import db
 from app.models import User, Requisition, Candidate, Application, AssessmentResult, Interview, Notification, AuditLog, Conversation, SharedNote, Meeting
 from datetime import datetime, timedelta
 from app.utils.decorators import role_required
+from app.utils.helper import encode_cursor, decode_cursor
+from app.utils.loaders import (
+    INTERVIEW_ROW, INTERVIEW_ROW_JOINED, MEETING_DICT,
+    APPLICATION_ACTIVITY, INTERVIEW_ACTIVITY, ASSESSMENT_ACTIVITY
+)
+from app.utils.query_budget import query_budget
+from app.utils.listing import (
+    ListSpec, ListPage, Field, ListError, run_list, list_response, parse_bool, parse_datetime,
+    parse_limit, parse_cursor, count_rows
+)
 from app.services.email_service import EmailService
+from app.services.application_service import ApplicationService, APPLICATION_STATUSES
+from app.services.password_hasher import password_hasher
 from app.services.audit_service import AuditService
 from app.services.audit2 import AuditService
-from flask_cors import cross_origin
+from app.services.notification_service import (
+    invalidate_recipient_cache, create_notification, get_inbox, get_unread_count, mark_notifications_read
+)
 from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import joinedload, undefer_group
 import bleach
 
 
@@ -307,23 +323,140 @@ def get_job(job_id):
     job = Requisition.query.get_or_404(job_id)
     return jsonify(job.to_dict())
 
+JOB_LIST = ListSpec(
+    Requisition,
+    fields={name: None for name in (
+        "id", "title", "description", "job_summary", "responsibilities", "company_details",
+        "qualifications", "category", "required_skills", "min_experience", "knockout_rules",
+        "weightings", "assessment_pack", "created_by", "created_at", "published_on", "vacancy",
+    )},
+    sorts={"created_at": (Requisition.created_at, datetime)},
+    default_sort="-created_at",
+    filters={
+        "category": lambda v: Requisition.category == v,
+        "created_by": lambda v: Requisition.created_by == int(v),
+        "created_after": lambda v: Requisition.created_at >= parse_datetime(v),
+    },
+)
+
+
 @admin_bp.route("/jobs", methods=["GET"])
 @role_required(["admin", "hiring_manager"])
 def list_jobs():
-    jobs = Requisition.query.all()
-    return jsonify([job.to_dict() for job in jobs])
+    """
+    One page of jobs, newest first (plain list; X-Next-Cursor / X-Total-Count headers).
+    Query params: limit, cursor, sort, fields, count, category, created_by, created_after.
+    """
+    try:
+        return list_response(run_list(JOB_LIST))
+    except ListError as e:
+        return jsonify({"error": str(e)}), 400
 
 # ----------------- CANDIDATE MANAGEMENT -----------------
+CANDIDATE_FIELDS = (
+    "id", "user_id", "full_name", "phone", "dob", "address", "gender", "bio", "title", "location",
+    "nationality", "id_number", "linkedin", "github", "cv_url", "cv_text", "portfolio", "cover_letter",
+    "profile_picture", "education", "skills", "work_experience", "certifications", "languages",
+    "documents", "profile", "cv_score", "dark_mode", "notifications_email", "notifications_push",
+)
+
+CANDIDATE_LIST = ListSpec(
+    Candidate,
+    fields={name: None for name in CANDIDATE_FIELDS},
+    # cv_text, cover_letter and the JSON sections only when asked for via ?fields=
+    default_fields=(
+        "id", "user_id", "full_name", "phone", "gender", "title", "location", "nationality",
+        "id_number", "linkedin", "github", "cv_url", "portfolio", "profile_picture", "cv_score",
+    ),
+    sorts={"cv_score": (db.func.coalesce(Candidate.cv_score, 0), int)},
+    default_sort="id",
+    filters={
+        "user_id": lambda v: Candidate.user_id == int(v),
+        "min_score": lambda v: db.func.coalesce(Candidate.cv_score, 0) >= int(v),
+        "max_score": lambda v: db.func.coalesce(Candidate.cv_score, 0) <= int(v),
+    },
+)
+
+
 @admin_bp.route("/candidates", methods=["GET"])
 @role_required(["admin", "hiring_manager"])
 def list_candidates():
-    candidates = Candidate.query.all()
-    return jsonify([c.to_dict() for c in candidates])
+    """
+    One page of candidates (plain list; X-Next-Cursor / X-Total-Count headers).
+    Large columns are left out unless requested, e.g. ?fields=id,full_name,skills.
+    """
+    try:
+        return list_response(run_list(CANDIDATE_LIST))
+    except ListError as e:
+        return jsonify({"error": str(e)}), 400
+
+@admin_bp.route("/applications/bulk-status", methods=["POST"])
+@role_required(["admin", "hiring_manager"])
+def bulk_update_application_status():
+    """
+    Move many applications to one status in a single transaction.
+
+    Body:
+      {
+        "status": "rejected",
+        "application_ids": [1, 2, 3],          # or a filter:
+        "filter": {"requisition_id": 4, "status": "reviewed",
+                   "min_score": 0, "max_score": 40, "top": 20},
+        "dry_run": false,                      # validate and preview only
+        "notify": true                         # email candidates (one batch)
+      }
+
+    min_score and max_score are inclusive bounds on overall_score, as on
+    the list endpoints.
+    """
+    data = request.get_json() or {}
+    to_status = data.get("status")
+    if to_status not in APPLICATION_STATUSES:
+        return jsonify({"error": f"Unknown status. Allowed: {sorted(APPLICATION_STATUSES)}"}), 400
+
+    ids = data.get("application_ids")
+    filters = data.get("filter") or {}
+    if ids is None and not filters:
+        return jsonify({"error": "Provide application_ids or a filter"}), 400
+    if ids is not None and (not isinstance(ids, list) or not all(isinstance(i, int) for i in ids)):
+        return jsonify({"error": "application_ids must be a list of integers"}), 400
+
+    max_bulk = current_app.config.get("APPLICATION_BULK_MAX", 1000)
+    try:
+        top = filters.get("top")
+        rows = ApplicationService.select_for_transition(
+            application_ids=ids,
+            requisition_id=filters.get("requisition_id"),
+            status=filters.get("status"),
+            min_score=filters.get("min_score"),
+            max_score=filters.get("max_score"),
+            top=min(int(top), max_bulk) if top is not None else max_bulk + 1
+        )
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid filter"}), 400
+    if len(rows) > max_bulk:
+        return jsonify({"error": f"Selection matches more than {max_bulk} applications; narrow the filter"}), 400
+
+    try:
+        result = ApplicationService.bulk_transition(
+            admin_id=get_jwt_identity(),
+            to_status=to_status,
+            rows=rows,
+            requested_ids=ids,
+            dry_run=bool(data.get("dry_run", False)),
+            notify=data.get("notify", True)
+        )
+    except Exception as e:
+        current_app.logger.error(f"Bulk status update error: {e}", exc_info=True)
+        return jsonify({"error": "Failed to update applications"}), 500
+
+    return jsonify(result), 200
+
 
 @admin_bp.route("/applications/<int:application_id>", methods=["GET"])
 @role_required(["admin", "hiring_manager"])
 def get_application(application_id):
-    application = Application.query.get_or_404(application_id)
+    application = Application.query.options(undefer_group("large")).get_or_404(application_id)
     assessment = AssessmentResult.query.filter_by(application_id=application.id).first()
     
     # Get candidate data
@@ -351,7 +484,9 @@ def get_application(application_id):
 @role_required(["admin", "hiring_manager"])
 def shortlist_candidates(job_id):
     job = Requisition.query.get_or_404(job_id)
-    applications = Application.query.filter_by(requisition_id=job.id).all()
+    applications = Application.query.options(
+        joinedload(Application.candidate).undefer(Candidate.profile)
+    ).filter_by(requisition_id=job.id).all()
     shortlisted = []
 
     for app in applications:
@@ -391,87 +526,190 @@ def get_notifications(user_id):
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    notifications = Notification.query.filter_by(user_id=user_id)\
-                                      .order_by(Notification.created_at.desc())\
-                                      .all()
-    
-    unread_count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
+    limit = max(1, min(request.args.get("limit", 50, type=int), 200))
+    cursor = None
+    if request.args.get("cursor"):
+        try:
+            cursor = decode_cursor(request.args["cursor"], datetime, int)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
 
-    data = [n.to_dict() for n in notifications]
+    notifications, next_cursor = get_inbox(user_id, limit=limit, cursor=cursor)
 
     return jsonify({
         "user_id": user_id,
-        "unread_count": unread_count,
-        "notifications": data
+        "unread_count": get_unread_count(user_id),
+        "notifications": [n.to_dict() for n in notifications],
+        "next_cursor": encode_cursor(*next_cursor) if next_cursor else None
     }), 200
 
 
+@admin_bp.route("/notifications/<int:user_id>/mark-read", methods=["POST"])
+@role_required(["admin", "hiring_manager"])
+def mark_user_notifications_read(user_id):
+    data = request.get_json() or {}
+    if data.get("all"):
+        ids = None
+    else:
+        ids = data.get("ids")
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return jsonify({"error": 'Provide "ids" as a list of integers or "all": true'}), 400
+
+    updated = mark_notifications_read(user_id, ids)
+    return jsonify({"updated": updated, "unread_count": get_unread_count(user_id)}), 200
+
+
 
 
 @admin_bp.route("/cv-reviews", methods=["GET", "OPTIONS"])
+@query_budget(4)
 @role_required(["admin", "hiring_manager"])
-@cross_origin()
 def list_cv_reviews():
+    """
+    CV review queue, newest first, from one joined query.
+
+    Query params: status (comma separated), requisition_id, min_score and
+    max_score (inclusive, on cv_score), limit, cursor, count. Returns one page
+    as a plain list with X-Next-Cursor / X-Total-Count headers; format=ndjson
+    streams every matching row (from the cursor on, if given) as one JSON
+    object per line for exports.
+    """
     if request.method == "OPTIONS":
         return '', 200
 
-    applications = Application.query.all()
-    reviews = []
+    args = request.args
+    try:
+        statuses = [s.strip() for s in args.get("status", "").split(",") if s.strip()]
+        try:
+            filters = dict(
+                requisition_id=int(args["requisition_id"]) if args.get("requisition_id") else None,
+                statuses=statuses or None,
+                min_score=float(args["min_score"]) if args.get("min_score") else None,
+                max_score=float(args["max_score"]) if args.get("max_score") else None,
+            )
+        except ValueError:
+            raise ListError("requisition_id, min_score and max_score must be numbers")
+        query = ApplicationService.cv_review_query(**filters)
 
-    for app in applications:
-        candidate = None
-        cv_url = None
-        cv_parser = app.cv_parser_result or {}
+        cursor = parse_cursor(args, int)
+        limit = parse_limit(args)
+    except ListError as e:
+        return jsonify({"error": str(e)}), 400
 
-        if app.candidate_id:
-            candidate = Candidate.query.get(app.candidate_id)
-            cv_url = candidate.cv_url if candidate else None
+    ndjson = args.get("format") == "ndjson"
+    total, estimated = None, False
+    if not ndjson:
+        filtered = any(v is not None for v in filters.values())
+        total, estimated = count_rows(query, Application, filtered, args.get("count", "estimate"))
 
-        reviews.append({
-            "application_id": app.id,
-            "status": app.status,
-            "resume_url": app.resume_url,
-            "cv_score": app.cv_score,
-            "cv_parser_result": {
-                "skills": cv_parser.get("skills", []),
-                "education": cv_parser.get("education", []),
-                "work_experience": cv_parser.get("work_experience", []),
-            },
-            "application_recommendation": app.recommendation,
-            "assessment_score": app.assessment_score,
-            "overall_score": app.overall_score,
-
-            "candidate_id": candidate.id if candidate else None,
-            "full_name": candidate.full_name if candidate else None,
-            "cv_url": cv_url,
-        })
+    if cursor:
+        query = query.filter(Application.id < cursor[0])
+    query = query.order_by(Application.id.desc())
+
+    if ndjson:
+        def generate():
+            for row in query.yield_per(1000):
+                yield json.dumps(ApplicationService.cv_review_dict(row), default=str) + "\n"
 
-    return jsonify(reviews), 200
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    items = [ApplicationService.cv_review_dict(row) for row in rows[:limit]]
+    return list_response(ListPage(items, next_cursor, total, estimated)), 200
 
 
 
 # ----------------- USERS MANAGEMENT -----------------
+def _display_name(user):
+    profile = user.profile or {}
+    return profile.get("full_name") or profile.get("name") or None
+
+
+USER_LIST = ListSpec(
+    User,
+    fields={
+        "id": None,
+        "email": None,
+        "role": None,
+        "name": Field("profile", get=_display_name),
+        "is_verified": None,
+        "is_active": None,
+        "enrollment_completed": None,
+        "dark_mode": None,
+        "mfa_enabled": None,
+        "created_at": None,
+    },
+    default_fields=("id", "email", "role", "name", "is_verified", "enrollment_completed", "dark_mode", "created_at"),
+    sorts={"created_at": (User.created_at, datetime)},
+    default_sort="id",
+    filters={
+        "role": lambda v: User.role == v,
+        "is_verified": lambda v: User.is_verified.is_(parse_bool(v)),
+        "is_active": lambda v: User.is_active.is_(parse_bool(v)),
+        "enrollment_completed": lambda v: User.enrollment_completed.is_(parse_bool(v)),
+    },
+)
+
+
 @admin_bp.route("/users", methods=["GET"])
 @role_required(["admin"])
 def list_users():
-    users = User.query.all()
-    result = []
-    for u in users:
-        profile = u.profile or {}
-        full_name = profile.get("full_name") or profile.get("name") or None
-
-        result.append({
-            "id": u.id,
-            "email": u.email,
-            "role": u.role,
-            "name": full_name,
-            "is_verified": u.is_verified,
-            "enrollment_completed": u.enrollment_completed,
-            "dark_mode": u.dark_mode,
-            "created_at": u.created_at.isoformat() if u.created_at else None
-        })
+    """
+    One page of users (plain list; X-Next-Cursor / X-Total-Count headers).
+    Query params: limit, cursor, sort, fields, count, role, is_verified, is_active, enrollment_completed.
+    """
+    try:
+        return list_response(run_list(USER_LIST)), 200
+    except ListError as e:
+        return jsonify({"error": str(e)}), 400
 
-    return jsonify(result), 200
+
+@admin_bp.route("/users/<int:user_id>", methods=["PATCH"])
+@role_required(["admin"])
+def update_user_access(user_id):
+    """
+    Change a user's role and/or active status.
+    Body: {"role": "hiring_manager", "is_active": false}
+    Cached authorisation for the user is dropped when this commits.
+    """
+    user = User.query.get_or_404(user_id)
+    data = request.get_json() or {}
+    admin_id = get_jwt_identity()
+
+    if str(admin_id) == str(user.id):
+        return jsonify({"error": "You cannot change your own role or status"}), 400
+
+    changes = {}
+    if "role" in data:
+        if data["role"] not in ("admin", "hiring_manager", "candidate"):
+            return jsonify({"error": "Invalid role"}), 400
+        if data["role"] != user.role:
+            changes["role"] = [user.role, data["role"]]
+            user.role = data["role"]
+    if "is_active" in data:
+        if not isinstance(data["is_active"], bool):
+            return jsonify({"error": "is_active must be a boolean"}), 400
+        if data["is_active"] != user.is_active:
+            changes["is_active"] = [user.is_active, data["is_active"]]
+            user.is_active = data["is_active"]
+
+    if not changes:
+        return jsonify({"message": "No changes", "user": user.to_dict()}), 200
+
+    db.session.commit()
+    invalidate_recipient_cache()
+
+    AuditService.record_action(
+        admin_id=admin_id,
+        action="update_user_role" if "role" in changes else "deactivate_user" if not user.is_active else "activate_user",
+        target_user_id=user.id,
+        details=f"Updated access for {user.email}",
+        extra_data=changes,
+        category="security",
+        severity="high"
+    )
+    return jsonify({"message": "User updated", "user": user.to_dict()}), 200
 
 
 @admin_bp.route("/users/<int:user_id>", methods=["DELETE"])
@@ -491,10 +729,13 @@ def delete_user(user_id):
     audit = AuditLog(
         admin_id=admin_id,
         action=f"Deleted user {user.email}",
-        target_user_id=user.id
+        target_user_id=user.id,
+        category="security",
+        severity="high"
     )
     db.session.add(audit)
     db.session.commit()
+    invalidate_recipient_cache()
 
     return jsonify({"message": "User deleted successfully"}), 200
 
@@ -506,32 +747,47 @@ def list_audits():
     """
     Fetch paginated and filtered audit logs.
     Supports:
-    - Pagination: ?page=1&per_page=20
-    - Filtering: ?user_id=5&action=login
+    - Keyset pagination: ?per_page=20&cursor=<next_cursor from previous page>
+    - Page pagination (legacy): ?page=1&per_page=20
+    - Filtering: ?user_id=5&action=login (substring) or &action=login_success&exact=true
+    - Classification: ?category=security&severity=high
     - Date range: ?start_date=2025-09-01&end_date=2025-09-30
     - Keyword search: ?q=updated
     """
 
     try:
         # --- Pagination parameters ---
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 20, type=int)
+        page = request.args.get("page", type=int)
+        per_page = min(request.args.get("per_page", 20, type=int), 200)
+        cursor = request.args.get("cursor")
 
         # --- Filters ---
-        user_id = request.args.get("user_id", type=int)
+        user_id = request.args.get("user_id", type=int) or request.args.get("admin_id", type=int)
         action = request.args.get("action", type=str)
+        exact = request.args.get("exact", "false").lower() == "true"
         start_date = request.args.get("start_date")
         end_date = request.args.get("end_date")
         search = request.args.get("q", type=str)
+        category = request.args.get("category", type=str)
+        severity = request.args.get("severity", type=str)
 
         # --- Build query dynamically ---
         query = AuditLog.query
 
+        if category:
+            query = query.filter(AuditLog.category == category)
+
+        if severity:
+            query = query.filter(AuditLog.severity == severity)
+
         if user_id:
-            query = query.filter_by(user_id=user_id)
+            query = query.filter(AuditLog.admin_id == user_id)
 
         if action:
-            query = query.filter(AuditLog.action.ilike(f"%{action}%"))
+            if exact:
+                query = query.filter(AuditLog.action == action)
+            else:
+                query = query.filter(AuditLog.action.ilike(f"%{action}%"))
 
         if search:
             query = query.filter(AuditLog.details.ilike(f"%{search}%"))
@@ -550,25 +806,57 @@ def list_audits():
             except ValueError:
                 return jsonify({"error": "Invalid end_date format. Use YYYY-MM-DD"}), 400
 
-        # --- Ordering ---
-        query = query.order_by(AuditLog.timestamp.desc())
+        # --- Ordering (timestamp, id) matches ix_audit_logs_timestamp_id ---
+        query = query.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
 
-        # --- Pagination ---
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-        logs = [log.to_dict() for log in pagination.items]
+        # --- Legacy page pagination (runs a COUNT, kept for existing clients) ---
+        if page and not cursor:
+            pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+            logs = pagination.items
+            return jsonify({
+                "total": pagination.total,
+                "page": pagination.page,
+                "pages": pagination.pages,
+                "per_page": pagination.per_page,
+                "next_cursor": encode_cursor(logs[-1].timestamp, logs[-1].id) if pagination.has_next else None,
+                "results": [log.to_dict() for log in logs]
+            }), 200
+
+        # --- Keyset pagination ---
+        if cursor:
+            try:
+                last_ts, last_id = decode_cursor(cursor, datetime, int)
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
+            query = query.filter(
+                or_(
+                    AuditLog.timestamp < last_ts,
+                    and_(AuditLog.timestamp == last_ts, AuditLog.id < last_id)
+                )
+            )
+
+        logs = query.limit(per_page + 1).all()
+        has_more = len(logs) > per_page
+        logs = logs[:per_page]
 
         return jsonify({
-            "total": pagination.total,
-            "page": pagination.page,
-            "pages": pagination.pages,
-            "per_page": pagination.per_page,
-            "results": logs
+            "page": page or 1,
+            "per_page": per_page,
+            "next_cursor": encode_cursor(logs[-1].timestamp, logs[-1].id) if has_more else None,
+            "results": [log.to_dict() for log in logs]
         }), 200
 
     except Exception as e:
         current_app.logger.error(f"Error fetching audit logs: {e}", exc_info=True)
         return jsonify({"error": "Internal server error"}), 500
 
+@admin_bp.route("/metrics/password-hashing", methods=["GET"])
+@role_required(["admin"])
+def password_hashing_metrics():
+    """Queue depth and timings of the bcrypt worker pool in this process."""
+    return jsonify(password_hasher.metrics()), 200
+
+
 @admin_bp.route("/dashboard-counts", methods=["GET"])
 @role_required(["admin", "hiring_manager"])
 def dashboard_counts():
@@ -601,7 +889,7 @@ def manage_interviews():
             if not candidate_id:
                 return jsonify({"error": "candidate_id query parameter is required"}), 400
 
-            interviews = Interview.query.filter_by(candidate_id=candidate_id).all()
+            interviews = Interview.query.options(*INTERVIEW_ROW).filter_by(candidate_id=candidate_id).all()
 
             enriched = []
             for i in interviews:
@@ -658,12 +946,10 @@ def manage_interviews():
             db.session.commit()
 
             # Create in-app notification
-            notif = Notification(
-                user_id=candidate_id,
-                message=f"Your {interview_type} interview has been scheduled for {scheduled_time.strftime('%Y-%m-%d %H:%M:%S')}."
+            create_notification(
+                candidate_id,
+                f"Your {interview_type} interview has been scheduled for {scheduled_time.strftime('%Y-%m-%d %H:%M:%S')}."
             )
-            db.session.add(notif)
-            db.session.commit()
 
             # Fetch candidate profile
             candidate_profile = Candidate.query.get(candidate_id)
@@ -728,14 +1014,12 @@ def reschedule_interview(interview_id):
         db.session.commit()
 
         # Create candidate notification
-        notif = Notification(
-            user_id=interview.candidate_id,
-            message=f"Your interview has been rescheduled from "
-                    f"{old_time.strftime('%Y-%m-%d %H:%M:%S')} to "
-                    f"{new_time.strftime('%Y-%m-%d %H:%M:%S')}."
+        create_notification(
+            interview.candidate_id,
+            f"Your interview has been rescheduled from "
+            f"{old_time.strftime('%Y-%m-%d %H:%M:%S')} to "
+            f"{new_time.strftime('%Y-%m-%d %H:%M:%S')}."
         )
-        db.session.add(notif)
-        db.session.commit()
 
         # Send reschedule email
         candidate_user = interview.candidate.user  # ⚡ correct relationship
@@ -803,12 +1087,10 @@ def cancel_interview(interview_id):
         db.session.commit()
 
         # Add notification
-        notif = Notification(
-            user_id=candidate.user_id,
-            message=f"Your interview scheduled for {interview.scheduled_time.strftime('%Y-%m-%d %H:%M:%S')} has been cancelled."
+        create_notification(
+            candidate.user_id,
+            f"Your interview scheduled for {interview.scheduled_time.strftime('%Y-%m-%d %H:%M:%S')} has been cancelled."
         )
-        db.session.add(notif)
-        db.session.commit()
 
         # Send cancellation email
         if user and user.email:
@@ -873,6 +1155,7 @@ def get_candidate_applications():
         return jsonify({"error": "Internal server error"}), 500
     
 @admin_bp.route("/interviews/all", methods=["GET"])
+@query_budget(3)
 @role_required(["admin", "hiring_manager"])
 def get_all_interviews():
     """
@@ -890,7 +1173,8 @@ def get_all_interviews():
         sort_order = request.args.get("sort_order", "desc")
 
         # ---------------- Base Query ----------------
-        query = Interview.query.join(Interview.candidate).join(Interview.hiring_manager).outerjoin(Interview.application)
+        query = Interview.query.join(Interview.candidate).join(Interview.hiring_manager).outerjoin(Interview.application)\
+            .options(*INTERVIEW_ROW_JOINED)
 
         # ---------------- Filters ----------------
         if status:
@@ -965,6 +1249,7 @@ def get_all_interviews():
 
     
 @admin_bp.route("/recent-activities", methods=["GET"])
+@query_budget(6)
 @jwt_required()
 @role_required("admin")
 def recent_activities():
@@ -972,7 +1257,8 @@ def recent_activities():
         activities = []
 
         # Recent job applications
-        applications = Application.query.order_by(Application.created_at.desc()).limit(5).all()
+        applications = Application.query.options(*APPLICATION_ACTIVITY)\
+            .order_by(Application.created_at.desc()).limit(5).all()
         for app in applications:
             user_profile = app.candidate.user.profile or {}
             candidate_name = f"{user_profile.get('first_name', '')} {user_profile.get('last_name', '')}".strip() or "Unknown"
@@ -985,14 +1271,16 @@ def recent_activities():
             activities.append(f"New job posted: {req.title}")
 
         # Recent interviews (FIXED: scheduled_time)
-        interviews = Interview.query.order_by(Interview.scheduled_time.desc()).limit(5).all()
+        interviews = Interview.query.options(*INTERVIEW_ACTIVITY)\
+            .order_by(Interview.scheduled_time.desc()).limit(5).all()
         for i in interviews:
             user_profile = i.candidate.user.profile or {}
             candidate_name = f"{user_profile.get('first_name', '')} {user_profile.get('last_name', '')}".strip() or "Unknown"
             activities.append(f"Interview scheduled: {candidate_name}")
 
         # Recent CV reviews
-        reviews = AssessmentResult.query.order_by(AssessmentResult.created_at.desc()).limit(5).all()
+        reviews = AssessmentResult.query.options(*ASSESSMENT_ACTIVITY)\
+            .order_by(AssessmentResult.created_at.desc()).limit(5).all()
         for r in reviews:
             user_profile = r.application.candidate.user.profile or {}
             candidate_name = f"{user_profile.get('first_name', '')} {user_profile.get('last_name', '')}".strip() or "Unknown"
@@ -1204,16 +1492,14 @@ def download_application_cv(application_id):
 @role_required(["admin", "hiring_manager"])
 def get_all_candidates():
     """
-    Fetch all candidates with their profile info.
+    Fetch candidates with their profile info, one page at a time:
+    {"candidates": [...], "total", "total_is_estimate", "next_cursor"}.
+    Takes the same query params as GET /candidates.
     """
     try:
-        candidates = Candidate.query.all()
-        enriched = [c.to_dict() for c in candidates]
-
-        return jsonify({
-            "total": len(enriched),
-            "candidates": enriched
-        }), 200
+        return list_response(run_list(CANDIDATE_LIST), envelope="candidates"), 200
+    except ListError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching candidates: {e}", exc_info=True)
         return jsonify({"error": "Internal server error"}), 500
@@ -1495,6 +1781,7 @@ def validate_participants(participants):
 
 
 @admin_bp.route('/meetings', methods=['GET'])
+@query_budget(3)
 @role_required(["admin", "hiring_manager"])
 def get_meetings():
     """Get all meetings with filtering and pagination"""
@@ -1505,7 +1792,7 @@ def get_meetings():
         search = request.args.get('search', '', type=str)
         
         # Base query
-        query = Meeting.query
+        query = Meeting.query.options(*MEETING_DICT)
         
         # Apply filters
         if search:
@@ -1566,7 +1853,7 @@ def get_meetings():
 def get_meeting(meeting_id):
     """Get a specific meeting"""
     try:
-        meeting = Meeting.query.get_or_404(meeting_id)
+        meeting = Meeting.query.options(*MEETING_DICT).get_or_404(meeting_id)
         return jsonify(meeting.to_dict()), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching meeting {meeting_id}: {str(e)}")
@@ -1651,19 +1938,10 @@ def create_meeting():
         db.session.add(meeting)
         db.session.commit()
 
-        # Send email notifications (if enabled)
+        # Send email notifications (if enabled); outcomes are recorded on meeting.email_status
         if participants and current_app.config.get('SEND_MEETING_EMAILS', True):
             try:
-                for participant in participants:
-                    EmailService.send_meeting_invitation(
-                        email=participant,
-                        meeting_title=title,
-                        meeting_date=start_time,
-                        meeting_description=description,
-                        meeting_link=meeting_link,
-                        location=location,
-                        organizer_id=user_id
-                    )
+                EmailService.send_meeting_invitations(meeting)
             except Exception as e:
                 current_app.logger.warning(f"Failed to send meeting invite emails: {e}")
                 # Don't fail the request if emails fail
@@ -1791,13 +2069,7 @@ def cancel_meeting(meeting_id):
         # Send cancellation emails
         if meeting.participants and current_app.config.get('SEND_MEETING_EMAILS', True):
             try:
-                for participant in meeting.participants:
-                    EmailService.send_meeting_cancellation(
-                        email=participant,
-                        meeting_title=meeting.title,
-                        meeting_date=meeting.start_time,
-                        cancellation_reason="Meeting cancelled by organizer"
-                    )
+                EmailService.send_meeting_cancellations(meeting, reason="Meeting cancelled by organizer")
             except Exception as e:
                 current_app.logger.warning(f"Failed to send meeting cancellation emails: {e}")
 
@@ -1810,6 +2082,45 @@ def cancel_meeting(meeting_id):
         return jsonify({"error": "Internal server error"}), 500
 
 
+@admin_bp.route('/meetings/<int:meeting_id>/resend-emails', methods=['POST'])
+@role_required(["admin", "hiring_manager"])
+def resend_meeting_emails(meeting_id):
+    """
+    Resend the meeting's invitation (or cancellation, if cancelled) to
+    participants whose last delivery failed, or to the given recipients.
+    Body (optional): {"recipients": ["a@example.com"]}
+    """
+    meeting = Meeting.query.get_or_404(meeting_id)
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json(silent=True) or {}
+
+        kind = "cancellation" if meeting.cancelled else "invitation"
+        status = meeting.email_status or {}
+        recipients = data.get("recipients") or [
+            email for email, s in status.items()
+            if s.get("kind") == kind and s.get("status") == "failed"
+        ]
+        recipients = [r for r in recipients if r in (meeting.participants or [])]
+        if not recipients:
+            return jsonify({"message": "No failed recipients to resend to", "recipients": []}), 200
+
+        if meeting.cancelled:
+            EmailService.send_meeting_cancellations(meeting, reason="Meeting cancelled by organizer", recipients=recipients)
+        else:
+            EmailService.send_meeting_invitations(meeting, recipients=recipients)
+
+        AuditService.record_action(
+            admin_id=user_id, action="resend_meeting_emails",
+            details=f"Resent {kind} for meeting '{meeting.title}' to {len(recipients)} recipient(s)"
+        )
+        return jsonify({"message": f"Resending {kind} emails", "recipients": recipients}), 202
+
+    except Exception as e:
+        current_app.logger.error(f"Error resending emails for meeting {meeting_id}: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @admin_bp.route('/meetings/<int:meeting_id>', methods=['DELETE'])
 @role_required(["admin", "hiring_manager"])
 def delete_meeting(meeting_id):
@@ -2,6 +2,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import get_jwt_identity
 from app.utils.decorators import role_required
+from app.utils.rate_limit import identity_key, configured
+from app.extensions import limiter
 from app.services.ai_parser_service import analyse_resume_gemini
 from app.extensions import db, cloudinary_client
 from app.models import CVAnalysis, Conversation, Candidate, User
@@ -14,6 +16,7 @@ ai_bp = Blueprint("ai_bp", __name__, url_prefix="/api/ai")
 
 
 @ai_bp.route("/chat", methods=["POST"])
+@limiter.limit(configured("RATELIMIT_AI_CHAT", "20 per minute"), key_func=identity_key)
 def chat():
     """
     Public chat endpoint (optionally require auth if desired).
@@ -58,6 +61,7 @@ def chat():
 
 
 @ai_bp.route("/parse_cv", methods=["POST"])
+@limiter.limit(configured("RATELIMIT_PARSE_CV", "5 per minute"), key_func=identity_key)
 @role_required(["candidate"])
 def parse_cv():
     """
@@ -120,14 +124,9 @@ def parse_cv():
 
     # Notify admins
     try:
-        from app.models import User as UserModel, Notification
-        admins = UserModel.query.filter_by(role="admin").all()
-        for admin in admins:
-            n = Notification(user_id=admin.id, message=f"{user.email} performed CV analysis for a job.")
-            db.session.add(n)
-        db.session.commit()
+        from app.services.notification_service import notify_admins
+        notify_admins(f"{user.email} performed CV analysis for a job.")
     except Exception:
-        db.session.rollback()
         logger.exception("Failed to create admin notifications")
 
     return jsonify({
@@ -8,12 +8,19 @@ from flask_jwt_extended import (
     get_jwt_identity
 )
 from app.extensions import db, oauth, limiter, validator
-from app.models import User, VerificationCode, OAuthConnection, Candidate
+from app.models import User
 from app.services.auth_service import AuthService
+from app.services.user_repository import UserRepository
+from app.services.provisioning_service import ProvisioningService
+from app.services.oidc_metadata import oidc_metadata, CachedOIDCApp
+from app.services.verification_store import verification_store, VERIFIED, LOCKED
+from app.services.password_hasher import HashingBusyError, busy_response
 from app.services.email_service import EmailService
 from app.services.audit2 import AuditService
 from app.utils.decorators import role_required
-from datetime import datetime, timedelta
+from app.utils.rate_limit import email_key, configured
+from app.utils.session_profile import get_session_profile, project, etag_for
+from datetime import timedelta
 import secrets
 import jwt  # ← ADD THIS IMPORT
 
@@ -31,6 +38,8 @@ ROLE_DASHBOARD_MAP = {
     "candidate": "/dashboard/candidate"
 }
 
+GOOGLE_METADATA_URL = "https://accounts.google.com/.well-known/openid-configuration"
+
 # OAuth providers config
 OAUTH_PROVIDERS = {
     "google": {
@@ -59,11 +68,13 @@ def init_auth_routes(app):
         oauth.init_app(app)
 
         # Google OAuth
+        oidc_metadata.watch(GOOGLE_METADATA_URL)
         oauth.register(
             name="google",
             client_id=app.config["GOOGLE_CLIENT_ID"],
             client_secret=app.config["GOOGLE_CLIENT_SECRET"],
-            server_metadata_url="https://accounts.google.com/.well-known/openid-configuration",
+            server_metadata_url=GOOGLE_METADATA_URL,
+            client_cls=CachedOIDCApp,
             client_kwargs={"scope": "openid email profile"},
             userinfo_endpoint=OAUTH_PROVIDERS["google"]["userinfo"]["url"]
         )
@@ -112,21 +123,9 @@ def init_auth_routes(app):
             if not full_name:
                 full_name = email.split('@')[0]  # Use email username as fallback
         
-            # Find user in our database
-            user = User.query.filter(db.func.lower(User.email) == email.lower()).first()
-        
-            # If user doesn't exist, create them automatically
-            if not user:
-                random_password = secrets.token_urlsafe(16)
-                user = AuthService.create_user(
-                    email=email,
-                    password=random_password,
-                    first_name=first_name,
-                    last_name=last_name,
-                    role=role
-                )
-                user.is_verified = True
-                db.session.commit()
+            # Find or create the user in one statement
+            user = ProvisioningService.provision(email, first_name, last_name, role=role)
+            if user.created:
                 current_app.logger.info(f"Auto-created user via SSO: {email}")
         
             # Create JWT tokens for our app
@@ -137,7 +136,7 @@ def init_auth_routes(app):
             # Determine dashboard URL
             dashboard_path = (
                 "/enrollment"
-                if user.role == "candidate" and not getattr(user, "enrollment_completed", False)
+                if user.role == "candidate" and not user.enrollment_completed
                 else ROLE_DASHBOARD_MAP.get(user.role, "/dashboard")
             )
         
@@ -242,30 +241,12 @@ def init_auth_routes(app):
             first_name = provider_config["userinfo"]["first_name"](user_info)
             last_name = provider_config["userinfo"]["last_name"](user_info)
 
-            # User lookup / creation
-            user = User.query.filter(db.func.lower(User.email) == email).first()
-            if not user:
-                random_password = secrets.token_urlsafe(16)
-                user = AuthService.create_user(
-                    email=email,
-                    password=random_password,
-                    first_name=first_name,
-                    last_name=last_name,
-                    role="candidate"
-                )
-                user.is_verified = True
-
-            # OAuth connection
-            oauth_conn = OAuthConnection.query.filter_by(user_id=user.id, provider=provider).first()
-            if not oauth_conn:
-                oauth_conn = OAuthConnection(
-                    user_id=user.id,
-                    provider=provider,
-                    provider_user_id=str(user_info.get("id") or user_info.get("sub")),
-                    access_token=secrets.token_urlsafe(32)
-                )
-                db.session.add(oauth_conn)
-            db.session.commit()
+            # User and OAuth connection, upserted in one transaction
+            user = ProvisioningService.provision(
+                email, first_name, last_name,
+                provider=provider,
+                provider_user_id=str(user_info.get("id") or user_info.get("sub"))
+            )
 
             # Tokens
             additional_claims = {"role": user.role}
@@ -275,7 +256,7 @@ def init_auth_routes(app):
             # ✅ Determine dashboard route safely (fixed)
             dashboard_path = (
                 "/enrollment"
-                if user.role == "candidate" and not getattr(user, "enrollment_completed", False)
+                if user.role == "candidate" and not user.enrollment_completed
                 else ROLE_DASHBOARD_MAP.get(user.role, "/dashboard")
             )
 
@@ -302,6 +283,7 @@ def init_auth_routes(app):
     # ------------------- REGISTER -------------------
     @app.route('/api/auth/register', methods=['POST'])
     @limiter.limit("5 per minute")  # Add this line - stricter for registration
+    @limiter.limit("3 per hour", key_func=email_key)
     def register():
         try:
             data = request.get_json()
@@ -324,17 +306,12 @@ def init_auth_routes(app):
                 return jsonify({'error': 'Missing required fields'}), 400
 
             email = email.strip().lower()
-            if User.query.filter(db.func.lower(User.email) == email).first():
+            if UserRepository.exists(email):
                 return jsonify({'error': 'User already exists'}), 409
 
             user = AuthService.create_user(email, password, first_name, last_name, role)
 
-            code = f"{secrets.randbelow(1000000):06d}"
-            expires_at = datetime.utcnow() + timedelta(minutes=30)
-            VerificationCode.query.filter_by(email=email, is_used=False).delete()
-            verification_code = VerificationCode(email=email, code=code, expires_at=expires_at)
-            db.session.add(verification_code)
-            db.session.commit()
+            code = verification_store.issue(email)
 
             EmailService.send_verification_email(email, code)
             AuditService.log(user_id=user.id, action="register")
@@ -344,6 +321,9 @@ def init_auth_routes(app):
                 'user_id': user.id
             }), 201
 
+        except HashingBusyError:
+            db.session.rollback()
+            return busy_response()
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f'Registration error: {str(e)}', exc_info=True)
@@ -352,6 +332,7 @@ def init_auth_routes(app):
     # ------------------- VERIFY EMAIL -------------------
     @app.route('/api/auth/verify', methods=['POST'])
     @limiter.limit("10 per minute")  # Add this line
+    @limiter.limit("10 per 15 minutes", key_func=email_key)  # code guessing across IPs
     def verify_email():
         try:
             data = request.get_json()
@@ -361,13 +342,13 @@ def init_auth_routes(app):
                 return jsonify({'error': 'Email and code are required'}), 400
             email = email.strip().lower()
 
-            verification_code = VerificationCode.query.filter_by(email=email, code=code, is_used=False)\
-                .order_by(VerificationCode.created_at.desc()).first()
-            if not verification_code or not verification_code.is_valid():
+            result = verification_store.verify(email, code)
+            if result == LOCKED:
+                return jsonify({'error': 'Too many attempts. Please request a new verification code.'}), 429
+            if result != VERIFIED:
                 return jsonify({'error': 'Invalid or expired verification code'}), 400
 
-            verification_code.is_used = True
-            user = User.query.filter(db.func.lower(User.email) == email).first()
+            user = UserRepository.get_by_email(email)
             if not user:
                 return jsonify({'error': 'User not found'}), 404
 
@@ -398,6 +379,7 @@ def init_auth_routes(app):
     # ------------------- LOGIN -------------------
     @app.route('/api/auth/login', methods=['POST'])
     @limiter.limit("10 per minute")  # Add this line
+    @limiter.limit(configured("RATELIMIT_LOGIN_PER_EMAIL", "5 per minute"), key_func=email_key)
     def login():
         try:
             data = request.get_json()
@@ -409,10 +391,10 @@ def init_auth_routes(app):
                 return jsonify({'error': 'Email and password are required'}), 400
 
             email = email.strip().lower()
-            user = User.query.filter(db.func.lower(User.email) == email).first()
+            user = UserRepository.get_by_email(email)
 
             # ---- Invalid credentials ----
-            if not user or not AuthService.verify_password(password, user.password):
+            if not user or not AuthService.verify_and_upgrade(user, password):
                 return jsonify({'error': 'Invalid credentials'}), 401
 
             # ---- Handle unverified user ----
@@ -463,6 +445,9 @@ def init_auth_routes(app):
                 'dashboard': dashboard_url
             }), 200
 
+        except HashingBusyError:
+            db.session.rollback()
+            return busy_response()
         except Exception as e:
             current_app.logger.error(f'Login error: {str(e)}', exc_info=True)
             return jsonify({'error': 'Internal server error'}), 500  # 🆕 Changed from 200 to 500
@@ -498,6 +483,7 @@ def init_auth_routes(app):
     # ------------------- FORGOT & RESET PASSWORD -------------------
     @app.route('/api/auth/forgot-password', methods=['POST'])
     @limiter.limit("5 per minute")  # Add this line - stricter to prevent abuse
+    @limiter.limit("3 per hour", key_func=email_key)
     def forgot_password():
         try:
             data = request.get_json()
@@ -506,7 +492,7 @@ def init_auth_routes(app):
                 return jsonify({'error': 'Email is required'}), 400
 
             email = email.strip().lower()
-            user = User.query.filter(db.func.lower(User.email) == email).first()
+            user = UserRepository.get_by_email(email)
             if user:
                 reset_token = AuthService.generate_password_reset_token(user.id)
                 EmailService.send_password_reset_email(email, reset_token)
@@ -543,6 +529,9 @@ def init_auth_routes(app):
 
             return jsonify({'message': 'Password reset successfully'}), 200
 
+        except HashingBusyError:
+            db.session.rollback()
+            return busy_response()
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f'Password reset error: {str(e)}', exc_info=True)
@@ -553,42 +542,37 @@ def init_auth_routes(app):
     @jwt_required()
     @limiter.limit("60 per minute")  # Add this line - more lenient for frequent use
     def get_current_user():
+        """
+        Compact session profile for the signed-in user.
+        ?fields=role,user.email,candidate_profile.full_name limits the response;
+        If-None-Match with the previous ETag returns 304 when nothing changed.
+        """
         try:
-            current_user_id = int(get_jwt_identity())
-            user = User.query.get(current_user_id)
-            if not user:
+            profile = get_session_profile(get_jwt_identity())
+            if not profile:
                 return jsonify({"error": "User not found"}), 404
 
-            # Get candidate profile if user is a candidate
-            candidate_profile = Candidate.query.filter_by(user_id=user.id).first()
-            if candidate_profile:
-                candidate_profile = candidate_profile.to_dict()
+            user = profile["user"]
+            dashboard_url = "/enrollment" if user["role"] == "candidate" and not user["enrollment_completed"] \
+                else ROLE_DASHBOARD_MAP.get(user["role"], "/dashboard")
 
-            dashboard_url = "/enrollment" if user.role == "candidate" and not user.enrollment_completed \
-                else ROLE_DASHBOARD_MAP.get(user.role, "/dashboard")
+            response_data = {"user": user, "role": user["role"], "dashboard": dashboard_url}
+            if profile["candidate_profile"]:
+                response_data["candidate_profile"] = profile["candidate_profile"]
+
+            fields = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip()]
+            response_data = project(response_data, fields)
 
-            AuditService.log(user_id=user.id, action="get_current_user")
-
-            response_data = {
-                "user": {
-                    # User table fields only
-                    "id": user.id,
-                    "email": user.email,
-                    "role": user.role,
-                    "enrollment_completed": user.enrollment_completed,
-                    "created_at": user.created_at.isoformat() if user.created_at else None,
-                    # 🆕 ADD THIS - Include the JSON profile column
-                    "profile": user.profile or {}
-                },
-                "role": user.role,
-                "dashboard": dashboard_url
-            }
-    
-            # Add full candidate profile data if available
-            if candidate_profile:
-                response_data["candidate_profile"] = candidate_profile
-
-            return jsonify(response_data), 200
+            etag = etag_for(response_data)
+            if request.if_none_match.contains(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(jsonify(response_data), 200)
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "private, no-cache"
+            response.vary.add("Authorization")
+            response.vary.add("Cookie")
+            return response
 
         except Exception as e:
             current_app.logger.error(f"Get current user error: {str(e)}", exc_info=True)
@@ -670,7 +654,7 @@ def init_auth_routes(app):
             email = email.strip().lower()
 
             # ---- Check if user already exists ----
-            user = User.query.filter(db.func.lower(User.email) == email).first()
+            user = UserRepository.get_by_email(email)
             if user:
                 return jsonify({"message": f"User with email {email} already exists", "user_id": user.id}), 200
 
@@ -704,6 +688,9 @@ def init_auth_routes(app):
                 "user_id": user.id,
             }), 201
 
+        except HashingBusyError:
+            db.session.rollback()
+            return busy_response()
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Admin enroll error: {str(e)}", exc_info=True)
@@ -751,6 +738,9 @@ def init_auth_routes(app):
 
             return jsonify({"message": "Password changed successfully", "role": user.role}), 200
 
+        except HashingBusyError:
+            db.session.rollback()
+            return busy_response()
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"Change password error: {str(e)}", exc_info=True)
@@ -2,18 +2,26 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from app.extensions import db, cloudinary_client
 from werkzeug.security import check_password_hash, generate_password_hash
-from app.extensions import bcrypt
+from app.extensions import limiter
+from app.utils.rate_limit import identity_key, configured
 import cloudinary.uploader
 from app.models import (
-    User, Candidate, Requisition, Application, AssessmentResult, Notification, AuditLog
+    User, Candidate, Requisition, Application, AssessmentResult, AuditLog
 )
 from datetime import datetime
+from sqlalchemy.orm import undefer_group
 from werkzeug.utils import secure_filename
 
 from app.services.cv_parser_service import HybridResumeAnalyzer
 from app.utils.decorators import role_required
-from app.utils.helper import get_current_candidate
+from app.utils.helper import get_current_candidate, encode_cursor, decode_cursor
+from app.utils.listing import ListSpec, Field, ListError, run_list, list_response, parse_datetime
 from app.services.audit2 import AuditService
+from app.services.auth_service import AuthService
+from app.services.password_hasher import HashingBusyError, busy_response
+from app.services.notification_service import (
+    notify_admins, get_inbox, get_unread_count, mark_notifications_read
+)
 import fitz
 
 
@@ -78,34 +86,49 @@ def apply_job(job_id):
 
 
 # ----------------- GET AVAILABLE JOBS -----------------
+AVAILABLE_JOB_LIST = ListSpec(
+    Requisition,
+    fields={
+        "id": None,
+        "title": Field("title", get=lambda j: j.title or ""),
+        "description": Field("description", get=lambda j: j.description or ""),
+        "responsibilities": Field("responsibilities", get=lambda j: j.responsibilities or []),
+        "qualifications": Field("qualifications", get=lambda j: j.qualifications or []),
+        "required_skills": Field("required_skills", get=lambda j: j.required_skills or []),
+        "min_experience": Field("min_experience", get=lambda j: j.min_experience or 0),
+        "knockout_rules": Field("knockout_rules", get=lambda j: j.knockout_rules or []),
+        "weightings": Field("weightings", get=lambda j: j.weightings or {"cv": 60, "assessment": 40}),
+        "assessment_pack": Field("assessment_pack", get=lambda j: j.assessment_pack or {"questions": []}),
+        "company_details": Field("company_details", get=lambda j: j.company_details or ""),
+        "category": Field("category", get=lambda j: j.category or ""),
+        "published_on": Field("published_on", get=lambda j: j.published_on.strftime("%d %b, %Y") if j.published_on else ""),
+        "vacancy": Field("vacancy", get=lambda j: str(j.vacancy or 0)),
+        "created_by": None,
+    },
+    sorts={"created_at": (Requisition.created_at, datetime)},
+    default_sort="-created_at",
+    filters={
+        "category": lambda v: Requisition.category == v,
+        "created_after": lambda v: Requisition.created_at >= parse_datetime(v),
+    },
+)
+
+
 @candidate_bp.route("/jobs", methods=["GET"])
 @role_required(["candidate"])
 def get_available_jobs():
+    """
+    One page of jobs, newest first (plain list; X-Next-Cursor / X-Total-Count headers).
+    Query params: limit, cursor, sort, fields, count, category, created_after.
+    """
     try:
         # Get the candidate's user ID from JWT
         user_id = get_jwt_identity()
 
-        jobs = Requisition.query.all()
-        result = []
-
-        for job in jobs:
-            result.append({
-                "id": job.id,
-                "title": job.title or "",
-                "description": job.description or "",
-                "responsibilities": job.responsibilities or [],
-                "qualifications": job.qualifications or [],
-                "required_skills": job.required_skills or [],
-                "min_experience": job.min_experience or 0,
-                "knockout_rules": job.knockout_rules or [],
-                "weightings": job.weightings or {"cv": 60, "assessment": 40},
-                "assessment_pack": job.assessment_pack or {"questions": []},
-                "company_details": job.company_details or "",
-                "category": job.category or "",
-                "published_on": job.published_on.strftime("%d %b, %Y") if job.published_on else "",
-                "vacancy": str(job.vacancy or 0),
-                "created_by": job.created_by
-            })
+        try:
+            page = run_list(AVAILABLE_JOB_LIST)
+        except ListError as e:
+            return jsonify({"error": str(e)}), 400
 
         # Audit log (candidate viewed jobs)
         AuditService.record_action(
@@ -115,7 +138,7 @@ def get_available_jobs():
             details="Retrieved list of available jobs"
         )
 
-        return jsonify(result), 200
+        return list_response(page), 200
 
     except Exception as e:
         current_app.logger.error(f"Get available jobs error: {e}", exc_info=True)
@@ -124,6 +147,7 @@ def get_available_jobs():
 
 # ----------------- UPLOAD RESUME -----------------
 @candidate_bp.route("/upload_resume/<int:application_id>", methods=["POST"])
+@limiter.limit(configured("RATELIMIT_UPLOAD_RESUME", "10 per minute"), key_func=identity_key)
 @role_required(["candidate"])
 def upload_resume(application_id):
     try:
@@ -168,14 +192,7 @@ def upload_resume(application_id):
         db.session.commit()
 
         # --- Notify admins ---
-        admins = User.query.filter_by(role="admin").all()
-        for admin in admins:
-            notif = Notification(
-                user_id=admin.id,
-                message=f"{candidate.full_name} submitted resume for {job.title}."
-            )
-            db.session.add(notif)
-        db.session.commit()
+        notify_admins(f"{candidate.full_name} submitted resume for {job.title}.")
         
         # Audit log
         AuditService.record_action(
@@ -352,7 +369,7 @@ def submit_assessment(application_id):
 @role_required(["candidate", "admin", "hiring_manager"])
 def get_profile():
     try:
-        candidate = get_current_candidate()
+        candidate = get_current_candidate(full=True)
         if not candidate:
             return jsonify({"success": False, "message": "Candidate not found"}), 404
 
@@ -374,7 +391,7 @@ def get_profile():
 @role_required(["candidate", "admin", "hiring_manager"])
 def update_profile():
     try:
-        candidate = get_current_candidate()
+        candidate = get_current_candidate(full=True)
 
         # Auto-create candidate if missing but user exists
         if not candidate:
@@ -611,8 +628,8 @@ def change_password():
                 "message": "Both current and new passwords are required."
             }), 400
 
-        # Verify password using bcrypt
-        if not bcrypt.check_password_hash(user.password, current_pw):
+        # Verify password using bcrypt (on the hashing worker pool)
+        if not AuthService.verify_password(current_pw, user.password):
             return jsonify({
                 "success": False,
                 "message": "Incorrect current password."
@@ -626,7 +643,7 @@ def change_password():
             }), 400
 
         # Update password
-        user.password = bcrypt.generate_password_hash(new_pw).decode('utf-8')
+        user.password = AuthService.hash_password(new_pw)
         db.session.commit()  # commit password change first
 
         # Log audit using the shorthand
@@ -642,6 +659,9 @@ def change_password():
             "message": "Password updated successfully."
         }), 200
 
+    except HashingBusyError:
+        db.session.rollback()
+        return busy_response()
     except Exception as e:
         current_app.logger.error(f"Change password error: {e}", exc_info=True)
         db.session.rollback()
@@ -716,27 +736,73 @@ def get_settings():
 @jwt_required()
 def get_candidate_notifications():
     """
-    Get all notifications for the current candidate
-    Returns: List of notification objects (matching your Flutter service expectation)
+    Get one page of notifications for the current candidate, newest first.
+    Returns: List of notification objects (matching your Flutter service expectation).
+    Query params: limit (default 50, max 200), cursor, unread_only.
+    The next page cursor and the unread count are sent as X-Next-Cursor / X-Unread-Count headers.
     """
     try:
         current_user_id = get_jwt_identity()
-        
-        # Get all notifications for the user, ordered by most recent first
-        notifications = Notification.query.filter_by(
-            user_id=current_user_id
-        ).order_by(Notification.created_at.desc()).all()
-        
-        # Convert to list of dictionaries using your existing to_dict method
-        notifications_data = [notification.to_dict() for notification in notifications]
-        
+        limit = max(1, min(request.args.get("limit", 50, type=int), 200))
+        unread_only = request.args.get("unread_only", "false").lower() == "true"
+
+        cursor = None
+        if request.args.get("cursor"):
+            try:
+                cursor = decode_cursor(request.args["cursor"], datetime, int)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+
+        notifications, next_cursor = get_inbox(
+            current_user_id, limit=limit, cursor=cursor, unread_only=unread_only
+        )
+
         # Return the list directly (matching your Flutter service expectation)
-        return jsonify(notifications_data), 200
-        
+        response = jsonify([notification.to_dict() for notification in notifications])
+        response.headers["X-Unread-Count"] = str(get_unread_count(current_user_id))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = encode_cursor(*next_cursor)
+        return response, 200
+
     except Exception as e:
         current_app.logger.error(f"Get notifications error: {str(e)}")
         return jsonify({'error': f'Failed to fetch notifications: {str(e)}'}), 500
 
+
+@candidate_bp.route('/notifications/unread-count', methods=['GET'])
+@jwt_required()
+def get_candidate_unread_count():
+    return jsonify({"unread_count": get_unread_count(get_jwt_identity())}), 200
+
+
+@candidate_bp.route('/notifications/mark-read', methods=['POST'])
+@jwt_required()
+def mark_candidate_notifications_read():
+    """
+    Mark notifications as read in one update.
+    Body: {"ids": [1, 2, 3]} or {"all": true}
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json() or {}
+
+        if data.get("all"):
+            ids = None
+        else:
+            ids = data.get("ids")
+            if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+                return jsonify({'error': 'Provide "ids" as a list of integers or "all": true'}), 400
+
+        updated = mark_notifications_read(current_user_id, ids)
+        return jsonify({
+            "updated": updated,
+            "unread_count": get_unread_count(current_user_id)
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Mark notifications read error: {str(e)}")
+        return jsonify({'error': 'Failed to mark notifications as read'}), 500
+
 # ----------------- SAVE APPLICATION DRAFT -----------------
 @candidate_bp.route("/applications/<int:application_id>/draft", methods=["POST"])
 @role_required(["candidate"])
@@ -811,7 +877,8 @@ def get_application_drafts():
         if not candidate:
             return jsonify([]), 200
 
-        drafts = Application.query.filter_by(candidate_id=candidate.id, is_draft=True).all()
+        drafts = Application.query.options(undefer_group("large"))\
+            .filter_by(candidate_id=candidate.id, is_draft=True).all()
 
         draft_list = []
         for d in drafts:
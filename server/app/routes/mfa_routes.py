@@ -3,10 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_tok
 from app.models import db, User
 from app.services.auth_service import AuthService
 from app.services.audit2 import AuditService
-from io import BytesIO
-import pyotp
-import qrcode
-import base64
+from app.services.mfa_service import MFAService
 from datetime import timedelta
 
 mfa_bp = Blueprint('mfa', __name__)
@@ -30,31 +27,19 @@ def enable_mfa():
         if user.mfa_enabled:
             return jsonify({'error': 'MFA is already enabled'}), 400
 
-        # Generate TOTP secret using AuthService
-        secret = AuthService.generate_mfa_secret()
-        user.mfa_secret = secret
-        user.mfa_verified = False
-        db.session.commit()
-
-        # Generate otpauth URL for authenticator apps
-        totp = pyotp.TOTP(secret)
-        otpauth_url = totp.provisioning_uri(name=user.email, issuer_name=current_app.config.get('APP_NAME', 'MyApp'))
-
-        # Generate QR code
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(otpauth_url)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        qr_code_base64 = base64.b64encode(buffered.getvalue()).decode()
+        # Secret + QR code, rendered once per secret and reused until verified
+        setup = MFAService.get_or_create_setup(
+            user,
+            issuer_name=current_app.config.get('APP_NAME', 'MyApp'),
+            fmt=request.args.get('format', 'png')
+        )
 
         AuditService.log(user_id=user.id, action="mfa_enable_initiated")
 
         return jsonify({
-            'secret': secret,
-            'qr_code': f"data:image/png;base64,{qr_code_base64}",
-            'otpauth_url': otpauth_url
+            'secret': setup['secret'],
+            'qr_code': setup['qr_code'],
+            'otpauth_url': setup['uri']
         }), 200
 
     except Exception as e:
@@ -80,13 +65,14 @@ def verify_mfa_setup():
             return jsonify({'error': 'MFA is already enabled'}), 400
 
         # Use AuthService to enable MFA
-        if AuthService.enable_mfa_for_user(user, user.mfa_secret, token):
-            unused_codes = AuthService.get_remaining_backup_codes(user)
+        backup_codes = AuthService.enable_mfa_for_user(user, user.mfa_secret, token)
+        if backup_codes:
+            MFAService.clear_setup(user.id)
             AuditService.log(user_id=user.id, action="mfa_enabled")
             
             return jsonify({
                 'message': 'MFA enabled successfully',
-                'backup_codes': unused_codes
+                'backup_codes': backup_codes
             }), 200
         else:
             AuditService.log(user_id=user.id, action="mfa_verification_failed")
@@ -126,6 +112,10 @@ def mfa_login():
         result = AuthService.validate_mfa_login(user, token)
         if not result['success']:
             AuditService.log(user_id=user.id, action="mfa_login_failed")
+            if result.get('locked_for'):
+                response = jsonify({'error': result['error'], 'retry_after': result['locked_for']})
+                response.headers['Retry-After'] = str(result['locked_for'])
+                return response, 429
             return jsonify({'error': result['error']}), 400
 
         # Create final JWT tokens
@@ -174,6 +164,7 @@ def disable_mfa():
         
         # Use AuthService to disable MFA
         if AuthService.disable_mfa_for_user(user, password):
+            MFAService.clear_setup(user.id)
             AuditService.log(user_id=user.id, action="mfa_disabled")
             return jsonify({'message': 'MFA disabled successfully'}), 200
         else:
@@ -196,8 +187,12 @@ def get_backup_codes():
         if not user.mfa_enabled:
             return jsonify({'error': 'MFA is not enabled'}), 400
 
-        unused_codes = AuthService.get_remaining_backup_codes(user)
-        return jsonify({'backup_codes': unused_codes}), 200
+        # Codes are stored hashed and are only shown when generated
+        return jsonify({
+            'backup_codes': [],
+            'backup_codes_remaining': AuthService.count_remaining_backup_codes(user),
+            'message': 'Backup codes are only shown once. Regenerate to get a new set.'
+        }), 200
 
     except Exception as e:
         current_app.logger.error(f"Get backup codes error: {str(e)}")
@@ -214,12 +209,12 @@ def regenerate_backup_codes():
         if not user.mfa_enabled:
             return jsonify({'error': 'MFA is not enabled'}), 400
 
-        if AuthService.regenerate_backup_codes(user):
-            unused_codes = AuthService.get_remaining_backup_codes(user)
+        backup_codes = AuthService.regenerate_backup_codes(user)
+        if backup_codes:
             AuditService.log(user_id=user.id, action="mfa_backup_codes_regenerated")
             return jsonify({
                 'message': 'Backup codes regenerated successfully',
-                'backup_codes': unused_codes
+                'backup_codes': backup_codes
             }), 200
         else:
             return jsonify({'error': 'Failed to regenerate backup codes'}), 500
@@ -237,12 +232,10 @@ def mfa_status():
         current_user_id = get_jwt_identity()
         user = User.query.get(current_user_id)
         
-        unused_codes = AuthService.get_remaining_backup_codes(user)
-        
         return jsonify({
             'mfa_enabled': user.mfa_enabled,
             'mfa_verified': user.mfa_verified,
-            'backup_codes_remaining': len(unused_codes)
+            'backup_codes_remaining': AuthService.count_remaining_backup_codes(user)
         }), 200
 
     except Exception as e:
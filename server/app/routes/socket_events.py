@@ -0,0 +1,59 @@
+# app/routes/socket_events.py
+from flask import request, current_app
+from flask_jwt_extended import decode_token
+from flask_socketio import join_room, disconnect
+from app.extensions import socketio
+from app.models import User
+from app.services.notification_service import user_room, role_room
+
+
+def _token_from_handshake(auth):
+    """JWT from the Socket.IO auth payload, the Authorization header or ?access_token=."""
+    if isinstance(auth, dict) and auth.get("token"):
+        return auth["token"]
+
+    header = request.headers.get("Authorization", "")
+    if header.lower().startswith("bearer "):
+        return header[7:]
+
+    return request.args.get("access_token")
+
+
+# ------------------- CONNECT -------------------
+@socketio.on("connect")
+def handle_connect(auth=None):
+    """
+    Authenticate the socket with the user's access token and join the
+    per-user and per-role rooms. Unauthenticated connections are rejected,
+    so events are only ever delivered to the rooms they are addressed to.
+    """
+    token = _token_from_handshake(auth)
+    if not token:
+        return False
+
+    try:
+        claims = decode_token(token)
+    except Exception as e:
+        current_app.logger.info(f"Socket connection rejected: {e}")
+        return False
+
+    if claims.get("type") != "access" or claims.get("mfa_pending"):
+        return False
+
+    user_id = claims.get("sub")
+    role = claims.get("role")
+    if not role:
+        user = User.query.get(int(user_id))
+        if not user:
+            return False
+        role = user.role
+
+    join_room(user_room(user_id))
+    join_room(role_room(role))
+    current_app.logger.debug(f"Socket connected: user {user_id} ({role})")
+
+
+@socketio.on_error_default
+def handle_socket_error(e):
+    current_app.logger.error(f"Socket.IO handler error: {e}", exc_info=True)
+    disconnect()
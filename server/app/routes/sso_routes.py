@@ -2,11 +2,10 @@
 from flask import Blueprint, current_app, jsonify, url_for, redirect, request, session
 from flask_jwt_extended import create_access_token, create_refresh_token
 from app.extensions import db, oauth
-from app.models import User, OAuthConnection, Candidate
 from app.services.audit2 import AuditService
-from app.services.auth_service import AuthService
+from app.services.provisioning_service import ProvisioningService
+from app.services.oidc_metadata import oidc_metadata, CachedOIDCApp
 import secrets
-import requests
 import urllib.parse
 import traceback
 
@@ -23,24 +22,17 @@ FRONTEND_URL = "http://localhost:3000"  # Update for production
 
 # ------------------- Configuration Validation -------------------
 def validate_sso_config(app):
-    """Validate all required SSO configuration is present and metadata URL accessible."""
+    """
+    Validate all required SSO configuration is present. The metadata URL is
+    not fetched here; oidc_metadata loads it from disk and refreshes it in the
+    background so a slow IdP never delays startup.
+    """
     required_configs = ["SSO_CLIENT_ID", "SSO_CLIENT_SECRET", "SSO_METADATA_URL"]
     missing = [config for config in required_configs if not app.config.get(config)]
     if missing:
         app.logger.error(f"Missing SSO configuration: {missing}")
         return False
 
-    metadata_url = app.config["SSO_METADATA_URL"]
-    try:
-        resp = requests.get(metadata_url, timeout=10)
-        if resp.status_code != 200:
-            app.logger.error(f"SSO metadata URL not accessible: {metadata_url} - Status: {resp.status_code}")
-            return False
-        app.logger.info("SSO metadata URL is accessible")
-    except Exception as e:
-        app.logger.error(f"Failed to access SSO metadata URL: {str(e)}")
-        return False
-
     return True
 
 
@@ -67,8 +59,11 @@ def register_sso_provider(app):
             app.logger.error("SSO config invalid. Skipping registration.")
             return False
 
+        oidc_metadata.watch(app.config["SSO_METADATA_URL"])
+
         oauth.register(
             name="keycloak",
+            client_cls=CachedOIDCApp,
             client_id=app.config["SSO_CLIENT_ID"],
             client_secret=app.config["SSO_CLIENT_SECRET"],
             server_metadata_url=app.config["SSO_METADATA_URL"],
@@ -129,48 +124,12 @@ def sso_callback():
         last_name = user_info.get("family_name", "")
         sso_id = user_info.get("sub")
 
-        # ----- Lookup or create user -----
-        user = User.query.filter(db.func.lower(User.email) == email).first()
-        user_created = False
-
-        if not user:
-            random_password = secrets.token_urlsafe(16)
-            user = AuthService.create_user(email=email, password=random_password, role="candidate")
-            user.profile = {"first_name": first_name, "last_name": last_name}
-            user.is_verified = True
-            db.session.commit()
-            user_created = True
-        else:
-            profile = user.profile or {}
-            profile.setdefault("first_name", first_name)
-            profile.setdefault("last_name", last_name)
-            user.profile = profile
-            db.session.commit()
-
-        # ----- Ensure Candidate record exists -----
-        candidate = Candidate.query.filter_by(user_id=user.id).first()
-        if not candidate:
-            candidate = Candidate(user_id=user.id)
-            db.session.add(candidate)
-            db.session.commit()
-            current_app.logger.info(f"Created missing candidate for SSO user id {user.id}")
-
-        # ----- OAuth connection record -----
-        oauth_conn = OAuthConnection.query.filter_by(user_id=user.id, provider="sso").first()
-        if not oauth_conn:
-            oauth_conn = OAuthConnection(
-                user_id=user.id,
-                provider="sso",
-                provider_user_id=sso_id,
-                access_token=secrets.token_urlsafe(32)
-            )
-            db.session.add(oauth_conn)
-            db.session.commit()
-
-        # ----- Generate JWT with all roles -----
-        roles = [user.role]
-        if Candidate.query.filter_by(user_id=user.id).first() and "candidate" not in roles:
-            roles.append("candidate")
+        # ----- Upsert user, candidate and SSO connection (one transaction) -----
+        user = ProvisioningService.provision(
+            email, first_name, last_name,
+            provider="sso", provider_user_id=sso_id, ensure_candidate=True
+        )
+        user_created = user.created
 
         # ------------------- JWT Tokens -------------------
         # Match the regular login JWT format: single 'role' string
@@ -180,9 +139,10 @@ def sso_callback():
 
 
         # ----- Determine dashboard path -----
+        # Every SSO user has a candidate row, so enrollment comes first
         dashboard_path = (
             "/enrollment"
-            if "candidate" in roles and not getattr(user, "enrollment_completed", False)
+            if not user.enrollment_completed
             else ROLE_DASHBOARD_MAP.get(user.role, "/dashboard")
         )
         if dashboard_path.startswith("/api/"):
@@ -204,7 +164,7 @@ def sso_callback():
             "role": user.role,
             "first_name": user.profile.get("first_name"),
             "last_name": user.profile.get("last_name"),
-            "enrollment_completed": getattr(user, "enrollment_completed", False),
+            "enrollment_completed": user.enrollment_completed,
             "dashboard": dashboard_path
         }
 
@@ -229,11 +189,8 @@ def sso_status():
         }
 
         if status["configured"]:
-            try:
-                resp = requests.get(status["metadata_url"], timeout=5)
-                status["metadata_accessible"] = resp.status_code == 200
-            except:
-                status["metadata_accessible"] = False
+            status["metadata_cache"] = oidc_metadata.status(status["metadata_url"])
+            status["metadata_accessible"] = status["metadata_cache"]["cached"]
 
         return jsonify(status), 200
     except Exception:
@@ -245,12 +202,11 @@ def sso_status():
 def sso_logout():
     try:
         # Keycloak logout endpoint from provider metadata
-        metadata_url = current_app.config.get("SSO_METADATA_URL")
-        if not metadata_url:
-            return jsonify({"error": "Missing SSO metadata URL"}), 500
+        if "keycloak" not in oauth._clients:
+            return jsonify({"error": "SSO not configured"}), 500
 
-        # Fetch provider end_session_endpoint dynamically
-        metadata = requests.get(metadata_url).json()
+        # Served from the OIDC metadata cache
+        metadata = oauth.keycloak.load_server_metadata()
         end_session_endpoint = metadata.get("end_session_endpoint")
 
         if not end_session_endpoint:
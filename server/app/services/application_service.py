@@ -0,0 +1,228 @@
+import logging
+from sqlalchemy import update, tuple_, and_, or_
+from app.extensions import db
+from app.models import Application, Candidate, Requisition, User
+from app.services.audit2 import AuditService
+from app.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+# ------------------- Status state machine -------------------
+# status -> statuses an application may move to from there. These are the
+# statuses the app already uses: draft / applied / assessment_submitted are
+# set by the candidate flow, reviewed / recommended by scoring and analytics,
+# approved / rejected drive application_status_update.html, and interview /
+# hired are what the Flutter screens display.
+APPLICATION_TRANSITIONS = {
+    "draft": {"applied"},
+    "applied": {"reviewed", "recommended", "approved", "rejected"},
+    "assessment_submitted": {"reviewed", "recommended", "approved", "rejected"},
+    "reviewed": {"recommended", "approved", "rejected"},
+    "recommended": {"approved", "interview", "hired", "rejected"},
+    "approved": {"interview", "hired", "rejected"},
+    "interview": {"hired", "rejected"},
+    "hired": set(),
+    "rejected": set(),
+}
+
+APPLICATION_STATUSES = set(APPLICATION_TRANSITIONS)
+
+
+def can_transition(from_status, to_status):
+    # Rows created before the column had a default have status NULL; they
+    # are treated as "applied" here and matched with IS NULL when updated.
+    if from_status is None:
+        from_status = "applied"
+    return to_status in APPLICATION_TRANSITIONS.get(from_status, set())
+
+
+class ApplicationService:
+
+    @staticmethod
+    def select_for_transition(application_ids=None, requisition_id=None, status=None,
+                              min_score=None, max_score=None, top=None):
+        """
+        Resolve the target applications (explicit ids or a filter) with the
+        data needed to validate and notify them, in one joined query.
+        min_score and max_score are both inclusive bounds on overall_score.
+        """
+        query = (
+            db.session.query(
+                Application.id,
+                Application.status,
+                Application.overall_score,
+                Application.is_draft,
+                Candidate.id.label("candidate_id"),
+                Candidate.full_name,
+                User.id.label("user_id"),
+                User.email,
+                Requisition.title.label("position_title"),
+            )
+            .outerjoin(Candidate, Candidate.id == Application.candidate_id)
+            .outerjoin(User, User.id == Candidate.user_id)
+            .outerjoin(Requisition, Requisition.id == Application.requisition_id)
+        )
+
+        if application_ids is not None:
+            query = query.filter(Application.id.in_(application_ids))
+        if requisition_id is not None:
+            query = query.filter(Application.requisition_id == requisition_id)
+        if status is not None:
+            query = query.filter(Application.status == status)
+        if min_score is not None:
+            query = query.filter(Application.overall_score >= min_score)
+        if max_score is not None:
+            query = query.filter(Application.overall_score <= max_score)
+
+        query = query.order_by(Application.overall_score.desc().nullslast(), Application.id)
+        if top is not None:
+            query = query.limit(top)
+        return query.all()
+
+    @staticmethod
+    def cv_review_query(requisition_id=None, statuses=None, min_score=None, max_score=None):
+        """
+        The CV review queue as one joined query: application scores, the
+        candidate's name and CV link, and only the skills / education /
+        work_experience keys of cv_parser_result (extracted by PostgreSQL, so
+        the rest of the parser output never leaves the database).
+        Unordered; callers add the keyset order and limit.
+        """
+        parsed = Application.cv_parser_result
+        query = (
+            db.session.query(
+                Application.id,
+                Application.status,
+                Application.resume_url,
+                Application.cv_score,
+                Application.recommendation,
+                Application.assessment_score,
+                Application.overall_score,
+                parsed["skills"].label("parsed_skills"),
+                parsed["education"].label("parsed_education"),
+                parsed["work_experience"].label("parsed_work_experience"),
+                Candidate.id.label("candidate_id"),
+                Candidate.full_name,
+                Candidate.cv_url,
+            )
+            .outerjoin(Candidate, Candidate.id == Application.candidate_id)
+        )
+
+        if requisition_id is not None:
+            query = query.filter(Application.requisition_id == requisition_id)
+        if statuses:
+            query = query.filter(Application.status.in_(statuses))
+        if min_score is not None:
+            query = query.filter(Application.cv_score >= min_score)
+        if max_score is not None:
+            query = query.filter(Application.cv_score <= max_score)
+        return query
+
+    @staticmethod
+    def cv_review_dict(row):
+        return {
+            "application_id": row.id,
+            "status": row.status,
+            "resume_url": row.resume_url,
+            "cv_score": row.cv_score,
+            "cv_parser_result": {
+                "skills": row.parsed_skills or [],
+                "education": row.parsed_education or [],
+                "work_experience": row.parsed_work_experience or [],
+            },
+            "application_recommendation": row.recommendation,
+            "assessment_score": row.assessment_score,
+            "overall_score": row.overall_score,
+
+            "candidate_id": row.candidate_id,
+            "full_name": row.full_name,
+            "cv_url": row.cv_url,
+        }
+
+    @staticmethod
+    def bulk_transition(admin_id, to_status, rows, requested_ids=None, dry_run=False, notify=True):
+        """
+        Move the selected applications to `to_status`.
+
+        Every row is checked against APPLICATION_TRANSITIONS; valid ones are
+        updated with one UPDATE (each guarded on the status it was checked
+        against, so a row changed concurrently is skipped), audited in bulk and notified with
+        one batched email job. With dry_run nothing is written.
+        """
+        eligible, skipped = [], []
+        for row in rows:
+            if row.is_draft and to_status != "applied":
+                skipped.append({"id": row.id, "status": row.status, "reason": "application is still a draft"})
+            elif row.status == to_status:
+                skipped.append({"id": row.id, "status": row.status, "reason": "already in this status"})
+            elif not can_transition(row.status, to_status):
+                skipped.append({"id": row.id, "status": row.status,
+                                "reason": f"cannot move from '{row.status}' to '{to_status}'"})
+            else:
+                eligible.append(row)
+
+        if requested_ids is not None:
+            found = {row.id for row in rows}
+            skipped.extend({"id": i, "status": None, "reason": "not found"} for i in requested_ids if i not in found)
+
+        result = {
+            "to_status": to_status,
+            "dry_run": dry_run,
+            "eligible": [{"id": r.id, "from_status": r.status, "email": r.email} for r in eligible],
+            "skipped": skipped,
+            "updated": [],
+        }
+        if dry_run or not eligible:
+            return result
+
+        # Each row is guarded on the status it was validated against, so one
+        # that moved on concurrently (even to another allowed status) is left alone
+        guards = []
+        with_status = [(r.id, r.status) for r in eligible if r.status is not None]
+        without_status = [r.id for r in eligible if r.status is None]
+        if with_status:
+            guards.append(tuple_(Application.id, Application.status).in_(with_status))
+        if without_status:
+            guards.append(and_(Application.id.in_(without_status), Application.status.is_(None)))
+
+        try:
+            updated_ids = {
+                row.id for row in db.session.execute(
+                    update(Application)
+                    .where(or_(*guards))
+                    .values(status=to_status)
+                    .returning(Application.id)
+                )
+            }
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        updated = [r for r in eligible if r.id in updated_ids]
+        result["updated"] = [r.id for r in updated]
+        skipped.extend(
+            {"id": r.id, "status": r.status, "reason": "status changed concurrently"}
+            for r in eligible if r.id not in updated_ids
+        )
+
+        AuditService.record_actions(admin_id, "bulk_update_application_status", [
+            {
+                "target_user_id": r.user_id,
+                "details": f"Application {r.id}: {r.status} -> {to_status}",
+                "extra_data": {"application_id": r.id, "from_status": r.status, "to_status": to_status},
+            }
+            for r in updated
+        ])
+
+        if notify:
+            recipients = [r for r in updated if r.email]
+            result["emails_queued"] = len(recipients)
+            if recipients:
+                EmailService.send_application_status_updates([
+                    {"email": r.email, "candidate_name": r.full_name, "position_title": r.position_title}
+                    for r in recipients
+                ], to_status)
+
+        logger.info(f"Admin {admin_id} moved {len(updated)} application(s) to '{to_status}'")
+        return result
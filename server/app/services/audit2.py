@@ -1,11 +1,28 @@
 import logging
 from datetime import datetime
 from flask import request
-from app.extensions import db
 from app.models import AuditLog
+from app.services.audit_writer import audit_writer
+from app.services.audit_policy import audit_policy, CATEGORY_SECURITY, CATEGORY_READ
 
 logger = logging.getLogger(__name__)
 
+# Length of each bounded string column (action, ip_address, user_agent, ...);
+# longer values are clipped so one oversized header can't fail a whole batch.
+_COLUMN_LENGTHS = {
+    column.name: column.type.length
+    for column in AuditLog.__table__.columns
+    if getattr(column.type, "length", None)
+}
+
+
+def _clip(row: dict) -> dict:
+    for name, length in _COLUMN_LENGTHS.items():
+        value = row.get(name)
+        if isinstance(value, str) and len(value) > length:
+            row[name] = value[:length]
+    return row
+
 
 class AuditService:
     @staticmethod
@@ -14,43 +31,85 @@ class AuditService:
         action: str,
         target_user_id: int = None,
         details: str = None,
-        extra_data: dict = None  # <-- renamed
+        extra_data: dict = None,  # <-- renamed
+        category: str = None,
+        severity: str = None
     ):
         """
         Log an action performed by an admin or system process.
         Automatically captures IP and User-Agent from request.
+        The entry is handed to the background audit writer, so this never
+        touches (or commits) the caller's db.session.
+
+        Category and severity are derived from the action name unless given.
+        Security events are always written in full; read events are counted
+        and only a configurable sample is written individually.
         """
         try:
+            default_category, default_severity = audit_policy.classify(action)
+            category = category or default_category
+            severity = severity or default_severity
+
+            if category == CATEGORY_READ:
+                for summary in audit_policy.count(action, admin_id):
+                    audit_writer.submit(summary)
+
+            if not audit_policy.should_sample(action, category):
+                return
+
             ip_address = request.remote_addr if request else None
             user_agent = request.headers.get("User-Agent", "") if request else None
 
-            log_entry = AuditLog(
-                admin_id=admin_id,
-                action=action,
-                target_user_id=target_user_id,
-                details=details,
-                extra_data=extra_data,  # <-- use correct field name
-                ip_address=ip_address,
-                user_agent=user_agent,
-                timestamp=datetime.utcnow()
-            )
-
-            db.session.add(log_entry)
-            db.session.commit()
-            logger.info(f"Audit recorded: {action} by admin_id={admin_id}")
+            audit_writer.submit(_clip({
+                "admin_id": admin_id,
+                "action": action,
+                "target_user_id": target_user_id,
+                "details": details,
+                "extra_data": extra_data,  # <-- use correct field name
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "category": category,
+                "severity": severity,
+                "timestamp": datetime.utcnow()
+            }), critical=category == CATEGORY_SECURITY)
+            logger.debug(f"Audit queued: {action} by admin_id={admin_id}")
 
         except Exception as e:
-            db.session.rollback()
             logger.error(f"Failed to record audit log: {e}", exc_info=True)
 
+    @staticmethod
+    def record_actions(admin_id: int, action: str, entries: list, category: str = None, severity: str = None):
+        """
+        Record the same action against many targets (e.g. a bulk status change).
+        `entries` are dicts with optional target_user_id, details and extra_data;
+        each goes through record_action, and the audit writer inserts them in
+        one batch.
+        """
+        for entry in entries:
+            AuditService.record_action(
+                admin_id=admin_id,
+                action=action,
+                target_user_id=entry.get("target_user_id"),
+                details=entry.get("details"),
+                extra_data=entry.get("extra_data"),
+                category=category,
+                severity=severity
+            )
+
     @staticmethod
     def log(user_id: int, action: str, **kwargs):
         """
         Alias for record_action for backward compatibility.
         Maps old 'metadata' kwarg to 'extra_data'.
         """
-        extra_data = kwargs.get("metadata")  # support old calls
-        AuditService.record_action(admin_id=user_id, action=action, extra_data=extra_data)
+        extra_data = kwargs.get("metadata", kwargs.get("extra_data"))  # support old calls
+        AuditService.record_action(
+            admin_id=user_id,
+            action=action,
+            target_user_id=kwargs.get("target_user_id"),
+            details=kwargs.get("details"),
+            extra_data=extra_data
+        )
 
 
 # === Helper Decorators (Optional Integration) ===
@@ -72,7 +131,7 @@ def audit_action(action_description: str):
                 AuditService.record_action(
                     admin_id=admin_id,
                     action=action_description,
-                    metadata={"endpoint": request.path, "method": request.method}
+                    extra_data={"endpoint": request.path, "method": request.method}
                 )
             except Exception as e:
                 logger.warning(f"Audit decorator failed: {e}")
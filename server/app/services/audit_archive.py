@@ -0,0 +1,123 @@
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.extensions import db
+from app.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+def _month_start(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(dt: datetime) -> datetime:
+    return (dt.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+class AuditArchiveService:
+    """
+    Retention for the audit_logs table.
+
+    The live table only keeps recent months. Whole calendar months older than
+    the retention window are exported to gzip-compressed NDJSON files (one per
+    month) and then deleted, so the indexed hot table stays small.
+    """
+
+    @staticmethod
+    def archive_path(archive_dir: str, month: datetime) -> str:
+        """Return a file path for the month that does not overwrite an earlier export."""
+        base = os.path.join(archive_dir, f"audit_logs_{month:%Y_%m}")
+        path = f"{base}.ndjson.gz"
+        n = 1
+        while os.path.exists(path):
+            path = f"{base}.{n}.ndjson.gz"
+            n += 1
+        return path
+
+    @staticmethod
+    def archive_month(month: datetime, archive_dir: str, batch_size: int = 5000) -> dict:
+        """
+        Export one calendar month of audit logs to a compressed file and delete
+        the exported rows. Rows are streamed in id order so memory stays flat.
+        """
+        start, end = month, _next_month(month)
+        os.makedirs(archive_dir, exist_ok=True)
+        path = AuditArchiveService.archive_path(archive_dir, month)
+        tmp_path = f"{path}.tmp"
+
+        query = AuditLog.query.filter(
+            AuditLog.timestamp >= start,
+            AuditLog.timestamp < end
+        ).order_by(AuditLog.id)
+
+        count = 0
+        max_id = None
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as fh:
+            for log in query.yield_per(batch_size):
+                fh.write(json.dumps(log.to_dict(), default=str))
+                fh.write("\n")
+                count += 1
+                max_id = log.id
+
+        if not count:
+            os.remove(tmp_path)
+            return {"month": f"{month:%Y-%m}", "archived": 0, "file": None}
+
+        os.replace(tmp_path, path)
+
+        try:
+            AuditLog.query.filter(
+                AuditLog.timestamp >= start,
+                AuditLog.timestamp < end,
+                AuditLog.id <= max_id
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.error(f"Archived {path} but failed to delete rows; they will be exported again next run", exc_info=True)
+            raise
+
+        logger.info(f"Archived {count} audit logs for {month:%Y-%m} to {path}")
+        return {"month": f"{month:%Y-%m}", "archived": count, "file": path}
+
+    @staticmethod
+    def archive_expired(retention_days: int = None, archive_dir: str = None) -> list:
+        """Archive every whole month that ends before the retention cutoff."""
+        retention_days = retention_days or current_app.config.get("AUDIT_RETENTION_DAYS", 180)
+        archive_dir = archive_dir or current_app.config.get("AUDIT_ARCHIVE_DIR", "archives/audit_logs")
+
+        cutoff = _month_start(datetime.utcnow() - timedelta(days=retention_days))
+        oldest = db.session.query(db.func.min(AuditLog.timestamp)).scalar()
+        if not oldest or oldest >= cutoff:
+            return []
+
+        results = []
+        month = _month_start(oldest)
+        while month < cutoff:
+            results.append(AuditArchiveService.archive_month(month, archive_dir))
+            month = _next_month(month)
+        return results
+
+
+# ------------------- CLI -------------------
+audit_cli = click.Group("audit", help="Audit log maintenance.")
+
+
+@audit_cli.command("archive")
+@click.option("--days", type=int, default=None, help="Retention window in days (default: AUDIT_RETENTION_DAYS).")
+@click.option("--dir", "archive_dir", default=None, help="Output directory (default: AUDIT_ARCHIVE_DIR).")
+@with_appcontext
+def archive_command(days, archive_dir):
+    """Move audit logs older than the retention window to compressed monthly files."""
+    results = AuditArchiveService.archive_expired(days, archive_dir)
+    if not results:
+        click.echo("Nothing to archive.")
+    for r in results:
+        click.echo(f"{r['month']}: {r['archived']} rows -> {r['file']}")
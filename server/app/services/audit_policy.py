@@ -0,0 +1,148 @@
+import atexit
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# ------------------- Categories & Severities -------------------
+CATEGORY_SECURITY = "security"
+CATEGORY_ACTIVITY = "activity"
+CATEGORY_READ = "read"
+
+SEVERITY_HIGH = "high"
+SEVERITY_MEDIUM = "medium"
+SEVERITY_LOW = "low"
+
+CATEGORY_SEVERITY = {
+    CATEGORY_SECURITY: SEVERITY_HIGH,
+    CATEGORY_ACTIVITY: SEVERITY_MEDIUM,
+    CATEGORY_READ: SEVERITY_LOW,
+}
+
+# Substrings (matched case-insensitively) that mark an action as security-relevant.
+SECURITY_MARKERS = (
+    "login", "logout", "mfa", "password", "delete", "deactivat",
+    "register", "sso_", "verified", "role", "enroll_",
+)
+
+# Substrings that mark a high-frequency read event.
+READ_MARKERS = ("viewed", "view_", "get_", "refresh_token")
+
+
+class AuditPolicy:
+    """
+    Decides how much of each audit event is persisted.
+
+    - security events (login, MFA, password changes, deletes, ...) are always
+      written in full and are never sampled or dropped;
+    - read events are folded into per-action counters that are written as a
+      single summary row every AUDIT_AGGREGATE_INTERVAL seconds, plus an
+      optional sample of the individual events;
+    - everything else is written in full unless a per-action sample rate is set.
+    """
+
+    def __init__(self, app=None):
+        self.sample_rates = {}
+        self.read_sample_rate = 0.0
+        self.aggregate_interval = 60.0
+
+        self._counters = {}
+        self._window_start = time.monotonic()
+        self._window_started_at = datetime.utcnow()
+        self._lock = threading.Lock()
+        self._registered = False
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.sample_rates = dict(app.config.get("AUDIT_SAMPLE_RATES", {}))
+        self.read_sample_rate = app.config.get("AUDIT_READ_SAMPLE_RATE", 0.0)
+        self.aggregate_interval = app.config.get("AUDIT_AGGREGATE_INTERVAL", 60.0)
+        app.extensions["audit_policy"] = self
+
+        if not self._registered:
+            # Registered after the writer, so atexit runs this flush first.
+            atexit.register(self.flush_counters)
+            self._registered = True
+
+    # ------------------- Classification -------------------
+    @staticmethod
+    def classify(action: str):
+        """Return (category, severity) for an action name."""
+        name = (action or "").lower()
+        if any(marker in name for marker in SECURITY_MARKERS):
+            category = CATEGORY_SECURITY
+        elif any(marker in name for marker in READ_MARKERS):
+            category = CATEGORY_READ
+        else:
+            category = CATEGORY_ACTIVITY
+        return category, CATEGORY_SEVERITY[category]
+
+    def should_sample(self, action: str, category: str) -> bool:
+        """Whether this individual event should be written in full."""
+        if category == CATEGORY_SECURITY:
+            return True
+        default = self.read_sample_rate if category == CATEGORY_READ else 1.0
+        rate = self.sample_rates.get(action, default)
+        return rate >= 1.0 or random.random() < rate
+
+    # ------------------- Aggregation -------------------
+    def count(self, action: str, admin_id=None) -> list:
+        """
+        Count a read event. Returns any summary rows that became due, which
+        the caller should hand to the audit writer.
+        """
+        with self._lock:
+            counter = self._counters.setdefault(action, {"count": 0, "users": set()})
+            counter["count"] += 1
+            if admin_id is not None:
+                counter["users"].add(str(admin_id))
+
+            if time.monotonic() - self._window_start < self.aggregate_interval:
+                return []
+            return self._drain_locked()
+
+    def flush_counters(self) -> list:
+        """Write out the current counters immediately (used on shutdown)."""
+        from app.services.audit_writer import audit_writer
+
+        with self._lock:
+            rows = self._drain_locked()
+        for row in rows:
+            audit_writer.submit(row)
+        return rows
+
+    def _drain_locked(self) -> list:
+        now = datetime.utcnow()
+        rows = [
+            {
+                "admin_id": None,
+                "action": action,
+                "target_user_id": None,
+                "details": f"{c['count']} events aggregated",
+                "extra_data": {
+                    "aggregated": True,
+                    "count": c["count"],
+                    "unique_users": len(c["users"]),
+                    "window_start": self._window_started_at.isoformat(),
+                    "window_end": now.isoformat(),
+                },
+                "ip_address": None,
+                "user_agent": None,
+                "category": CATEGORY_READ,
+                "severity": CATEGORY_SEVERITY[CATEGORY_READ],
+                "timestamp": now,
+            }
+            for action, c in self._counters.items()
+        ]
+        self._counters = {}
+        self._window_start = time.monotonic()
+        self._window_started_at = now
+        return rows
+
+
+audit_policy = AuditPolicy()
@@ -0,0 +1,197 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from app.extensions import db
+from app.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+_SHUTDOWN = object()
+
+
+class AuditWriter:
+    """
+    Buffers audit rows in memory and writes them in bulk from a background thread.
+
+    Rows are inserted through the writer's own engine connection, so queuing an
+    audit entry never adds to, flushes or commits the caller's db.session.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = True
+        self.batch_size = 200
+        self.flush_interval = 1.0
+        self.policy = "block"
+        self.block_timeout = 0.5
+        self.dropped = 0
+
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._engine = None
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get("AUDIT_ASYNC_ENABLED", True)
+        self.batch_size = app.config.get("AUDIT_BATCH_SIZE", 200)
+        self.flush_interval = app.config.get("AUDIT_FLUSH_INTERVAL", 1.0)
+        self.policy = app.config.get("AUDIT_QUEUE_POLICY", "block")
+        self.block_timeout = app.config.get("AUDIT_QUEUE_BLOCK_TIMEOUT", 0.5)
+        app.extensions["audit_writer"] = self
+
+        # create_app() may run more than once per process; keep the first buffer.
+        if self._queue is None:
+            self._queue = queue.Queue(maxsize=app.config.get("AUDIT_QUEUE_MAXSIZE", 10000))
+            atexit.register(self.shutdown)
+
+    # ------------------- Public API -------------------
+    def submit(self, row: dict, critical: bool = False) -> bool:
+        """
+        Queue a single audit row (a dict of AuditLog column values).
+        Critical rows are never dropped: if the buffer is full they are written
+        synchronously instead. Returns False if the row was dropped.
+        """
+        if not self.enabled:
+            self._write([row])
+            return True
+
+        self._ensure_started()
+
+        try:
+            if self.policy == "drop":
+                self._queue.put_nowait(row)
+            else:
+                self._queue.put(row, timeout=self.block_timeout)
+            return True
+        except queue.Full:
+            if critical:
+                self._write([row])
+                return True
+            self.dropped += 1
+            logger.warning(f"Audit buffer full; dropped '{row.get('action')}' (total dropped={self.dropped})")
+            return False
+
+    def flush(self, timeout: float = 5.0):
+        """Block until everything queued so far has been written (or timeout)."""
+        if not self._queue:
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def shutdown(self, timeout: float = 5.0):
+        """Drain the buffer and stop the background writer."""
+        thread = self._thread
+        if not thread or not thread.is_alive() or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_SHUTDOWN, timeout=timeout)
+        except queue.Full:
+            logger.error("Audit buffer still full at shutdown; some entries may be lost")
+            return
+        thread.join(timeout)
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    # ------------------- Background writer -------------------
+    def _ensure_started(self):
+        # Threads do not survive a fork, so each gunicorn worker starts its own writer.
+        if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._engine = None
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        running = True
+        while running:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _SHUTDOWN:
+                    running = False
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            # On shutdown, pick up anything enqueued behind the sentinel too.
+            if not running:
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _SHUTDOWN:
+                        self._queue.task_done()
+                    else:
+                        batch.append(item)
+
+            if batch:
+                self._write(batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _get_engine(self):
+        if self._engine is None:
+            with self.app.app_context():
+                self._engine = db.engine
+        return self._engine
+
+    def _write(self, rows: list):
+        """
+        Insert rows with a single executemany on a dedicated connection. If the
+        batch fails, retry the rows one at a time so only the bad ones are lost.
+        """
+        try:
+            with self._get_engine().begin() as conn:
+                conn.execute(AuditLog.__table__.insert(), rows)
+            return
+        except Exception as e:
+            if len(rows) == 1:
+                logger.error(f"Failed to write audit log '{rows[0].get('action')}': {e}", exc_info=True)
+                return
+            logger.warning(f"Batch insert of {len(rows)} audit logs failed ({e}); retrying row by row")
+
+        failed = 0
+        for row in rows:
+            try:
+                with self._get_engine().begin() as conn:
+                    conn.execute(AuditLog.__table__.insert(), [row])
+            except Exception as e:
+                failed += 1
+                logger.error(f"Failed to write audit log '{row.get('action')}': {e}", exc_info=True)
+        if failed:
+            logger.error(f"Dropped {failed} of {len(rows)} audit logs from a failed batch")
+
+
+audit_writer = AuditWriter()
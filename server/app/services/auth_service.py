@@ -1,5 +1,8 @@
-import bcrypt
 from app.extensions import db
+from app.services.password_hasher import password_hasher
+from app.services.user_repository import UserRepository
+from app.services.backup_codes import BackupCodeService
+from app.services.mfa_guard import mfa_guard
 from app.models import User
 from flask import current_app
 import jwt
@@ -7,8 +10,6 @@ from datetime import datetime, timedelta
 from app.extensions import redis_client
 import pyotp
 from flask_jwt_extended import create_access_token, create_refresh_token
-import secrets
-import string
 import logging
 
 
@@ -16,15 +17,32 @@ class AuthService:
 
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash a plain-text password."""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        """Hash a plain-text password (on the bcrypt worker pool)."""
+        return password_hasher.hash(password)
 
     @staticmethod
     def verify_password(password: str, hashed_password: str) -> bool:
-        """Verify a plain-text password against a hash."""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+        """Verify a plain-text password against a hash (on the bcrypt worker pool)."""
+        return password_hasher.verify(password, hashed_password)
+
+    @staticmethod
+    def verify_and_upgrade(user: User, password: str) -> bool:
+        """
+        Verify a login password and, if the stored hash was made with a
+        different BCRYPT_LOG_ROUNDS, re-hash it at the current cost.
+        """
+        if not AuthService.verify_password(password, user.password):
+            return False
+
+        if password_hasher.needs_rehash(user.password):
+            try:
+                user.password = AuthService.hash_password(password)
+                db.session.commit()
+                password_hasher.record_rehash()
+            except Exception as e:
+                db.session.rollback()
+                logging.warning(f"Password rehash failed for user {user.id}: {e}")
+        return True
 
     @staticmethod
     def create_user(email: str, password: str, first_name: str, last_name: str, role: str = 'candidate') -> User:
@@ -43,13 +61,18 @@ class AuthService:
             db.session.rollback()
             current_app.logger.error(f'Failed to create user: {str(e)}', exc_info=True)
             raise e
+
+        if role != 'candidate':
+            # New admin / hiring manager must start receiving role fan-out notifications
+            from app.services.notification_service import invalidate_recipient_cache
+            invalidate_recipient_cache()
         return user
 
     @staticmethod
     def validate_user_credentials(email: str, password: str):
         """Return user if credentials are valid."""
-        user = User.query.filter(db.func.lower(User.email) == email.strip().lower()).first()
-        if user and AuthService.verify_password(password, user.password):
+        user = UserRepository.get_by_email(email)
+        if user and AuthService.verify_and_upgrade(user, password):
             return user
         return None
 
@@ -155,27 +178,16 @@ class AuthService:
 
     @staticmethod
     def generate_backup_codes(count: int = 10) -> list:
-        """Generate backup codes for MFA recovery."""
-        codes = []
-        for _ in range(count):
-            code = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(10))
-            codes.append({'code': code, 'used': False})
-        return codes
+        """Generate backup codes for MFA recovery (plaintext; store via BackupCodeService)."""
+        return BackupCodeService.generate(count)
 
     @staticmethod
     def verify_backup_code(user: User, token: str) -> bool:
         """
         Verify if token is a valid backup code.
-        Marks the code as used if valid.
+        Marks the code as used if valid (committed with the caller's transaction).
         """
-        if not user.mfa_backup_codes:
-            return False
-
-        for code_data in user.mfa_backup_codes:
-            if not code_data['used'] and code_data['code'] == token:
-                code_data['used'] = True
-                return True
-        return False
+        return BackupCodeService.consume(user.id, token)
 
     @staticmethod
     def create_mfa_session_token(user_id: int, role: str) -> str:
@@ -193,54 +205,65 @@ class AuthService:
     def validate_mfa_login(user: User, token: str) -> dict:
         """
         Validate MFA token during login.
-        Returns dict with success status and backup code usage info.
+        Returns dict with success status and backup code usage info; a locked
+        out user gets "locked_for" (seconds) instead of a check.
         """
         if not user.mfa_enabled:
             return {"success": False, "error": "MFA not enabled"}
 
+        locked_for = mfa_guard.locked_for(user.id)
+        if locked_for:
+            return {"success": False, "error": "Too many failed MFA attempts", "locked_for": locked_for}
+
         # Check if it's a backup code first
         is_backup_code = AuthService.verify_backup_code(user, token)
         
         if is_backup_code:
+            mfa_guard.record_success(user.id)
             return {
                 "success": True, 
                 "is_backup_code": True,
                 "message": "Backup code accepted"
             }
 
-        # Verify as TOTP code
-        if AuthService.verify_totp(user.mfa_secret, token):
+        # Verify as TOTP code; each code is accepted once per user
+        if mfa_guard.verify_totp(user.id, user.mfa_secret, token):
+            mfa_guard.record_success(user.id)
             return {
                 "success": True,
                 "is_backup_code": False,
                 "message": "TOTP code accepted"
             }
 
+        locked_for = mfa_guard.record_failure(user.id)
+        if locked_for:
+            return {"success": False, "error": "Too many failed MFA attempts", "locked_for": locked_for}
         return {
             "success": False, 
             "error": "Invalid MFA code"
         }
 
     @staticmethod
-    def enable_mfa_for_user(user: User, secret: str, verification_token: str) -> bool:
+    def enable_mfa_for_user(user: User, secret: str, verification_token: str):
         """
         Enable MFA for a user after verifying the initial token.
+        Returns the new plaintext backup codes (shown once), or None on failure.
         """
-        if not AuthService.verify_totp(secret, verification_token):
-            return False
+        if not mfa_guard.verify_totp(user.id, secret, verification_token):
+            return None
 
         user.mfa_secret = secret
         user.mfa_enabled = True
         user.mfa_verified = True
-        user.mfa_backup_codes = AuthService.generate_backup_codes()
+        codes = BackupCodeService.replace_codes(user.id)
         
         try:
             db.session.commit()
-            return True
+            return codes
         except Exception as e:
             db.session.rollback()
             logging.error(f"Failed to enable MFA for user {user.id}: {e}")
-            return False
+            return None
 
     @staticmethod
     def disable_mfa_for_user(user: User, password: str) -> bool:
@@ -253,7 +276,7 @@ class AuthService:
         user.mfa_enabled = False
         user.mfa_verified = False
         user.mfa_secret = None
-        user.mfa_backup_codes = None
+        BackupCodeService.clear(user.id)
         
         try:
             db.session.commit()
@@ -264,20 +287,18 @@ class AuthService:
             return False
 
     @staticmethod
-    def get_remaining_backup_codes(user: User) -> list:
-        """Get list of unused backup codes."""
-        if not user.mfa_backup_codes:
-            return []
-        return [c['code'] for c in user.mfa_backup_codes if not c['used']]
+    def count_remaining_backup_codes(user: User) -> int:
+        """Number of unused backup codes (the codes themselves are not recoverable)."""
+        return BackupCodeService.remaining(user.id)
 
     @staticmethod
-    def regenerate_backup_codes(user: User) -> bool:
-        """Regenerate all backup codes for a user."""
-        user.mfa_backup_codes = AuthService.generate_backup_codes()
+    def regenerate_backup_codes(user: User):
+        """Replace all backup codes for a user; returns the new plaintext codes or None."""
+        codes = BackupCodeService.replace_codes(user.id)
         try:
             db.session.commit()
-            return True
+            return codes
         except Exception as e:
             db.session.rollback()
             logging.error(f"Failed to regenerate backup codes for user {user.id}: {e}")
-            return False
\ No newline at end of file
+            return None
@@ -0,0 +1,114 @@
+import hashlib
+import hmac
+import secrets
+import string
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
+from app.extensions import db
+from app.models import MFABackupCode
+
+CODE_ALPHABET = string.ascii_uppercase + string.digits
+CODE_LENGTH = 10
+
+
+class BackupCodeService:
+    """
+    MFA recovery codes stored as one hashed row each.
+
+    A code is looked up by (user_id, code_hash) through the unique index, so
+    checking one is a single indexed statement regardless of how many codes
+    the user has. Consuming it is one UPDATE ... WHERE used_at IS NULL, so two
+    concurrent logins with the same code cannot both succeed. Plaintext codes
+    are only ever returned when they are generated.
+    """
+
+    @staticmethod
+    def hash_code(code: str) -> str:
+        secret = current_app.config["SECRET_KEY"].encode()
+        normalised = (code or "").strip().upper().replace("-", "").replace(" ", "")
+        return hmac.new(secret, normalised.encode(), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def generate(count: int = 10) -> list:
+        return [''.join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH)) for _ in range(count)]
+
+    @staticmethod
+    def replace_codes(user_id: int, codes=None, count: int = 10) -> list:
+        """
+        Delete the user's codes and store a new set in the current transaction
+        (the caller commits). Returns the plaintext codes to show once.
+        """
+        codes = codes or BackupCodeService.generate(count)
+        BackupCodeService.clear(user_id)
+        now = datetime.utcnow()
+        db.session.execute(db.insert(MFABackupCode), [
+            {"user_id": user_id, "code_hash": BackupCodeService.hash_code(code), "created_at": now}
+            for code in set(codes)
+        ])
+        return codes
+
+    @staticmethod
+    def consume(user_id: int, code: str) -> bool:
+        """Mark a matching unused code as used; True if one was consumed."""
+        if not code:
+            return False
+        consumed = db.session.execute(
+            db.update(MFABackupCode)
+            .where(
+                MFABackupCode.user_id == user_id,
+                MFABackupCode.code_hash == BackupCodeService.hash_code(code),
+                MFABackupCode.used_at.is_(None),
+            )
+            .values(used_at=datetime.utcnow())
+            .returning(MFABackupCode.id)
+        ).first()
+        return consumed is not None
+
+    @staticmethod
+    def remaining(user_id: int) -> int:
+        return db.session.query(db.func.count(MFABackupCode.id)).filter(
+            MFABackupCode.user_id == user_id,
+            MFABackupCode.used_at.is_(None),
+        ).scalar() or 0
+
+    @staticmethod
+    def clear(user_id: int):
+        db.session.execute(db.delete(MFABackupCode).where(MFABackupCode.user_id == user_id))
+
+
+# ------------------- CLI -------------------
+@click.command("migrate-backup-codes")
+@click.option("--drop-column", is_flag=True, help="Drop users.mfa_backup_codes once migrated.")
+@with_appcontext
+def migrate_backup_codes_command(drop_column):
+    """
+    Hash the unused codes in the old users.mfa_backup_codes JSON column into
+    mfa_backup_codes, then clear (or drop) the column.
+    """
+    columns = {c["name"] for c in inspect(db.engine).get_columns("users")}
+    if "mfa_backup_codes" not in columns:
+        click.echo("users.mfa_backup_codes does not exist; nothing to migrate.")
+        return
+
+    rows = db.session.execute(text(
+        "SELECT id, mfa_backup_codes FROM users WHERE mfa_backup_codes IS NOT NULL"
+    )).all()
+
+    migrated = 0
+    for row in rows:
+        unused = [c["code"] for c in (row.mfa_backup_codes or []) if isinstance(c, dict) and not c.get("used")]
+        if unused:
+            BackupCodeService.replace_codes(row.id, unused)
+            migrated += 1
+
+    if drop_column:
+        db.session.execute(text("ALTER TABLE users DROP COLUMN mfa_backup_codes"))
+    else:
+        db.session.execute(text("UPDATE users SET mfa_backup_codes = NULL WHERE mfa_backup_codes IS NOT NULL"))
+    db.session.commit()
+    click.echo(f"Migrated backup codes for {migrated} user(s); users.mfa_backup_codes "
+               f"{'dropped' if drop_column else 'cleared'}.")
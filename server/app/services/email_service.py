@@ -1,10 +1,20 @@
-from flask import render_template, current_app
-from app.extensions import mail
-from flask_mail import Message
-from threading import Thread
+from datetime import datetime
+from functools import partial
+from flask import current_app
+from sqlalchemy import update, literal
+from sqlalchemy.dialects.postgresql import JSONB
+from app.extensions import db
+from app.models import Meeting
+from app.services.mail_dispatcher import mail_dispatcher
+from app.services.user_repository import UserRepository
+from app.services.template_registry import email_templates
 from app.extensions import redis_client
 import logging
 
+# Marker substituted per recipient after a bulk template has been rendered once
+RECIPIENT_NAME_PLACEHOLDER = "%%RECIPIENT_NAME%%"
+
+
 class EmailService:
 
     @staticmethod
@@ -12,7 +22,7 @@ class EmailService:
         """Send email verification code."""
         subject = "Verify Your Email Address"
         try:
-            html = render_template(
+            html = email_templates.render(
                 'email_templates/verification_email.html', 
                 verification_code=verification_code
             )
@@ -28,7 +38,7 @@ class EmailService:
         subject = "Password Reset Request"
         reset_link = f"http://localhost:3000/reset-password?token={reset_token}"
         try:
-            html = render_template(
+            html = email_templates.render(
                 'email_templates/password_reset_email.html', 
                 reset_link=reset_link
             )
@@ -43,7 +53,7 @@ class EmailService:
         """Send interview invitation email."""
         subject = "Interview Invitation"
         try:
-            html = render_template(
+            html = email_templates.render(
                 'email_templates/interview_invitation.html',
                 candidate_name=candidate_name,
                 interview_date=interview_date,
@@ -61,11 +71,11 @@ class EmailService:
         """Send application status update email."""
         subject = f"Application Update for {position_title or 'your position'}"
         try:
-            html = render_template(
+            # Shared parts are cached per (status, position); only the name varies per candidate
+            html = email_templates.render_personalised(
                 'email_templates/application_status_update.html',
-                candidate_name=candidate_name,
-                status=status,
-                position_title=position_title
+                {"status": status, "position_title": position_title},
+                {"candidate_name": candidate_name}
             )
         except Exception:
             logging.error(f"Failed to render application status update template for {email}", exc_info=True)
@@ -73,13 +83,34 @@ class EmailService:
 
         EmailService.send_async_email(subject, [email], html)
 
+    @staticmethod
+    def send_application_status_updates(recipients, status):
+        """
+        Send the status update email to many candidates as one dispatcher batch.
+        `recipients` are dicts with email, candidate_name and position_title.
+        """
+        messages = []
+        for r in recipients:
+            subject = f"Application Update for {r.get('position_title') or 'your position'}"
+            try:
+                html = email_templates.render_personalised(
+                    'email_templates/application_status_update.html',
+                    {"status": status, "position_title": r.get("position_title")},
+                    {"candidate_name": r.get("candidate_name")}
+                )
+            except Exception:
+                logging.error(f"Failed to render application status update template for {r['email']}", exc_info=True)
+                html = f"Hi {r.get('candidate_name')}, your application for {r.get('position_title')} status is: {status}"
+            messages.append({"subject": subject, "recipients": [r["email"]], "html_body": html})
+        return mail_dispatcher.send_batch(messages)
+
     @staticmethod
     def send_temporary_password(email, password, first_name=None):
         """Send enrollment email with temporary password."""
         subject = "Your Temporary Password"
 
         try:
-            html = render_template(
+            html = email_templates.render(
                 'email_templates/temporary_password.html',
                 password=password,
                 first_name=first_name,
@@ -94,30 +125,9 @@ class EmailService:
         
     @staticmethod
     def send_async_email(subject, recipients, html_body, text_body=None):
-        """Send email in a background thread safely."""
-        from app import create_app
-        app = create_app()
-
-        # Ensure subject is a string
-        subject = str(subject)
-
-        def send_email(app, subject, recipients, html_body, text_body):
-            with app.app_context():
-                try:
-                    msg = Message(
-                        subject=subject,
-                        recipients=recipients,
-                        html=html_body,
-                        body=text_body or "",
-                        sender=app.config['MAIL_USERNAME']
-                    )
-                    mail.send(msg)
-                except Exception as e:
-                    logging.error(f"Failed to send email to {recipients}: {str(e)}", exc_info=True)
-
-        thread = Thread(target=send_email, args=[app, subject, recipients, html_body, text_body])
-        thread.start()
-        
+        """Queue an email on the mail dispatcher; delivery happens on its worker pool."""
+        mail_dispatcher.send(subject, recipients, html_body, text_body=text_body)
+
     @staticmethod
     def send_interview_cancellation(email, candidate_name, interview_date, interview_type, reason=None):
         """
@@ -130,7 +140,7 @@ class EmailService:
         reason_text = reason or "No specific reason provided."
     
         try:
-            html = render_template(
+            html = email_templates.render(
                 'email_templates/interview_cancellation.html',
                 candidate_name=candidate_name,
                 interview_date=interview_date,
@@ -149,7 +159,7 @@ class EmailService:
         """Send interview reschedule notification."""
         subject = "Interview Rescheduled"
         try:
-            html = render_template(
+            html = email_templates.render(
                 "email_templates/interview_reschedule.html",
                 candidate_name=candidate_name,
                 old_time=old_time,
@@ -163,3 +173,127 @@ class EmailService:
 
         EmailService.send_async_email(subject, [email], html)
 
+    # ------------------- Bulk sends -------------------
+    @staticmethod
+    def recipient_names(emails):
+        """Map each address to a display name, using one query for registered users."""
+        lowered = {e.lower(): e for e in emails}
+        names = {}
+        users = UserRepository.get_many_by_email(lowered)
+        for user in users:
+            profile = user.profile or {}
+            name = profile.get("full_name") or f"{profile.get('first_name', '')} {profile.get('last_name', '')}".strip()
+            if name:
+                names[lowered[user.email.lower()]] = name
+        return {e: names.get(e) or e.split("@")[0] for e in emails}
+
+    @staticmethod
+    def send_bulk(subject, template, recipients, context, text_body=None, on_complete=None):
+        """
+        Render `template` once and send a personalised copy to each recipient in
+        a single dispatcher batch (one SMTP connection). `recipient_name` in the
+        template and in `text_body` is filled in per recipient.
+        """
+        recipients = list(dict.fromkeys(recipients))
+        if not recipients:
+            return True
+
+        try:
+            email_templates.render_personalised(template, context, {"recipient_name": ""})
+        except Exception:
+            logging.error(f"Failed to render bulk template {template}", exc_info=True)
+            template = None
+
+        names = EmailService.recipient_names(recipients)
+        messages = [
+            {
+                "subject": subject,
+                "recipients": [email],
+                "html_body": (
+                    email_templates.render_personalised(template, context, {"recipient_name": names[email]})
+                    if template else (text_body or subject).replace(RECIPIENT_NAME_PLACEHOLDER, names[email])
+                ),
+                "text_body": text_body.replace(RECIPIENT_NAME_PLACEHOLDER, names[email]) if text_body else None,
+            }
+            for email in recipients
+        ]
+        return mail_dispatcher.send_batch(messages, on_complete=on_complete)
+
+    @staticmethod
+    def record_meeting_email_results(meeting_id, kind, results):
+        """Merge per-recipient outcomes into meetings.email_status in one UPDATE."""
+        now = datetime.utcnow().isoformat()
+        patch = {
+            email: {"kind": kind, "status": r["status"], "error": r.get("error"), "updated_at": now}
+            for email, r in results.items()
+        }
+        try:
+            db.session.execute(
+                update(Meeting)
+                .where(Meeting.id == meeting_id)
+                .values(email_status=db.func.coalesce(Meeting.email_status, literal({}, JSONB)).op("||")(literal(patch, JSONB)))
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logging.error(f"Failed to record {kind} email results for meeting {meeting_id}", exc_info=True)
+
+    @staticmethod
+    def _send_meeting_batch(meeting, kind, subject, template, context, text_body, recipients):
+        recipients = list(dict.fromkeys(recipients if recipients is not None else (meeting.participants or [])))
+        if not recipients:
+            return []
+
+        EmailService.record_meeting_email_results(
+            meeting.id, kind, {email: {"status": "pending"} for email in recipients}
+        )
+        EmailService.send_bulk(
+            subject, template, recipients, context,
+            text_body=text_body,
+            on_complete=partial(EmailService.record_meeting_email_results, meeting.id, kind)
+        )
+        return recipients
+
+    @staticmethod
+    def send_meeting_invitations(meeting, recipients=None):
+        """Invite the meeting's participants (or just `recipients`) in one batch."""
+        organizer = meeting.organizer
+        organizer_name = None
+        if organizer:
+            organizer_name = EmailService.recipient_names([organizer.email])[organizer.email]
+        meeting_date = meeting.start_time.strftime("%A, %d %B %Y at %H:%M")
+
+        text_body = (
+            f"Hi {RECIPIENT_NAME_PLACEHOLDER},\n\nYou are invited to '{meeting.title}' on {meeting_date}."
+            + (f"\nLocation: {meeting.location}" if meeting.location else "")
+            + (f"\nJoin: {meeting.meeting_link}" if meeting.meeting_link else "")
+        )
+        return EmailService._send_meeting_batch(
+            meeting, "invitation", f"Meeting Invitation: {meeting.title}",
+            "email_templates/meeting_invitation.html",
+            {
+                "meeting_title": meeting.title,
+                "meeting_date": meeting_date,
+                "meeting_description": meeting.description,
+                "meeting_link": meeting.meeting_link,
+                "location": meeting.location,
+                "organizer_name": organizer_name or "The hiring team",
+            },
+            text_body, recipients
+        )
+
+    @staticmethod
+    def send_meeting_cancellations(meeting, reason=None, recipients=None):
+        """Tell the meeting's participants (or just `recipients`) that it was cancelled."""
+        reason_text = reason or "No specific reason provided."
+        meeting_date = meeting.start_time.strftime("%A, %d %B %Y at %H:%M")
+        text_body = (
+            f"Hi {RECIPIENT_NAME_PLACEHOLDER},\n\nThe meeting '{meeting.title}' scheduled for "
+            f"{meeting_date} has been cancelled.\nReason: {reason_text}"
+        )
+        return EmailService._send_meeting_batch(
+            meeting, "cancellation", f"Meeting Cancelled: {meeting.title}",
+            "email_templates/meeting_cancellation.html",
+            {"meeting_title": meeting.title, "meeting_date": meeting_date, "reason": reason_text},
+            text_body, recipients
+        )
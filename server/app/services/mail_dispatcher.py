@@ -0,0 +1,494 @@
+import atexit
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from flask_mail import Message, sanitize_address
+from app.extensions import db
+from app.models import MailOutbox
+
+logger = logging.getLogger(__name__)
+
+_SHUTDOWN = object()
+
+
+class _TokenBucket:
+    """Allows `rate` sends per second on average, with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SMTPSession:
+    """
+    A persistent SMTP connection that is reused across messages and
+    transparently re-established when the server drops it.
+    """
+
+    def __init__(self, config, idle_timeout=60.0):
+        self.config = config
+        self.idle_timeout = idle_timeout
+        self.host = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        cfg = self.config
+        timeout = cfg.get("MAIL_TIMEOUT", 30)
+        if cfg.get("MAIL_USE_SSL"):
+            host = smtplib.SMTP_SSL(cfg["MAIL_SERVER"], cfg["MAIL_PORT"], timeout=timeout)
+        else:
+            host = smtplib.SMTP(cfg["MAIL_SERVER"], cfg["MAIL_PORT"], timeout=timeout)
+        if cfg.get("MAIL_USE_TLS"):
+            host.starttls()
+        if cfg.get("MAIL_USERNAME") and cfg.get("MAIL_PASSWORD"):
+            host.login(cfg["MAIL_USERNAME"], cfg["MAIL_PASSWORD"])
+        return host
+
+    def send(self, msg: Message):
+        """Send a Flask-Mail message over the open connection (connecting if needed)."""
+        if self.host and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+
+        for attempt in (1, 2):
+            if self.host is None:
+                self.host = self._connect()
+            try:
+                self.host.sendmail(
+                    sanitize_address(msg.sender),
+                    [sanitize_address(addr) for addr in msg.send_to],
+                    msg.as_bytes(),
+                    msg.mail_options,
+                    msg.rcpt_options
+                )
+                self._last_used = time.monotonic()
+                return
+            except smtplib.SMTPServerDisconnected:
+                # The provider closed an idle connection; reconnect once.
+                self.host = None
+                if attempt == 2:
+                    raise
+
+    def close(self):
+        if self.host is not None:
+            try:
+                self.host.quit()
+            except Exception:
+                pass
+            self.host = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_permanent_failure(error) -> bool:
+    """5xx replies and refused recipients will not succeed on retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+class MailDispatcher:
+    """
+    Sends email from a bounded pool of worker threads.
+
+    Each worker keeps one SMTP connection open and reuses it for every message
+    it sends; all workers share a token bucket so the provider never sees more
+    than MAIL_RATE_LIMIT messages per second. Messages that fail, or that
+    cannot be queued, are stored in the mail_outbox table and retried with
+    exponential backoff, so nothing is lost across restarts.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = True
+        self.workers = 4
+        self.max_retries = 5
+        self.retry_backoff = 60
+        self.retry_interval = 30.0
+        self.idle_timeout = 60.0
+
+        self._queue = None
+        self._threads = []
+        self._pid = None
+        self._bucket = None
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get("MAIL_ASYNC_ENABLED", True)
+        self.workers = app.config.get("MAIL_WORKERS", 4)
+        self.max_retries = app.config.get("MAIL_MAX_RETRIES", 5)
+        self.retry_backoff = app.config.get("MAIL_RETRY_BACKOFF", 60)
+        self.retry_interval = app.config.get("MAIL_RETRY_INTERVAL", 30.0)
+        self.idle_timeout = app.config.get("MAIL_SMTP_IDLE_TIMEOUT", 60.0)
+        self._bucket = _TokenBucket(app.config.get("MAIL_RATE_LIMIT", 5))
+        app.extensions["mail_dispatcher"] = self
+
+        # create_app() may run more than once per process; keep the first queue.
+        if self._queue is None:
+            self._queue = queue.Queue(maxsize=app.config.get("MAIL_QUEUE_MAXSIZE", 1000))
+            atexit.register(self.shutdown)
+
+    # ------------------- Public API -------------------
+    def send(self, subject, recipients, html_body, text_body=None, sender=None) -> bool:
+        """
+        Queue one email. Never blocks on SMTP; if the queue is full the message
+        goes straight to the outbox. Returns False only if it could not be kept.
+        """
+        job = self._job(subject, recipients, html_body, text_body, sender)
+
+        if not self.enabled:
+            with SMTPSession(self.app.config, self.idle_timeout) as session:
+                return self._deliver(session, job)
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except queue.Full:
+            logger.warning(f"Mail queue full; storing email to {job['recipients']} in the outbox")
+            return self._store(job, "mail queue full", delay=0)
+
+    def send_batch(self, messages, on_complete=None) -> bool:
+        """
+        Queue several emails to be delivered back-to-back over one SMTP
+        connection by a single worker. `messages` are dicts with subject,
+        recipients, html_body and optional text_body/sender.
+
+        `on_complete(results)` is called from the worker inside an app context
+        with {recipient: {"status": "sent" | "failed" | "queued", "error": str | None}}.
+        Failed batch messages are reported rather than put in the outbox, so
+        the caller decides what to retry.
+        """
+        item = {
+            "batch": [
+                self._job(m["subject"], m["recipients"], m["html_body"], m.get("text_body"), m.get("sender"))
+                for m in messages
+            ],
+            "on_complete": on_complete,
+        }
+        if not item["batch"]:
+            return True
+
+        if not self.enabled:
+            with SMTPSession(self.app.config, self.idle_timeout) as session:
+                self._deliver_batch(session, item)
+            return True
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            logger.warning(f"Mail queue full; storing a batch of {len(item['batch'])} email(s) in the outbox")
+            self._store_batch(item, "mail queue full")
+            return False
+
+    def flush(self, timeout: float = 10.0):
+        """Block until everything queued so far has been handled (or timeout)."""
+        if not self._queue:
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def shutdown(self, timeout: float = 10.0):
+        """Stop the workers; anything still queued is written to the outbox."""
+        if self._pid != os.getpid():
+            return
+        for _ in self._threads:
+            try:
+                self._queue.put(_SHUTDOWN, timeout=timeout)
+            except queue.Full:
+                break
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is _SHUTDOWN:
+                pass
+            elif "batch" in job:
+                self._store_batch(job, "not sent before shutdown")
+            else:
+                self._store(job, "not sent before shutdown", delay=0)
+            self._queue.task_done()
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def retry_due(self, limit: int = 100) -> int:
+        """
+        Claim outbox rows whose retry time has come and queue them again.
+        Rows are leased (next_attempt_at pushed forward) in the same
+        transaction, so concurrent processes do not pick up the same email.
+        """
+        with self.app.app_context():
+            now = datetime.utcnow()
+            try:
+                rows = (
+                    MailOutbox.query
+                    .filter(MailOutbox.status == "pending", MailOutbox.next_attempt_at <= now)
+                    .order_by(MailOutbox.next_attempt_at)
+                    .limit(limit)
+                    .with_for_update(skip_locked=True)
+                    .all()
+                )
+                lease = now + timedelta(seconds=max(self.retry_backoff, 60))
+                jobs = []
+                for row in rows:
+                    row.next_attempt_at = lease
+                    jobs.append({
+                        "subject": row.subject,
+                        "recipients": list(row.recipients or []),
+                        "html_body": row.html_body,
+                        "text_body": row.text_body,
+                        "sender": row.sender,
+                        "outbox_id": row.id,
+                        "attempts": row.attempts,
+                    })
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        if not self.enabled:
+            with SMTPSession(self.app.config, self.idle_timeout) as session:
+                for job in jobs:
+                    self._deliver(session, job)
+            return len(jobs)
+
+        self._ensure_started()
+        for job in jobs:
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                break  # still leased in the outbox; picked up again after the lease
+        return len(jobs)
+
+    # ------------------- Workers -------------------
+    def _ensure_started(self):
+        # Threads do not survive a fork, so each gunicorn worker starts its own pool.
+        if self._threads and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._threads and self._pid == os.getpid():
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"mail-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            self._threads.append(threading.Thread(target=self._run_retries, name="mail-retry", daemon=True))
+            for thread in self._threads:
+                thread.start()
+
+    def _run(self):
+        with SMTPSession(self.app.config, self.idle_timeout) as session:
+            while True:
+                try:
+                    job = self._queue.get(timeout=self.idle_timeout)
+                except queue.Empty:
+                    session.close()
+                    continue
+                if job is _SHUTDOWN:
+                    self._queue.task_done()
+                    return
+                try:
+                    if "batch" in job:
+                        self._deliver_batch(session, job)
+                    else:
+                        self._deliver(session, job)
+                except Exception as e:
+                    logger.error(f"Mail worker error: {e}", exc_info=True)
+                finally:
+                    self._queue.task_done()
+
+    def _run_retries(self):
+        while self._pid == os.getpid():
+            time.sleep(self.retry_interval)
+            try:
+                self.retry_due()
+            except Exception as e:
+                logger.error(f"Mail outbox retry failed: {e}", exc_info=True)
+
+    def _job(self, subject, recipients, html_body, text_body=None, sender=None):
+        return {
+            "subject": str(subject),
+            "recipients": list(recipients),
+            "html_body": html_body,
+            "text_body": text_body,
+            "sender": sender or self.app.config.get("MAIL_USERNAME"),
+            "outbox_id": None,
+            "attempts": 0,
+        }
+
+    def _attempt(self, session, job):
+        """Try to send one job over `session`. Returns (ok, error)."""
+        with self.app.app_context():
+            if self.app.config.get("MAIL_SUPPRESS_SEND", self.app.testing):
+                return True, None
+            msg = Message(
+                subject=job["subject"],
+                recipients=job["recipients"],
+                html=job["html_body"],
+                body=job["text_body"] or "",
+                sender=job["sender"]
+            )
+            try:
+                self._bucket.acquire()
+                session.send(msg)
+                return True, None
+            except Exception as e:
+                session.close()
+                logger.error(f"Failed to send email to {job['recipients']}: {e}")
+                return False, e
+
+    def _deliver(self, session, job) -> bool:
+        """Send one job over `session`; failures are recorded in the outbox."""
+        ok, error = self._attempt(session, job)
+        with self.app.app_context():
+            if not ok:
+                return self._store(job, str(error), permanent=is_permanent_failure(error))
+            if job["outbox_id"]:
+                self._delete(job["outbox_id"])
+        return True
+
+    def _deliver_batch(self, session, item):
+        results = {}
+        for job in item["batch"]:
+            ok, error = self._attempt(session, job)
+            for recipient in job["recipients"]:
+                results[recipient] = {"status": "sent" if ok else "failed", "error": str(error) if error else None}
+        self._report(item, results)
+
+    def _report(self, item, results):
+        if not item["on_complete"]:
+            return
+        try:
+            with self.app.app_context():
+                item["on_complete"](results)
+        except Exception as e:
+            logger.error(f"Mail batch callback failed: {e}", exc_info=True)
+
+    # ------------------- Outbox -------------------
+    def _store(self, job, error, delay=None, permanent=False) -> bool:
+        """Insert or update the outbox row for a job that was not delivered."""
+        attempts = job["attempts"] + (1 if delay is None else 0)
+        if delay is None:
+            delay = self.retry_backoff * (2 ** max(0, attempts - 1))
+        status = "failed" if permanent or attempts >= self.max_retries else "pending"
+
+        try:
+            with self.app.app_context():
+                row = MailOutbox.query.get(job["outbox_id"]) if job["outbox_id"] else None
+                if row is None:
+                    row = MailOutbox(
+                        subject=job["subject"],
+                        recipients=job["recipients"],
+                        html_body=job["html_body"],
+                        text_body=job["text_body"],
+                        sender=job["sender"]
+                    )
+                    db.session.add(row)
+                row.attempts = attempts
+                row.status = status
+                row.last_error = error
+                row.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+                db.session.commit()
+            if status == "failed":
+                logger.error(f"Giving up on email to {job['recipients']} after {attempts} attempt(s): {error}")
+            return True
+        except Exception as e:
+            logger.error(f"Could not store email to {job['recipients']} in the outbox: {e}", exc_info=True)
+            return False
+
+    def _store_batch(self, item, error):
+        """Fall back to the outbox for a batch that could not be sent as one."""
+        results = {}
+        for job in item["batch"]:
+            status = "queued" if self._store(job, error, delay=0) else "failed"
+            for recipient in job["recipients"]:
+                results[recipient] = {"status": status, "error": error}
+        self._report(item, results)
+
+    def _delete(self, outbox_id):
+        try:
+            MailOutbox.query.filter_by(id=outbox_id).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Could not remove delivered email {outbox_id} from the outbox: {e}")
+
+
+mail_dispatcher = MailDispatcher()
+
+
+# ------------------- CLI -------------------
+mail_cli = click.Group("mail", help="Outgoing mail.")
+
+
+@mail_cli.command("retry")
+@click.option("--limit", type=int, default=100, show_default=True)
+@with_appcontext
+def retry_command(limit):
+    """Retry emails in the outbox whose next attempt is due."""
+    claimed = mail_dispatcher.retry_due(limit)
+    mail_dispatcher.flush()
+    click.echo(f"Retried {claimed} email(s).")
+
+
+@mail_cli.command("sink")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=1025, show_default=True)
+def sink_command(host, port):
+    """Run a local SMTP server that prints every message it receives."""
+    from app.utils.smtp_sink import SMTPSink
+
+    def show(message):
+        click.echo(f"--- from {message['mail_from']} to {', '.join(message['rcpt_tos'])} ---")
+        click.echo(message["data"].decode("utf-8", "replace"))
+
+    sink = SMTPSink(host, port, on_message=show).start()
+    click.echo(f"SMTP sink listening on {sink.host}:{sink.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sink.stop()
@@ -0,0 +1,96 @@
+import hmac
+import time
+from datetime import datetime
+
+import pyotp
+from flask import current_app
+from app.extensions import redis_client
+
+
+class MFAGuard:
+    """
+    Shared (Redis) state for MFA logins, so every worker sees the same picture.
+
+    - Replay cache: a TOTP code is bound to its 30-second timestep, and each
+      (user_id, timestep) can be claimed once with SET NX. The key lives only
+      as long as the code could still verify.
+    - Failure throttle: wrong codes are counted per user within
+      MFA_FAILURE_WINDOW. MFA_MAX_FAILURES of them lock the user out for
+      MFA_LOCKOUT_BASE seconds, doubling with each further lockout up to
+      MFA_LOCKOUT_MAX. A successful login resets both.
+
+    Pass `client=MemoryRedis()` (or run with REDIS_URL=memory://) to use the
+    in-process stand-in in tests.
+    """
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or redis_client
+
+    @staticmethod
+    def _config(name, default):
+        return current_app.config.get(name, default)
+
+    # ------------------- TOTP replay -------------------
+    def match_totp(self, secret, token, for_time=None):
+        """Return the timestep `token` is valid for (within the window), or None."""
+        token = (token or "").strip()
+        if not secret or not token.isdigit():
+            return None
+
+        totp = pyotp.TOTP(secret)
+        for_time = for_time or time.time()
+        window = self._config("MFA_TOTP_VALID_WINDOW", 1)
+        current = totp.timecode(datetime.fromtimestamp(for_time))
+        for offset in range(-window, window + 1):
+            if hmac.compare_digest(totp.generate_otp(current + offset), token):
+                return current + offset
+        return None
+
+    def claim_timestep(self, user_id, timestep) -> bool:
+        """True the first time (user, timestep) is claimed; False for a replay."""
+        window = self._config("MFA_TOTP_VALID_WINDOW", 1)
+        ttl = (2 * window + 2) * 30
+        return bool(self.client.set(f"mfa:totp:{user_id}:{timestep}", 1, ex=ttl, nx=True))
+
+    def verify_totp(self, user_id, secret, token) -> bool:
+        timestep = self.match_totp(secret, token)
+        return timestep is not None and self.claim_timestep(user_id, timestep)
+
+    # ------------------- Failure throttle -------------------
+    def locked_for(self, user_id) -> int:
+        """Seconds until the user may try again (0 when not locked)."""
+        ttl = self.client.ttl(f"mfa:lock:{user_id}")
+        return max(0, ttl or 0)
+
+    def record_failure(self, user_id) -> int:
+        """Count a failed attempt; returns the lockout in seconds if this one triggered it."""
+        failures_key = f"mfa:failures:{user_id}"
+        failures = self.client.incr(failures_key)
+        if failures == 1:
+            self.client.expire(failures_key, self._config("MFA_FAILURE_WINDOW", 900))
+        if failures < self._config("MFA_MAX_FAILURES", 5):
+            return 0
+
+        level_key = f"mfa:lockouts:{user_id}"
+        level = self.client.incr(level_key)
+        self.client.expire(level_key, 86400)
+
+        duration = min(
+            self._config("MFA_LOCKOUT_BASE", 30) * 2 ** (level - 1),
+            self._config("MFA_LOCKOUT_MAX", 3600)
+        )
+        pipe = self.client.pipeline()
+        pipe.set(f"mfa:lock:{user_id}", 1, ex=int(duration))
+        pipe.delete(failures_key)
+        pipe.execute()
+        return int(duration)
+
+    def record_success(self, user_id):
+        self.client.delete(f"mfa:failures:{user_id}", f"mfa:lockouts:{user_id}")
+
+
+mfa_guard = MFAGuard()
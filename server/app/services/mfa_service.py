@@ -1,10 +1,11 @@
 import pyotp
-import qrcode
-import io
 import base64
+import json
 from datetime import datetime
-from app.extensions import db
+from flask import current_app
+from app.extensions import db, redis_client
 from app.models import User
+from app.utils.qr_render import qr_matrix, render_png, png_data_uri, svg_data_uri
 
 
 class MFAService:
@@ -27,10 +28,45 @@ class MFAService:
     @staticmethod
     def generate_qr_code_image(uri):
         """Return a base64-encoded PNG QR code image."""
-        qr = qrcode.make(uri)
-        buffer = io.BytesIO()
-        qr.save(buffer, format="PNG")
-        return base64.b64encode(buffer.getvalue()).decode()
+        return base64.b64encode(render_png(qr_matrix(uri))).decode()
+
+    # ------------------- Enrollment QR cache -------------------
+    @staticmethod
+    def _setup_key(user_id):
+        return f"mfa:setup:{user_id}"
+
+    @staticmethod
+    def get_or_create_setup(user: User, issuer_name: str, fmt: str = "png") -> dict:
+        """
+        Secret, provisioning URI and QR code for a pending enrollment.
+
+        The QR code is rendered once per secret and kept in Redis for
+        MFA_SETUP_TTL seconds (or until the enrollment is verified), so
+        repeated "enable MFA" requests reuse the same secret and image
+        instead of generating new ones.
+        """
+        key = MFAService._setup_key(user.id)
+        cached = redis_client.get(key)
+        setup = json.loads(cached) if cached else None
+
+        if not setup or setup.get("secret") != user.mfa_secret:
+            secret = MFAService.generate_secret()
+            setup = {"secret": secret, "uri": MFAService.get_qr_code_uri(user.email, secret, issuer_name)}
+            user.mfa_secret = secret
+            user.mfa_verified = False
+            db.session.commit()
+
+        field = "svg" if fmt == "svg" else "png"
+        if field not in setup:
+            setup[field] = svg_data_uri(setup["uri"]) if field == "svg" else png_data_uri(setup["uri"])
+            redis_client.set(key, json.dumps(setup), ex=current_app.config.get("MFA_SETUP_TTL", 900))
+
+        return {"secret": setup["secret"], "uri": setup["uri"], "qr_code": setup[field]}
+
+    @staticmethod
+    def clear_setup(user_id):
+        """Drop the cached enrollment QR (after verification or when MFA is disabled)."""
+        redis_client.delete(MFAService._setup_key(user_id))
 
     @staticmethod
     def verify_token(secret, token):
@@ -1,7 +1,35 @@
-from app.models import Notification, User
-from app.extensions import db, socketio
-from flask_socketio import emit
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+import click
+from cachetools import TTLCache
+from sqlalchemy import insert, update, and_, or_
+from app.models import Notification, NotificationArchive, User
+from app.extensions import db, socketio, redis_client
 from flask import current_app
+from flask.cli import with_appcontext
+
+logger = logging.getLogger(__name__)
+
+# Recipient ids per role tuple, e.g. ("admin",) -> [1, 4, 9]; created on first use.
+# Each worker keeps its own copy and drops it when the Redis version changes.
+_recipient_cache = None
+_recipient_version = None
+_recipient_lock = threading.Lock()
+RECIPIENT_VERSION_KEY = "notifications:recipients:version"
+
+
+def user_room(user_id):
+    """Socket.IO room joined by every connection of a single user."""
+    return f"user:{user_id}"
+
+
+def role_room(role):
+    """Socket.IO room that every connected user with this role joins."""
+    return f"role:{role}"
+
 
 # Create notification for a user
 def create_notification(user_id, message):
@@ -9,50 +37,320 @@ def create_notification(user_id, message):
         notification = Notification(user_id=user_id, message=message)
         db.session.add(notification)
         db.session.commit()
+        adjust_unread_counts({user_id: 1})
 
-        # Emit real-time notification
-        socketio.emit(
-            f"notification_{user_id}",
-            notification.to_dict(),
-            broadcast=True
-        )
+        # Emit real-time notification to that user's connections only
+        socketio.emit("notification", notification.to_dict(), to=user_room(user_id))
         return notification
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Create notification error: {str(e)}")
         raise
 
-# Notify all admins
-def notify_admins(message):
-    try:
-        admin_users = User.query.filter_by(role="admin").all()
-        notifications = []
-        for admin in admin_users:
-            notification = Notification(user_id=admin.id, message=message)
-            db.session.add(notification)
-            notifications.append(notification)
-            socketio.emit(
-                f"notification_{admin.id}",
-                notification.to_dict(),
-                broadcast=True
+# Cached recipient lookup for role fan-out
+def get_role_recipient_ids(roles=("admin",)):
+    """
+    Return the ids of all active users holding any of `roles`.
+    Cached for NOTIFICATION_RECIPIENT_CACHE_TTL seconds; call
+    invalidate_recipient_cache() when a user's role changes (every worker
+    drops its copy on its next lookup).
+    """
+    global _recipient_cache, _recipient_version
+    key = tuple(sorted(roles))
+    version = redis_client.get(RECIPIENT_VERSION_KEY)
+    with _recipient_lock:
+        if _recipient_cache is None:
+            _recipient_cache = TTLCache(
+                maxsize=32,
+                ttl=current_app.config.get("NOTIFICATION_RECIPIENT_CACHE_TTL", 300)
             )
+        if version != _recipient_version:
+            _recipient_cache.clear()
+            _recipient_version = version
+        cached = _recipient_cache.get(key)
+    if cached is not None:
+        return cached
+
+    ids = [
+        row.id for row in
+        db.session.query(User.id).filter(User.role.in_(key), User.is_active.isnot(False)).all()
+    ]
+    with _recipient_lock:
+        _recipient_cache[key] = ids
+    return ids
+
+
+def invalidate_recipient_cache():
+    redis_client.incr(RECIPIENT_VERSION_KEY)
+    with _recipient_lock:
+        if _recipient_cache is not None:
+            _recipient_cache.clear()
+
+
+# Notify every user holding one of the given roles
+def notify_roles(message, roles=("admin",)):
+    """
+    Fan a message out to all users with the given roles using one multi-row
+    INSERT and one Socket.IO broadcast per role room (instead of one per user).
+    """
+    try:
+        recipient_ids = get_role_recipient_ids(roles)
+        if not recipient_ids:
+            return []
+
+        created_at = datetime.utcnow()
+        rows = [
+            {"user_id": uid, "message": message, "is_read": False, "created_at": created_at}
+            for uid in recipient_ids
+        ]
+        result = db.session.execute(
+            insert(Notification).values(rows).returning(Notification.id, Notification.user_id)
+        )
+        notifications = [{"id": r.id, "user_id": r.user_id} for r in result]
         db.session.commit()
+        adjust_unread_counts({n["user_id"]: 1 for n in notifications})
+
+        payload = {
+            "message": message,
+            "is_read": False,
+            "created_at": created_at.isoformat(),
+            "notifications": notifications
+        }
+        for role in roles:
+            socketio.emit("notification", payload, to=role_room(role))
         return notifications
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"Notify admins error: {str(e)}")
+        current_app.logger.error(f"Notify roles error: {str(e)}")
         raise
 
-# Get notifications for a user
-def get_user_notifications(user_id, unread_only=False):
-    query = Notification.query.filter_by(user_id=user_id)
+# Notify all admins
+def notify_admins(message):
+    return notify_roles(message, roles=("admin",))
+
+# ------------------- Unread counters -------------------
+def _unread_key(user_id):
+    return f"notifications:unread:{user_id}"
+
+
+def adjust_unread_counts(deltas):
+    """
+    Apply {user_id: delta} to the cached unread counters. A counter that was
+    missing (or has drifted to <= 0) is dropped so the next read recomputes it
+    from the database instead of trusting a partial value.
+    """
+    if not deltas:
+        return
+    try:
+        pipe = redis_client.pipeline()
+        keys = []
+        for user_id, delta in deltas.items():
+            keys.append((_unread_key(user_id), delta))
+            pipe.incrby(_unread_key(user_id), delta)
+        results = pipe.execute()
+
+        stale = [key for (key, delta), value in zip(keys, results) if value == delta or value <= 0]
+        if stale:
+            redis_client.delete(*stale)
+    except Exception as e:
+        logger.warning(f"Unread counter update failed: {e}")
+
+
+def get_unread_count(user_id):
+    """Unread notifications for a user, served from Redis when warm."""
+    key = _unread_key(user_id)
+    try:
+        cached = redis_client.get(key)
+        if cached is not None:
+            return int(cached)
+    except Exception as e:
+        logger.warning(f"Unread counter read failed: {e}")
+
+    count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
+    try:
+        redis_client.set(key, count, ex=current_app.config.get("NOTIFICATION_UNREAD_TTL", 3600), nx=True)
+    except Exception as e:
+        logger.warning(f"Unread counter write failed: {e}")
+    return count
+
+
+# ------------------- Inbox -------------------
+def get_inbox(user_id, limit=50, cursor=None, unread_only=False):
+    """
+    One page of a user's notifications, newest first, keyset-paginated on
+    (created_at, id). `cursor` is the (created_at, id) of the last row of the
+    previous page. Returns (notifications, next_cursor).
+    """
+    query = Notification.query.filter(Notification.user_id == user_id)
     if unread_only:
-        query = query.filter_by(is_read=False)
-    return query.order_by(Notification.created_at.desc()).all()
+        query = query.filter(Notification.is_read.is_(False))
+
+    if cursor:
+        last_created_at, last_id = cursor
+        query = query.filter(
+            or_(
+                Notification.created_at < last_created_at,
+                and_(Notification.created_at == last_created_at, Notification.id < last_id)
+            )
+        )
+
+    rows = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1).all()
+    next_cursor = (rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+# Get notifications for a user
+def get_user_notifications(user_id, unread_only=False, limit=50):
+    notifications, _ = get_inbox(user_id, limit=limit, unread_only=unread_only)
+    return notifications
+
+
+def mark_notifications_read(user_id, notification_ids=None):
+    """
+    Mark the given notifications (or all of them when ids is None) as read in
+    one UPDATE. Returns the number of notifications that changed.
+    """
+    stmt = update(Notification).where(
+        Notification.user_id == user_id,
+        Notification.is_read.is_(False)
+    )
+    if notification_ids is not None:
+        if not notification_ids:
+            return 0
+        stmt = stmt.where(Notification.id.in_(notification_ids))
+
+    changed = db.session.execute(stmt.values(is_read=True)).rowcount
+    db.session.commit()
+
+    if notification_ids is None:
+        try:
+            redis_client.set(_unread_key(user_id), 0, ex=current_app.config.get("NOTIFICATION_UNREAD_TTL", 3600))
+        except Exception as e:
+            logger.warning(f"Unread counter reset failed: {e}")
+    elif changed:
+        adjust_unread_counts({user_id: -changed})
+    return changed
+
 
 # Mark notification as read
 def mark_notification_read(notification_id):
     notification = Notification.query.get_or_404(notification_id)
-    notification.is_read = True
-    db.session.commit()
+    if not notification.is_read:
+        notification.is_read = True
+        db.session.commit()
+        adjust_unread_counts({notification.user_id: -1})
     return notification
+
+
+# ------------------- Archival -------------------
+def archive_read_notifications(older_than_days=None, batch_size=5000):
+    """
+    Move read notifications older than `older_than_days` into
+    notifications_archive, in batches of INSERT ... SELECT + DELETE.
+    Returns the number of rows moved.
+    """
+    older_than_days = older_than_days or current_app.config.get("NOTIFICATION_ARCHIVE_DAYS", 30)
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = 0
+
+    while True:
+        ids = [
+            row.id for row in
+            db.session.query(Notification.id)
+            .filter(Notification.is_read.is_(True), Notification.created_at < cutoff)
+            .order_by(Notification.id)
+            .limit(batch_size)
+            .all()
+        ]
+        if not ids:
+            break
+
+        try:
+            db.session.execute(
+                insert(NotificationArchive).from_select(
+                    ["id", "user_id", "message", "is_read", "created_at"],
+                    db.select(
+                        Notification.id, Notification.user_id, Notification.message,
+                        Notification.is_read, Notification.created_at
+                    ).where(Notification.id.in_(ids))
+                )
+            )
+            Notification.query.filter(Notification.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        moved += len(ids)
+
+    return moved
+
+
+class NotificationArchiver:
+    """
+    Runs archive_read_notifications every NOTIFICATION_ARCHIVE_INTERVAL
+    seconds from a background thread, so the inbox table stays bounded
+    without a cron entry. Every worker has a thread, but a Redis lock lets
+    only one of them archive per interval. Set the interval to 0 to disable
+    it and run `flask notifications archive` from cron instead.
+    """
+
+    LOCK_KEY = "notifications:archive:lock"
+
+    def __init__(self):
+        self.app = None
+        self.interval = 0
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get("NOTIFICATION_ARCHIVE_INTERVAL", 3600)
+        app.extensions["notification_archiver"] = self
+        if self.interval > 0:
+            # Started on a worker's first request, not in create_app, so it
+            # runs in forked workers and never in CLI commands.
+            app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        # Threads do not survive fork(); each worker process starts its own.
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="notification-archiver", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self.app.app_context():
+                try:
+                    if not redis_client.set(self.LOCK_KEY, os.getpid(), nx=True, ex=self.interval):
+                        continue  # another worker archived during this interval
+                    moved = archive_read_notifications()
+                    if moved:
+                        logger.info(f"Archived {moved} read notification(s)")
+                except Exception as e:
+                    logger.error(f"Notification archiving failed: {e}", exc_info=True)
+                finally:
+                    db.session.remove()
+
+
+notification_archiver = NotificationArchiver()
+
+
+# ------------------- CLI -------------------
+notifications_cli = click.Group("notifications", help="Notification maintenance.")
+
+
+@notifications_cli.command("archive")
+@click.option("--days", type=int, default=None, help="Archive read notifications older than this (default: NOTIFICATION_ARCHIVE_DAYS).")
+@click.option("--batch-size", type=int, default=5000, show_default=True)
+@with_appcontext
+def archive_command(days, batch_size):
+    """Move old read notifications into notifications_archive."""
+    moved = archive_read_notifications(days, batch_size)
+    click.echo(f"Archived {moved} notification(s).")
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import click
+import requests
+from authlib.integrations.flask_client import FlaskOAuth2App
+from flask import current_app
+from flask.cli import with_appcontext
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    """Cached discovery document and JWKS for one metadata URL."""
+
+    def __init__(self, url):
+        self.url = url
+        self.metadata = None
+        self.jwks = None
+        self.fetched_at = 0.0          # metadata (and JWKS) last fetched
+        self.jwks_fetched_at = 0.0
+        self.generation = 0            # bumped on every successful fetch
+        self.last_error = None
+        self.retry_at = 0.0
+        self.fetch_lock = threading.Lock()  # single-flight per URL
+
+
+class OIDCMetadataCache:
+    """
+    OIDC discovery documents and signing keys, kept in memory and on disk.
+
+    Nothing here touches the network at startup: watch() only loads the last
+    copy from OIDC_CACHE_DIR and starts a background thread that refreshes
+    each document OIDC_REFRESH_MARGIN seconds before OIDC_METADATA_TTL runs
+    out. If the IdP is down the stale copy keeps being served. The first
+    login fetches synchronously only when there is no copy at all.
+
+    Concurrent fetches for the same URL are collapsed into one (single-flight).
+    An unknown `kid` forces a JWKS refetch, at most once every
+    OIDC_JWKS_MIN_REFRESH seconds, so forged tokens cannot hammer the IdP.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 3600
+        self.refresh_margin = 300
+        self.retry_interval = 30
+        self.jwks_min_refresh = 30
+        self.timeout = 5
+        self.cache_dir = None
+
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._refresher = None
+        self._refresher_pid = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("OIDC_METADATA_TTL", 3600)
+        self.refresh_margin = app.config.get("OIDC_REFRESH_MARGIN", 300)
+        self.retry_interval = app.config.get("OIDC_RETRY_INTERVAL", 30)
+        self.jwks_min_refresh = app.config.get("OIDC_JWKS_MIN_REFRESH", 30)
+        self.timeout = app.config.get("OIDC_HTTP_TIMEOUT", 5)
+        self.cache_dir = app.config.get("OIDC_CACHE_DIR") or os.path.join(app.instance_path, "oidc_cache")
+        app.extensions["oidc_metadata"] = self
+
+    # ------------------- Public API -------------------
+    def watch(self, url):
+        """Track `url`: load the on-disk copy and keep it refreshed in the background."""
+        entry = self._entry(url)
+        if entry.metadata is None:
+            self._load_from_disk(entry)
+        self._ensure_refresher()
+        self._wakeup.set()
+        return entry
+
+    def metadata(self, url):
+        entry = self._entry(url)
+        if entry.metadata is None:
+            self._load_from_disk(entry)
+        if entry.metadata is None:
+            self._fetch(entry, entry.generation)
+        if entry.metadata is None:
+            raise RuntimeError(f"OIDC metadata unavailable for {url}: {entry.last_error}")
+
+        # Workers forked after create_app (gunicorn --preload) have no refresher
+        # yet; start one here. A copy past its TTL is still served, but the
+        # refresher is woken to replace it now.
+        self._ensure_refresher()
+        if time.time() >= entry.fetched_at + self.ttl:
+            self._wakeup.set()
+        return entry.metadata
+
+    def jwks(self, url, force=False):
+        entry = self._entry(url)
+        self.metadata(url)  # also starts the refresher in this process
+
+        if force and time.time() - entry.jwks_fetched_at >= self.jwks_min_refresh:
+            self._fetch(entry, entry.generation, jwks_only=True)
+        elif entry.jwks is None:
+            self._fetch(entry, entry.generation)
+
+        if entry.jwks is None:
+            raise RuntimeError(f"OIDC signing keys unavailable for {url}: {entry.last_error}")
+        return entry.jwks
+
+    def refresh(self, url):
+        """Fetch now (single-flight); returns True on success."""
+        entry = self._entry(url)
+        return self._fetch(entry, entry.generation)
+
+    def status(self, url):
+        entry = self._entries.get(url)
+        if entry is None:
+            return {"cached": False}
+        return {
+            "cached": entry.metadata is not None,
+            "has_jwks": entry.jwks is not None,
+            "age_seconds": int(time.time() - entry.fetched_at) if entry.fetched_at else None,
+            "expires_in": int(entry.fetched_at + self.ttl - time.time()) if entry.fetched_at else None,
+            "last_error": entry.last_error,
+        }
+
+    # ------------------- Fetching -------------------
+    def _entry(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                entry = self._entries[url] = _Entry(url)
+            return entry
+
+    def _fetch(self, entry, seen_generation, jwks_only=False):
+        with entry.fetch_lock:
+            if entry.generation != seen_generation:
+                return True  # another thread refreshed while we waited
+
+            try:
+                metadata = entry.metadata
+                if not jwks_only or metadata is None:
+                    metadata = self._get_json(entry.url)
+                jwks = self._get_json(metadata["jwks_uri"]) if metadata.get("jwks_uri") else None
+            except Exception as e:
+                entry.last_error = str(e)
+                entry.retry_at = time.time() + self.retry_interval
+                logger.warning(f"OIDC metadata refresh failed for {entry.url}: {e}")
+                return False
+
+            now = time.time()
+            entry.metadata = metadata
+            entry.jwks = jwks
+            entry.jwks_fetched_at = now
+            if not jwks_only:
+                entry.fetched_at = now
+            entry.generation += 1
+            entry.last_error = None
+            entry.retry_at = 0.0
+            self._save_to_disk(entry)
+            return True
+
+    def _get_json(self, url):
+        resp = requests.get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    # ------------------- Background refresh -------------------
+    def _ensure_refresher(self):
+        # Threads do not survive fork(); each worker process starts its own.
+        if self._refresher_pid == os.getpid() and self._refresher is not None and self._refresher.is_alive():
+            return
+        with self._lock:
+            if self._refresher_pid == os.getpid() and self._refresher is not None and self._refresher.is_alive():
+                return
+            self._refresher_pid = os.getpid()
+            self._refresher = threading.Thread(target=self._refresh_loop, name="oidc-refresh", daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            now = time.time()
+            next_due = now + self.ttl
+            for entry in list(self._entries.values()):
+                due = max(entry.fetched_at + self.ttl - self.refresh_margin, entry.retry_at)
+                if due <= now:
+                    self._fetch(entry, entry.generation)
+                    due = max(entry.fetched_at + self.ttl - self.refresh_margin, entry.retry_at)
+                next_due = min(next_due, due)
+            self._wakeup.wait(max(1.0, next_due - time.time()))
+            self._wakeup.clear()
+
+    # ------------------- Disk persistence -------------------
+    def _path(self, url):
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode()).hexdigest()[:16] + ".json")
+
+    def _load_from_disk(self, entry):
+        path = self._path(entry.url)
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable OIDC cache file {path}: {e}")
+            return
+        if data.get("url") != entry.url or not data.get("metadata"):
+            return
+
+        with entry.fetch_lock:
+            if entry.metadata is None:
+                entry.metadata = data["metadata"]
+                entry.jwks = data.get("jwks")
+                entry.fetched_at = data.get("fetched_at", 0.0)
+                entry.jwks_fetched_at = entry.fetched_at
+                entry.generation += 1
+
+    def _save_to_disk(self, entry):
+        path = self._path(entry.url)
+        if not path:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"url": entry.url, "metadata": entry.metadata, "jwks": entry.jwks,
+                           "fetched_at": entry.fetched_at}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not persist OIDC cache to {path}: {e}")
+
+
+oidc_metadata = OIDCMetadataCache()
+
+
+class CachedOIDCApp(FlaskOAuth2App):
+    """Authlib client that reads discovery metadata and JWKS from `oidc_metadata`."""
+
+    def load_server_metadata(self):
+        if self._server_metadata_url:
+            self.server_metadata.update(oidc_metadata.metadata(self._server_metadata_url))
+        return self.server_metadata
+
+    def fetch_jwk_set(self, force=False):
+        if not self._server_metadata_url:
+            return super().fetch_jwk_set(force=force)
+        return oidc_metadata.jwks(self._server_metadata_url, force=force)
+
+
+# ------------------- CLI -------------------
+sso_cli = click.Group("sso", help="SSO / OIDC utilities.")
+
+
+@sso_cli.command("refresh-metadata")
+@with_appcontext
+def refresh_metadata_command():
+    """Fetch SSO_METADATA_URL and its JWKS now and write the on-disk cache."""
+    url = current_app.config.get("SSO_METADATA_URL")
+    if not url:
+        raise click.ClickException("SSO_METADATA_URL is not set")
+    if not oidc_metadata.refresh(url):
+        raise click.ClickException(f"Refresh failed: {oidc_metadata.status(url)['last_error']}")
+    click.echo(json.dumps(oidc_metadata.status(url)))
+
+
+@sso_cli.command("stub-idp")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8089, show_default=True)
+@click.option("--delay", type=float, default=0.0, help="Seconds to stall every response (slow IdP).")
+def stub_idp_command(host, port, delay):
+    """Run the local stand-in IdP; point SSO_METADATA_URL at the printed URL."""
+    from app.utils.stub_idp import StubIdP
+
+    idp = StubIdP(host, port, delay=delay).start()
+    click.echo(f"SSO_METADATA_URL={idp.metadata_url}  (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        idp.stop()
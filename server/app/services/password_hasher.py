@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+
+class HashingBusyError(Exception):
+    """Raised when the hashing queue is full; callers should answer 503."""
+
+
+def busy_response():
+    """503 response for HashingBusyError, telling clients when to retry."""
+    from flask import jsonify
+    response = jsonify({"error": "Too many sign-in attempts in progress, please retry shortly"})
+    response.headers["Retry-After"] = "2"
+    return response, 503
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool.
+
+    bcrypt releases the GIL while it works, so at most PASSWORD_HASH_WORKERS
+    hashes run at once and the remaining CPU stays available to other
+    requests during a login burst. At most PASSWORD_HASH_QUEUE_MAX
+    operations may wait for a worker; beyond that HashingBusyError is raised
+    instead of letting request threads pile up behind bcrypt.
+    """
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.workers = 4
+        self.queue_max = 64
+        self.timeout = 10.0
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._stats = {"completed": 0, "rejected": 0, "rehashed": 0, "wait_ms_total": 0.0, "run_ms_total": 0.0}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.get("BCRYPT_LOG_ROUNDS", 12)
+        self.workers = app.config.get("PASSWORD_HASH_WORKERS", 4)
+        self.queue_max = app.config.get("PASSWORD_HASH_QUEUE_MAX", 64)
+        self.timeout = app.config.get("PASSWORD_HASH_TIMEOUT", 10.0)
+        app.extensions["password_hasher"] = self
+
+        # create_app() may run more than once per process; keep the first pool.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+
+    # ------------------- Public API -------------------
+    def hash(self, password: str, rounds: int = None) -> str:
+        salt = bcrypt.gensalt(rounds or self.rounds)
+        return self._run(lambda: bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8"))
+
+    def verify(self, password: str, hashed: str) -> bool:
+        if not password or not hashed:
+            return False
+        try:
+            return self._run(lambda: bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8")))
+        except ValueError:
+            # Not a bcrypt hash (e.g. a legacy werkzeug hash)
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True if the hash was made with a different cost than BCRYPT_LOG_ROUNDS."""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+    def metrics(self) -> dict:
+        with self._lock:
+            completed = self._stats["completed"] or 1
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "active": self._active,
+                "queued": max(0, self._pending - self._active),
+                "queue_max": self.queue_max,
+                "completed": self._stats["completed"],
+                "rejected": self._stats["rejected"],
+                "rehashed": self._stats["rehashed"],
+                "avg_wait_ms": round(self._stats["wait_ms_total"] / completed, 2),
+                "avg_run_ms": round(self._stats["run_ms_total"] / completed, 2),
+            }
+
+    def record_rehash(self):
+        with self._lock:
+            self._stats["rehashed"] += 1
+
+    # ------------------- Internals -------------------
+    def _run(self, fn):
+        if self._executor is None:
+            return fn()
+
+        with self._lock:
+            if self._pending >= self.workers + self.queue_max:
+                self._stats["rejected"] += 1
+                raise HashingBusyError("Password hashing queue is full")
+            self._pending += 1
+
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            with self._lock:
+                self._active += 1
+            try:
+                return fn()
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._active -= 1
+                    self._pending -= 1
+                    self._stats["completed"] += 1
+                    self._stats["wait_ms_total"] += (started - submitted) * 1000
+                    self._stats["run_ms_total"] += (finished - started) * 1000
+
+        try:
+            return self._executor.submit(task).result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HashingBusyError(f"Password hashing took longer than {self.timeout}s")
+
+
+password_hasher = PasswordHasher()
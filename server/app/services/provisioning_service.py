@@ -0,0 +1,113 @@
+import json
+import logging
+import secrets
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import text
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Accounts created through SSO/OAuth have no usable password: bcrypt rejects
+# this value, so password login fails until the user sets one via reset.
+UNUSABLE_PASSWORD = "!sso"
+
+ProvisionedUser = namedtuple("ProvisionedUser", "id email role enrollment_completed profile created")
+
+
+# One statement: upsert the user (filling in missing first/last name on an
+# existing profile), then create the candidate row and the provider link if
+# they are missing. Relies on uq_users_email_lower and uq_candidates_user_id
+# (see `flask users ensure-indexes`) plus uq_provider_user.
+_USER_CTE = """
+u AS (
+    INSERT INTO users (email, password, role, profile, settings, is_verified, enrollment_completed,
+                       dark_mode, is_active, created_at, first_login, mfa_enabled, mfa_verified)
+    VALUES (:email, :password, :role, CAST(:profile AS json), CAST('{}' AS json), true, false,
+            false, true, :now, true, false, false)
+    ON CONFLICT ((lower(email))) DO UPDATE
+        SET profile = (CAST(:profile AS jsonb) || COALESCE(CAST(users.profile AS jsonb), CAST('{}' AS jsonb)))::json
+    RETURNING id, email, role, enrollment_completed, profile, (xmax = 0) AS created
+)"""
+
+_CANDIDATE_CTE = """
+c AS (
+    INSERT INTO candidates (user_id, full_name, education, skills, work_experience, certifications,
+                            languages, documents, profile, cv_score, dark_mode,
+                            notifications_email, notifications_push)
+    SELECT id, :full_name, CAST('[]' AS json), CAST('[]' AS json), CAST('[]' AS json), CAST('[]' AS json),
+           CAST('[]' AS json), CAST('[]' AS json), CAST('{}' AS json), 0, false, true, false
+    FROM u
+    ON CONFLICT (user_id) DO NOTHING
+)"""
+
+_CONNECTION_CTE = """
+o AS (
+    INSERT INTO oauth_connections (user_id, provider, provider_user_id, access_token, created_at)
+    SELECT u.id, :provider, :provider_user_id, :access_token, :now
+    FROM u
+    WHERE NOT EXISTS (
+        SELECT 1 FROM oauth_connections oc WHERE oc.user_id = u.id AND oc.provider = :provider
+    )
+    ON CONFLICT (provider, provider_user_id) DO NOTHING
+)"""
+
+
+class ProvisioningService:
+    """
+    Find-or-create for users signing in through SSO or an OAuth provider.
+
+    The user, its candidate row and the provider connection are upserted in a
+    single INSERT ... ON CONFLICT statement and committed once, so a login is
+    one round trip plus the commit and a failure leaves nothing behind.
+    """
+
+    @staticmethod
+    def provision(email, first_name="", last_name="", role="candidate",
+                  provider=None, provider_user_id=None, ensure_candidate=False) -> ProvisionedUser:
+        email = (email or "").strip().lower()
+        if not email:
+            raise ValueError("email is required")
+
+        ctes = [_USER_CTE]
+        if ensure_candidate:
+            ctes.append(_CANDIDATE_CTE)
+        if provider:
+            ctes.append(_CONNECTION_CTE)
+        statement = text("WITH " + ",".join(ctes) + "\nSELECT * FROM u")
+
+        profile = {"first_name": first_name or "", "last_name": last_name or ""}
+        params = {
+            "email": email,
+            "password": UNUSABLE_PASSWORD,
+            "role": role,
+            "profile": json.dumps(profile),
+            "now": datetime.utcnow(),
+            "full_name": f"{profile['first_name']} {profile['last_name']}".strip() or None,
+            "provider": provider,
+            "provider_user_id": str(provider_user_id) if provider_user_id is not None else None,
+            "access_token": secrets.token_urlsafe(32),
+        }
+
+        try:
+            row = db.session.execute(statement, params).one()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        user = ProvisionedUser(row.id, row.email, row.role, bool(row.enrollment_completed),
+                               row.profile or {}, bool(row.created))
+        ProvisioningService._after_commit(user)
+        return user
+
+    @staticmethod
+    def _after_commit(user):
+        # The upsert bypasses the ORM, so its invalidation hooks do not fire.
+        from app.utils.session_profile import invalidate_session_profile
+        invalidate_session_profile(user.id)
+
+        if user.created and user.role != "candidate":
+            from app.services.notification_service import invalidate_recipient_cache
+            invalidate_recipient_cache()
@@ -0,0 +1,121 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from jinja2 import TemplateError, meta
+from markupsafe import escape
+
+logger = logging.getLogger(__name__)
+
+
+class EmailTemplateRegistry:
+    """
+    Compiles every template under templates/email_templates once at startup.
+
+    Templates are validated when they are loaded (syntax errors are reported
+    immediately instead of on the first send) and rendered straight from the
+    compiled objects, so sending does not go through the loader, mtime checks
+    or template lookups.
+
+    For bulk sends, `render_personalised` renders the parts that are the same
+    for every recipient once, caches that output, and only substitutes the
+    per-recipient fields for each message.
+    """
+
+    directory = "email_templates"
+
+    def __init__(self, app=None):
+        self.app = None
+        self.templates = {}
+        self.variables = {}
+        self.errors = {}
+        self.cache_size = 256
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.cache_size = app.config.get("EMAIL_TEMPLATE_CACHE_SIZE", 256)
+        app.extensions["email_templates"] = self
+        self.load()
+
+        if self.errors and app.config.get("EMAIL_TEMPLATES_STRICT", False):
+            raise RuntimeError(f"Invalid email templates: {', '.join(sorted(self.errors))}")
+
+    def load(self):
+        """(Re)compile and validate all email templates."""
+        env = self.app.jinja_env
+        folder = os.path.join(self.app.root_path, self.app.template_folder, self.directory)
+        templates, variables, errors = {}, {}, {}
+
+        for filename in sorted(os.listdir(folder)) if os.path.isdir(folder) else []:
+            if not filename.endswith(".html"):
+                continue
+            name = f"{self.directory}/{filename}"
+            try:
+                source = env.loader.get_source(env, name)[0]
+                variables[name] = meta.find_undeclared_variables(env.parse(source))
+                templates[name] = env.get_template(name)
+            except TemplateError as e:
+                errors[name] = str(e)
+                logger.error(f"Email template {name} failed to compile: {e}")
+
+        with self._lock:
+            self.templates, self.variables, self.errors = templates, variables, errors
+            self._fragments.clear()
+        logger.info(f"Compiled {len(templates)} email template(s)")
+
+    # ------------------- Rendering -------------------
+    def get(self, name):
+        template = self.templates.get(name)
+        if template is None:
+            if name in self.errors:
+                raise TemplateError(f"{name}: {self.errors[name]}")
+            # Not precompiled (added after startup); compile and keep it
+            template = self.app.jinja_env.get_template(name)
+            self.templates[name] = template
+        return template
+
+    def render(self, name, **context):
+        return self.get(name).render(**context)
+
+    def render_personalised(self, name, context, personal):
+        """
+        Render `name` with the shared `context` (cached) and fill in the
+        `personal` fields, e.g. {"candidate_name": "Ada"}. Personal fields must
+        only be printed by the template, not used in conditions or filters.
+        """
+        fields = tuple(sorted(personal))
+        key = (name, fields, self._freeze(context))
+
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+
+        if fragment is None:
+            placeholders = {field: f"%%{field.upper()}%%" for field in fields}
+            fragment = self.render(name, **context, **placeholders)
+            with self._lock:
+                self._fragments[key] = fragment
+                while len(self._fragments) > self.cache_size:
+                    self._fragments.popitem(last=False)
+
+        for field, value in personal.items():
+            fragment = fragment.replace(f"%%{field.upper()}%%", str(escape(value if value is not None else "")))
+        return fragment
+
+    @staticmethod
+    def _freeze(context):
+        try:
+            return tuple(sorted((k, v if isinstance(v, (str, int, float, bool, type(None))) else repr(v))
+                                for k, v in context.items()))
+        except TypeError:
+            return repr(sorted(context.items()))
+
+
+email_templates = EmailTemplateRegistry()
@@ -0,0 +1,100 @@
+import logging
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import text
+from app.extensions import db
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class UserRepository:
+    """
+    Single place for looking users up by email.
+
+    Emails are compared case-insensitively as lower(email), which is served by
+    the functional unique index uq_users_email_lower instead of a sequential
+    scan of users.
+    """
+
+    @staticmethod
+    def normalise_email(email: str) -> str:
+        return (email or "").strip().lower()
+
+    @staticmethod
+    def by_email_query(email: str):
+        return User.query.filter(db.func.lower(User.email) == UserRepository.normalise_email(email))
+
+    @staticmethod
+    def get_by_email(email: str):
+        """Return the user with this email (any case), or None."""
+        if not email:
+            return None
+        return UserRepository.by_email_query(email).first()
+
+    @staticmethod
+    def exists(email: str) -> bool:
+        if not email:
+            return False
+        return db.session.query(
+            UserRepository.by_email_query(email).with_entities(User.id).exists()
+        ).scalar()
+
+    @staticmethod
+    def get_many_by_email(emails) -> list:
+        """Users for many addresses in one query (uses the same index)."""
+        lowered = {UserRepository.normalise_email(e) for e in emails if e}
+        if not lowered:
+            return []
+        return User.query.filter(db.func.lower(User.email).in_(lowered)).all()
+
+
+# ------------------- CLI -------------------
+users_cli = click.Group("users", help="User table maintenance.")
+
+# Indexes declared in models.__table_args__ that `ensure-indexes` builds on
+# existing databases: (name, unique, "table (columns)")
+INDEXES = [
+    ("uq_users_email_lower", True, "users (lower(email))"),
+    ("uq_candidates_user_id", True, "candidates (user_id)"),
+    ("ix_users_created_at_id", False, "users (created_at, id)"),
+    ("ix_users_role_id", False, "users (role, id)"),
+    ("ix_requisitions_created_at_id", False, "requisitions (created_at, id)"),
+    ("ix_requisitions_category_created_at", False, "requisitions (category, created_at)"),
+    ("ix_candidates_cv_score_id", False, "candidates (coalesce(cv_score, 0), id)"),
+    ("ix_applications_requisition_id_id", False, "applications (requisition_id, id)"),
+    ("ix_applications_status_id", False, "applications (status, id)"),
+]
+
+
+@users_cli.command("ensure-indexes")
+@with_appcontext
+def ensure_indexes_command():
+    """
+    Create the lookup and list indexes (INDEXES) on an existing database
+    without locking the tables. New databases get them from create_all.
+    """
+    duplicates = db.session.execute(text(
+        "SELECT lower(email) AS email, count(*) FROM users GROUP BY lower(email) HAVING count(*) > 1"
+    )).all()
+    if duplicates:
+        for row in duplicates:
+            click.echo(f"duplicate: {row.email} ({row.count} accounts)")
+        raise click.ClickException("Resolve duplicate emails (case-insensitive) before creating the unique index.")
+
+    duplicates = db.session.execute(text(
+        "SELECT user_id, count(*) FROM candidates WHERE user_id IS NOT NULL GROUP BY user_id HAVING count(*) > 1"
+    )).all()
+    if duplicates:
+        for row in duplicates:
+            click.echo(f"duplicate candidate rows: user {row.user_id} ({row.count} rows)")
+        raise click.ClickException("Merge duplicate candidate rows before creating the unique index.")
+
+    db.session.commit()
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for name, unique, target in INDEXES:
+            conn.execute(text(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}"
+            ))
+            click.echo(f"{name} is in place.")
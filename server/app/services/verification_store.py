@@ -0,0 +1,121 @@
+import hashlib
+import hmac
+import logging
+import secrets
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
+from app.extensions import db, redis_client
+
+logger = logging.getLogger(__name__)
+
+# verify() outcomes
+VERIFIED = "verified"
+INVALID = "invalid"
+EXPIRED = "expired"
+LOCKED = "locked"
+
+
+class VerificationCodeStore:
+    """
+    Email verification codes kept in Redis under a TTL.
+
+    Only a hash of the code is stored. Every check increments a per-email
+    attempt counter; after VERIFICATION_MAX_ATTEMPTS wrong guesses the code is
+    burned and a new one must be requested. A successful check deletes the
+    code, so it can only be used once even under concurrent requests.
+
+    Pass `client=MemoryRedis()` (or run with REDIS_URL=memory://) to use the
+    in-process stand-in in tests.
+    """
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or redis_client
+
+    @staticmethod
+    def _keys(email):
+        email = (email or "").strip().lower()
+        return f"verification:{email}:code", f"verification:{email}:attempts"
+
+    @staticmethod
+    def _digest(email, code):
+        secret = current_app.config["SECRET_KEY"].encode()
+        return hmac.new(secret, f"{email.strip().lower()}:{code}".encode(), hashlib.sha256).hexdigest()
+
+    def issue(self, email, code=None, ttl=None):
+        """Create (or replace) the code for an email and return it."""
+        code = code or f"{secrets.randbelow(1000000):06d}"
+        ttl = int(ttl or current_app.config.get("VERIFICATION_CODE_TTL", 1800))
+        code_key, attempts_key = self._keys(email)
+
+        pipe = self.client.pipeline()
+        pipe.set(code_key, self._digest(email, code), ex=ttl)
+        pipe.delete(attempts_key)
+        pipe.execute()
+        return code
+
+    def verify(self, email, code):
+        """Check a code. Returns VERIFIED, INVALID, EXPIRED or LOCKED."""
+        code_key, attempts_key = self._keys(email)
+        max_attempts = current_app.config.get("VERIFICATION_MAX_ATTEMPTS", 5)
+
+        attempts = self.client.incr(attempts_key)
+        if attempts == 1:
+            self.client.expire(attempts_key, current_app.config.get("VERIFICATION_CODE_TTL", 1800))
+        if attempts > max_attempts:
+            self.client.delete(code_key)
+            return LOCKED
+
+        stored = self.client.get(code_key)
+        if stored is None:
+            return EXPIRED
+
+        if isinstance(stored, bytes):
+            stored = stored.decode()
+        if not hmac.compare_digest(stored, self._digest(email, str(code))):
+            return INVALID
+
+        # Only the request that actually deletes the key wins
+        if not self.client.delete(code_key):
+            return EXPIRED
+        self.client.delete(attempts_key)
+        return VERIFIED
+
+
+verification_store = VerificationCodeStore()
+
+
+# ------------------- CLI -------------------
+@click.command("drain-verification-codes")
+@click.option("--drop/--keep-table", default=False, help="Drop verification_codes once drained.")
+@with_appcontext
+def drain_verification_codes_command(drop):
+    """
+    Move still-valid codes from the old verification_codes table into the
+    Redis store (keeping their remaining lifetime), then empty the table.
+    """
+    if not inspect(db.engine).has_table("verification_codes"):
+        click.echo("verification_codes does not exist; nothing to drain.")
+        return
+
+    now = datetime.utcnow()
+    rows = db.session.execute(text(
+        "SELECT DISTINCT ON (lower(email)) email, code, expires_at FROM verification_codes "
+        "WHERE is_used = false AND expires_at > :now ORDER BY lower(email), created_at DESC"
+    ), {"now": now}).all()
+
+    for row in rows:
+        ttl = int((row.expires_at - now).total_seconds())
+        if ttl > 0:
+            verification_store.issue(row.email, code=row.code, ttl=ttl)
+
+    db.session.execute(text("DROP TABLE verification_codes" if drop else "DELETE FROM verification_codes"))
+    db.session.commit()
+    click.echo(f"Moved {len(rows)} active code(s) to Redis; verification_codes {'dropped' if drop else 'emptied'}.")
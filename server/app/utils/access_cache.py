@@ -0,0 +1,87 @@
+# utils/access_cache.py
+import threading
+from cachetools import TTLCache
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.extensions import db
+from app.models import User
+
+# user_id -> (role, is_active); created on first use with AUTH_ACCESS_CACHE_TTL
+_access_cache = None
+_access_lock = threading.Lock()
+
+
+def _cache():
+    global _access_cache
+    if _access_cache is None:
+        _access_cache = TTLCache(
+            maxsize=current_app.config.get("AUTH_ACCESS_CACHE_SIZE", 10000),
+            ttl=current_app.config.get("AUTH_ACCESS_CACHE_TTL", 60)
+        )
+    return _access_cache
+
+
+def get_user_access(user_id):
+    """
+    Return (role, is_active) for a user, or None if the user does not exist.
+    Cached in-process for AUTH_ACCESS_CACHE_TTL seconds. Changes made in this
+    process are invalidated on commit; other workers pick them up within the TTL.
+    """
+    user_id = int(user_id)
+    with _access_lock:
+        cached = _cache().get(user_id)
+    if cached is not None:
+        return cached
+
+    row = db.session.query(User.role, User.is_active).filter(User.id == user_id).first()
+    if row is None:
+        return None
+
+    access = (row.role, row.is_active is not False)
+    with _access_lock:
+        _cache()[user_id] = access
+    return access
+
+
+def invalidate_user_access(user_id=None):
+    """Drop one user's cached access (or everyone's when user_id is None)."""
+    with _access_lock:
+        if _access_cache is None:
+            return
+        if user_id is None:
+            _access_cache.clear()
+        else:
+            _access_cache.pop(int(user_id), None)
+
+
+# ------------------- Invalidation hooks -------------------
+# Any change to User.role / User.is_active, or a deleted user, is dropped
+# from the cache once the transaction commits.
+def _mark_changed(target, value, oldvalue, initiator):
+    if target.id is not None and value != oldvalue:
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault("access_changed", set()).add(target.id)
+
+
+def _mark_deleted(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and target.id is not None:
+        session.info.setdefault("access_changed", set()).add(target.id)
+
+
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop("access_changed", ()):
+        invalidate_user_access(user_id)
+
+
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop("access_changed", None)
+
+
+event.listen(User.role, "set", _mark_changed)
+event.listen(User.is_active, "set", _mark_changed)
+event.listen(User, "after_delete", _mark_deleted)
+event.listen(Session, "after_commit", _invalidate_after_commit)
+event.listen(Session, "after_soft_rollback", _discard_after_rollback)
@@ -1,9 +1,13 @@
 from functools import wraps
-from flask import jsonify, request, current_app
-from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity, decode_token
-from app.models import User
+from flask import jsonify, request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from app.utils.access_cache import get_user_access
 import logging
 
+# Header first, then cookie, then ?access_token= — checked in one verification pass
+TOKEN_LOCATIONS = ["headers", "cookies", "query_string"]
+
+
 def role_required(*roles):
     allowed_roles = []
     for r in roles:
@@ -11,6 +15,7 @@ def role_required(*roles):
             allowed_roles.extend(r)
         else:
             allowed_roles.append(r)
+    allowed = frozenset(allowed_roles)
 
     def wrapper(fn):
         @wraps(fn)
@@ -20,68 +25,39 @@ def role_required(*roles):
                 return '', 200
 
             try:
-                jwt_verified = False
-                claims = None
-                identity = None
-
-                # 1️⃣ Try JWT from Authorization Header
-                try:
-                    verify_jwt_in_request()
-                    claims = get_jwt()
-                    identity = get_jwt_identity()
-                    jwt_verified = True
-                except Exception:
-                    pass
-
-                # 2️⃣ Try JWT from Cookie
-                if not jwt_verified:
-                    try:
-                        verify_jwt_in_request(locations=["cookies"])
-                        claims = get_jwt()
-                        identity = get_jwt_identity()
-                        jwt_verified = True
-                    except Exception:
-                        pass
-
-                # 3️⃣ Try JWT from URL Query (?access_token=...)
-                if not jwt_verified:
-                    access_token = request.args.get("access_token")
-                    if access_token:
-                        try:
-                            claims = decode_token(access_token)
-                            identity = claims.get("sub")
-                            jwt_verified = True
-                        except Exception as e:
-                            logging.error(f"Failed to decode query token: {e}")
-
-                if not jwt_verified:
-                    return jsonify({"error": "Missing or invalid JWT"}), 401
-
-                logging.info(f"JWT claims: {claims}, identity: {identity}")
+                verify_jwt_in_request(locations=TOKEN_LOCATIONS)
+            except Exception as e:
+                logging.debug(f"JWT verification failed: {e}")
+                return jsonify({"error": "Missing or invalid JWT"}), 401
 
+            try:
+                claims = get_jwt()
+                identity = get_jwt_identity()
                 token_role = claims.get("role")
-                logging.info(f"Token role: {token_role}, Allowed roles: {allowed_roles}")
 
-                # ✅ Check role from token
-                if token_role and token_role in allowed_roles:
-                    return fn(*args, **kwargs)
+                # Role and active flag come from the access cache, so demotions and
+                # deactivations apply without waiting for the token to expire.
+                try:
+                    access = get_user_access(identity)
+                except (TypeError, ValueError):
+                    access = (token_role, True) if token_role else None  # non-numeric identity
 
-                # ✅ Fallback to DB lookup if needed
-                if not identity:
+                if access is None:
                     return jsonify({"error": "Token identity missing"}), 401
 
-                user = User.query.get(int(identity))
-                db_role = user.role if user else None
-                logging.info(f"DB role: {db_role}")
+                role, is_active = access
+                if not is_active:
+                    return jsonify({"error": "Account is deactivated"}), 403
 
-                if db_role in allowed_roles:
+                if role in allowed:
                     return fn(*args, **kwargs)
 
                 # ❌ Unauthorized role
+                logging.debug(f"Role '{role}' not in {allowed_roles} for user {identity}")
                 return jsonify({
                     "error": "Unauthorized access",
                     "required_roles": allowed_roles,
-                    "your_role": token_role or db_role
+                    "your_role": role
                 }), 403
 
             except Exception as e:
@@ -1,16 +1,22 @@
 # app/utils/helpers.py
 
+import base64
+import json
+from datetime import datetime
 from flask import current_app
 from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.orm import undefer_group
 from app.models import Candidate, User
 from app.extensions import db
 
 # ------------------ Candidate Helpers ------------------
 
-def get_current_candidate(auto_create: bool = True) -> Candidate:
+def get_current_candidate(auto_create: bool = True, full: bool = False) -> Candidate:
     """
     Returns the Candidate object associated with the current JWT identity.
     If auto_create=True, will create a Candidate for a user if missing.
+    If full=True, the deferred large columns (cv_text, cover_letter, documents,
+    profile) are loaded by the same query, for callers that serialise them.
     """
     user_id = get_jwt_identity()
     if not user_id:
@@ -22,7 +28,8 @@ def get_current_candidate(auto_create: bool = True) -> Candidate:
         current_app.logger.error(f"User not found for id {user_id}")
         return None
 
-    candidate = Candidate.query.filter_by(user_id=user.id).first()
+    query = Candidate.query.options(undefer_group("large")) if full else Candidate.query
+    candidate = query.filter_by(user_id=user.id).first()
 
     if not candidate and auto_create:
         # Auto-create Candidate row for admins, hiring_managers, or missing candidates
@@ -65,3 +72,37 @@ def update_object_from_dict(obj, data: dict):
     for key, value in data.items():
         if hasattr(obj, key):
             setattr(obj, key, value)
+
+
+# ------------------ Keyset Pagination ------------------
+
+def encode_cursor(*values) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque cursor.
+    Datetimes are stored as ISO strings; everything else is stored as-is.
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str, *types):
+    """
+    Decode a cursor produced by encode_cursor, converting each value to the
+    matching entry in `types` (datetime values are parsed from ISO strings).
+    Raises ValueError for malformed cursors.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+
+    try:
+        return tuple(
+            datetime.fromisoformat(v) if t is datetime else t(v)
+            for v, t in zip(values, types)
+        )
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,218 @@
+# utils/listing.py
+import json
+from collections import namedtuple
+from datetime import date, datetime
+
+from flask import current_app, jsonify, request
+from sqlalchemy import text, tuple_
+from sqlalchemy.orm import load_only
+from app.extensions import db
+from app.utils.helper import encode_cursor, decode_cursor
+
+
+class ListError(ValueError):
+    """Bad list parameters (unknown field/sort/filter value, malformed cursor); answer 400."""
+
+
+class Field:
+    """
+    One selectable output field. `columns` are the model attributes it needs
+    (loaded with load_only); `get` turns a row into the value (defaults to the
+    first column, with dates as ISO strings).
+    """
+
+    def __init__(self, *columns, get=None):
+        self.columns = columns
+        self.get = get
+
+    def value(self, obj, name):
+        if self.get is not None:
+            return self.get(obj)
+        value = getattr(obj, self.columns[0] if self.columns else name)
+        return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+class ListSpec:
+    """
+    Declarative description of a list endpoint.
+
+    fields          name -> Field (or None for a plain column of that name)
+    default_fields  returned when the client sends no ?fields=
+    sorts           name -> (SQL expression, python type of its values); must
+                    be non-null and should be backed by an index ending in id
+    filters         name -> callable(raw query-string value) -> SQL clause
+    """
+
+    def __init__(self, model, fields, default_fields=None, sorts=None, default_sort="-id", filters=None):
+        self.model = model
+        self.fields = {name: field or Field(name) for name, field in fields.items()}
+        self.default_fields = tuple(default_fields or self.fields)
+        self.sorts = {"id": (model.id, int), **(sorts or {})}
+        self.default_sort = default_sort
+        self.filters = filters or {}
+
+
+ListPage = namedtuple("ListPage", "items next_cursor total total_is_estimate")
+
+
+def run_list(spec: ListSpec, query=None, args=None) -> ListPage:
+    """
+    One keyset page of `query` (default: every row of spec.model) as dicts.
+
+    Query parameters: limit, cursor, sort (name or -name), fields (comma
+    separated), count (estimate | exact | none) and any of spec.filters.
+    """
+    args = request.args if args is None else args
+    model = spec.model
+    query = query if query is not None else model.query
+
+    limit = parse_limit(args)
+
+    # ----- Projection -----
+    requested = [f.strip() for f in args.get("fields", "").split(",") if f.strip()]
+    unknown = [f for f in requested if f not in spec.fields]
+    if unknown:
+        raise ListError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(spec.fields)}")
+    names = requested or list(spec.default_fields)
+
+    # ----- Filters -----
+    filtered = False
+    for name, clause in spec.filters.items():
+        raw = args.get(name)
+        if raw in (None, ""):
+            continue
+        try:
+            query = query.filter(clause(raw))
+        except (TypeError, ValueError):
+            raise ListError(f"Invalid value for {name}: {raw!r}")
+        filtered = True
+
+    total, estimated = count_rows(query, model, filtered, args.get("count", "estimate"))
+
+    # ----- Keyset order -----
+    sort = args.get("sort", spec.default_sort)
+    descending = sort.startswith("-")
+    sort_name = sort.lstrip("-")
+    if sort_name not in spec.sorts:
+        raise ListError(f"Unknown sort: {sort_name}. Available: {', '.join(spec.sorts)}")
+    sort_expr, sort_type = spec.sorts[sort_name]
+
+    cursor = parse_cursor(args, sort_type, int)
+    if cursor:
+        last_value, last_id = cursor
+        key = tuple_(sort_expr, model.id)
+        query = query.filter(key < (last_value, last_id) if descending else key > (last_value, last_id))
+
+    order = (sort_expr.desc(), model.id.desc()) if descending else (sort_expr.asc(), model.id.asc())
+    columns = {"id"} | {c for name in names for c in spec.fields[name].columns}
+    rows = (
+        query.options(load_only(*(getattr(model, c) for c in columns)))
+        .add_columns(sort_expr.label("_sort_key"))
+        .order_by(*order)
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        last, last_key = rows[limit - 1]
+        next_cursor = encode_cursor(last_key, last.id)
+
+    items = [{name: spec.fields[name].value(obj, name) for name in names} for obj, _ in rows[:limit]]
+    return ListPage(items, next_cursor, total, estimated)
+
+
+# ------------------- Paging parameters -------------------
+# Shared with list endpoints that build their own query (e.g. joined
+# projections run_list can't express), so limits and cursor errors match.
+def parse_limit(args):
+    """?limit= clamped to 1..LIST_MAX_LIMIT, LIST_DEFAULT_LIMIT when absent."""
+    default_limit = current_app.config.get("LIST_DEFAULT_LIMIT", 100)
+    max_limit = current_app.config.get("LIST_MAX_LIMIT", 500)
+    try:
+        return max(1, min(int(args.get("limit", default_limit)), max_limit))
+    except (TypeError, ValueError):
+        raise ListError("limit must be an integer")
+
+
+def parse_cursor(args, *types):
+    """Decoded ?cursor= values (one per type), or None when absent."""
+    if not args.get("cursor"):
+        return None
+    try:
+        return decode_cursor(args["cursor"], *types)
+    except ValueError:
+        raise ListError("Invalid cursor")
+
+
+def list_response(page: ListPage, envelope=None):
+    """
+    JSON response for a page. Without `envelope` the body stays a plain list
+    and paging info goes in X-Next-Cursor / X-Total-Count headers; with it the
+    items are returned under that key alongside total and next_cursor.
+    """
+    if envelope:
+        response = jsonify({
+            envelope: page.items,
+            "total": page.total,
+            "total_is_estimate": page.total_is_estimate,
+            "next_cursor": page.next_cursor,
+        })
+    else:
+        response = jsonify(page.items)
+
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+        response.headers["X-Total-Count-Estimated"] = "true" if page.total_is_estimate else "false"
+    return response
+
+
+# ------------------- Counting -------------------
+def count_rows(query, model, filtered, mode):
+    """
+    Row count for the list. Large tables get the planner's estimate (table
+    statistics when unfiltered, EXPLAIN otherwise) instead of a full count;
+    anything under LIST_EXACT_COUNT_BELOW rows is counted exactly.
+    """
+    if mode == "none":
+        return None, False
+    if mode == "exact":
+        return query.order_by(None).count(), False
+
+    if filtered:
+        estimate = _explain_rows(query)
+    else:
+        estimate = db.session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": model.__tablename__}
+        ).scalar()
+
+    if estimate is None or estimate < current_app.config.get("LIST_EXACT_COUNT_BELOW", 1000):
+        return query.order_by(None).count(), False
+    return int(estimate), True
+
+
+def _explain_rows(query):
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    plan = db.session.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+# ------------------- Filter value parsers -------------------
+def parse_bool(raw):
+    value = str(raw).strip().lower()
+    if value in ("1", "true", "yes"):
+        return True
+    if value in ("0", "false", "no"):
+        return False
+    raise ValueError(raw)
+
+
+def parse_datetime(raw):
+    return datetime.fromisoformat(raw)
@@ -0,0 +1,47 @@
+# utils/loaders.py
+from sqlalchemy.orm import contains_eager, joinedload
+from app.models import Application, AssessmentResult, Candidate, Interview, Meeting
+
+# Loader options per serialisation context: pass them to the query that
+# produces the rows, e.g. Meeting.query.options(*MEETING_DICT). Each tuple
+# covers every relationship its serialiser touches, so a page of N rows costs
+# the same number of queries as a page of one. All of these are many-to-one,
+# so joinedload adds columns to the same SELECT instead of extra round trips.
+
+# Interview.to_dict(): candidate (+ user for the email) and hiring manager
+INTERVIEW_DICT = (
+    joinedload(Interview.candidate).joinedload(Candidate.user),
+    joinedload(Interview.hiring_manager),
+)
+
+# Interview list rows: candidate name / picture and the job title
+INTERVIEW_ROW = (
+    joinedload(Interview.candidate),
+    joinedload(Interview.application).joinedload(Application.requisition),
+)
+
+# Same as INTERVIEW_ROW for queries that already join candidate, hiring_manager
+# and application themselves (to filter on them): fill the relationships
+# from those joins instead of joining again.
+INTERVIEW_ROW_JOINED = (
+    contains_eager(Interview.candidate),
+    contains_eager(Interview.hiring_manager),
+    contains_eager(Interview.application).joinedload(Application.requisition),
+)
+
+# Meeting.to_dict(): organizer
+MEETING_DICT = (
+    joinedload(Meeting.organizer),
+)
+
+# Activity feed lines: candidate user's profile for the name, job title
+APPLICATION_ACTIVITY = (
+    joinedload(Application.candidate).joinedload(Candidate.user),
+    joinedload(Application.requisition),
+)
+INTERVIEW_ACTIVITY = (
+    joinedload(Interview.candidate).joinedload(Candidate.user),
+)
+ASSESSMENT_ACTIVITY = (
+    joinedload(AssessmentResult.application).joinedload(Application.candidate).joinedload(Candidate.user),
+)
@@ -0,0 +1,143 @@
+# utils/memory_store.py
+import fnmatch
+import threading
+import time
+
+
+class MemoryRedis:
+    """
+    Minimal in-process stand-in for the subset of the redis-py client used by
+    this app (strings, counters, TTLs and pipelines). Selected with
+    REDIS_URL=memory:// for local development and tests; values are only
+    shared within a single process.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._expiry = {}
+        self._lock = threading.RLock()
+
+    # ------------------- Internals -------------------
+    def _purge(self, key):
+        expires = self._expiry.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+
+    def _live(self, key):
+        self._purge(key)
+        return key in self._data
+
+    # ------------------- Keys -------------------
+    def ping(self):
+        return True
+
+    def get(self, key):
+        with self._lock:
+            return self._data.get(key) if self._live(key) else None
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        with self._lock:
+            if nx and self._live(key):
+                return None
+            self._data[key] = str(value)
+            self._expiry.pop(key, None)
+            if ex is not None:
+                self.expire(key, ex)
+            elif px is not None:
+                self._expiry[key] = time.monotonic() + px / 1000.0
+            return True
+
+    def setex(self, key, seconds, value):
+        return self.set(key, value, ex=seconds)
+
+    def delete(self, *keys):
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._live(key):
+                    removed += 1
+                self._data.pop(key, None)
+                self._expiry.pop(key, None)
+            return removed
+
+    def exists(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._live(key))
+
+    def expire(self, key, seconds):
+        with self._lock:
+            if not self._live(key):
+                return False
+            self._expiry[key] = time.monotonic() + seconds
+            return True
+
+    def ttl(self, key):
+        with self._lock:
+            if not self._live(key):
+                return -2
+            expires = self._expiry.get(key)
+            if expires is None:
+                return -1
+            return max(0, int(round(expires - time.monotonic())))
+
+    def keys(self, pattern="*"):
+        with self._lock:
+            return [k for k in list(self._data) if self._live(k) and fnmatch.fnmatchcase(k, pattern)]
+
+    # ------------------- Counters -------------------
+    def incrby(self, key, amount=1):
+        with self._lock:
+            value = int(self._data.get(key, 0)) + amount if self._live(key) else amount
+            self._data[key] = str(value)
+            return value
+
+    def incr(self, key, amount=1):
+        return self.incrby(key, amount)
+
+    def decrby(self, key, amount=1):
+        return self.incrby(key, -amount)
+
+    def decr(self, key, amount=1):
+        return self.incrby(key, -amount)
+
+    # ------------------- Pipelines -------------------
+    def pipeline(self, transaction=True):
+        return _MemoryPipeline(self)
+
+
+class _MemoryPipeline:
+    """Buffers commands and runs them under the store lock on execute()."""
+
+    def __init__(self, store):
+        self._store = store
+        self._commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self._store, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        with self._store._lock:
+            results = [method(*args, **kwargs) for method, args, kwargs in self._commands]
+        self._commands = []
+        return results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._commands = []
+
+
+def make_redis_client(url):
+    """Return a redis-py client for `url`, or a MemoryRedis for memory://."""
+    if not url or url.startswith("memory://"):
+        return MemoryRedis()
+
+    import redis
+    return redis.Redis.from_url(url, decode_responses=True)
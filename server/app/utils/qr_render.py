@@ -0,0 +1,62 @@
+# utils/qr_render.py
+import base64
+import struct
+import zlib
+
+import qrcode
+from qrcode.constants import ERROR_CORRECT_M
+
+
+def qr_matrix(data, border=4):
+    """QR modules for `data` as rows of booleans (True = dark), quiet zone included."""
+    qr = qrcode.QRCode(error_correction=ERROR_CORRECT_M, border=border)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def _png_chunk(kind, payload):
+    return struct.pack(">I", len(payload)) + kind + payload + struct.pack(">I", zlib.crc32(kind + payload) & 0xFFFFFFFF)
+
+
+def render_png(matrix, scale=6):
+    """
+    1-bit greyscale PNG, written directly with zlib (no PIL). A typical
+    provisioning URI comes out under 1 KB.
+    """
+    size = len(matrix) * scale
+    rows = []
+    for modules in matrix:
+        bits = "".join(("0" if dark else "1") * scale for dark in modules)
+        bits += "1" * (-len(bits) % 8)
+        row = b"\x00" + int(bits, 2).to_bytes(len(bits) // 8, "big")
+        rows.extend([row] * scale)
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 1, 0, 0, 0, 0))
+        + _png_chunk(b"IDAT", zlib.compress(b"".join(rows), 9))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+def render_svg(matrix):
+    """Scalable SVG with one path of 1x1 squares per dark module."""
+    size = len(matrix)
+    path = "".join(
+        f"M{x} {y}h1v1h-1z"
+        for y, modules in enumerate(matrix)
+        for x, dark in enumerate(modules) if dark
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/><path d="{path}" fill="#000"/></svg>'
+    )
+
+
+def png_data_uri(data, scale=6):
+    return "data:image/png;base64," + base64.b64encode(render_png(qr_matrix(data), scale)).decode()
+
+
+def svg_data_uri(data):
+    return "data:image/svg+xml;base64," + base64.b64encode(render_svg(qr_matrix(data)).encode()).decode()
@@ -0,0 +1,145 @@
+# utils/query_budget.py
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Counters active in the current context; every statement is added to each
+_counters = ContextVar("query_counters", default=())
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view or block ran more SQL statements than its budget allows."""
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    for counter in _counters.get():
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements run inside the block (nested counters each see them)."""
+    counter = QueryCounter()
+    token = _counters.set(_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _counters.reset(token)
+
+
+@contextmanager
+def assert_max_queries(max_queries, label="block"):
+    """
+    Raise QueryBudgetExceeded if the block runs more than `max_queries`
+    statements, listing the ones it ran. For tests:
+
+        with assert_max_queries(3):
+            client.get("/api/admin/interviews/all", headers=auth)
+    """
+    with count_queries() as counter:
+        yield counter
+    if counter.count > max_queries:
+        raise QueryBudgetExceeded(_describe(label, counter, max_queries))
+
+
+def query_budget(max_queries):
+    """
+    Declare the most SQL statements a view may run, auth checks included
+    (put it directly under the route decorator). Overruns are logged; with
+    QUERY_BUDGET_STRICT they raise QueryBudgetExceeded, so any test or CI
+    request that hits the endpoint fails (flask check-query-budgets calls
+    every budgeted route that way). Statements run while a streamed
+    body is sent, after the view has returned, are not counted.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            with count_queries() as counter:
+                response = fn(*args, **kwargs)
+            if counter.count > max_queries:
+                message = _describe(fn.__name__, counter, max_queries)
+                if current_app.config.get("QUERY_BUDGET_STRICT"):
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+
+        decorator.query_budget = max_queries
+        return decorator
+    return wrapper
+
+
+def _describe(label, counter, max_queries):
+    statements = "\n".join(f"  {' '.join(s.split())[:200]}" for s in counter.statements)
+    return f"{label} ran {counter.count} queries (budget {max_queries}):\n{statements}"
+
+
+@click.command("check-query-budgets")
+@click.option("--user-id", type=int, default=None, help="User to call the routes as (default: first admin).")
+@with_appcontext
+def check_query_budgets_command(user_id):
+    """
+    Call every GET route that declares a @query_budget (and takes no URL
+    parameters) with QUERY_BUDGET_STRICT on, and exit non-zero if any of them
+    overruns its budget or fails. Run it in CI against a seeded database.
+    """
+    from flask_jwt_extended import create_access_token
+    from app.models import User
+
+    app = current_app._get_current_object()
+    user = User.query.get(user_id) if user_id else User.query.filter_by(role="admin").first()
+    if not user:
+        raise click.ClickException("No user to call the routes as")
+    headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.id), additional_claims={'role': user.role})}"}
+
+    budgeted = []
+    for rule in app.url_map.iter_rules():
+        budget = getattr(app.view_functions.get(rule.endpoint), "query_budget", None)
+        if budget is None or "GET" not in rule.methods:
+            continue
+        if rule.arguments:
+            click.echo(f"skip  {rule.rule} (needs URL parameters)")
+            continue
+        budgeted.append((rule.rule, budget))
+
+    strict, propagate = app.config.get("QUERY_BUDGET_STRICT"), app.config.get("PROPAGATE_EXCEPTIONS")
+    app.config.update(QUERY_BUDGET_STRICT=True, PROPAGATE_EXCEPTIONS=True)
+    failures = 0
+    try:
+        client = app.test_client()
+        for path, budget in sorted(budgeted):
+            with count_queries() as counter:
+                try:
+                    response = client.get(path, headers=headers)
+                except QueryBudgetExceeded as e:
+                    failures += 1
+                    click.echo(f"FAIL  {path}\n{e}")
+                    continue
+            if response.status_code >= 400:
+                failures += 1
+                click.echo(f"FAIL  {path} returned {response.status_code}")
+            else:
+                click.echo(f"ok    {path} ({counter.count} queries, budget {budget})")
+    finally:
+        app.config.update(QUERY_BUDGET_STRICT=strict, PROPAGATE_EXCEPTIONS=propagate)
+
+    if failures:
+        raise click.ClickException(f"{failures} of {len(budgeted)} budgeted routes failed")
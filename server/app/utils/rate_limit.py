@@ -0,0 +1,37 @@
+# utils/rate_limit.py
+from flask import current_app, request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_limiter.util import get_remote_address
+
+
+# ------------------- Key functions -------------------
+def ip_key():
+    """Client address (the limiter's default key)."""
+    return f"ip:{get_remote_address()}"
+
+
+def email_key():
+    """
+    The account email being acted on (login, register, reset...), so one
+    account cannot be hammered from many addresses. Falls back to the IP.
+    """
+    data = request.get_json(silent=True) or {}
+    email = data.get("email") or request.form.get("email")
+    if isinstance(email, str) and email.strip():
+        return f"email:{email.strip().lower()}"
+    return ip_key()
+
+
+def identity_key():
+    """The authenticated user (JWT identity); anonymous callers are keyed by IP."""
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        identity = None
+    return f"user:{identity}" if identity else ip_key()
+
+
+def configured(name, default):
+    """Limit string read from config at request time, e.g. configured("RATELIMIT_AI_CHAT", "20 per minute")."""
+    return lambda: current_app.config.get(name, default)
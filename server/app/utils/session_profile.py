@@ -0,0 +1,142 @@
+# utils/session_profile.py
+import hashlib
+import json
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session, load_only
+from app.extensions import db, redis_client
+from app.models import User, Candidate
+
+# Columns served by /api/auth/me. Large columns (cv_text, documents, profile,
+# cover_letter and the structured CV sections) are left out on purpose.
+USER_FIELDS = ("id", "email", "role", "enrollment_completed", "created_at", "profile")
+CANDIDATE_FIELDS = (
+    "id", "user_id", "full_name", "phone", "title", "location", "profile_picture",
+    "portfolio", "linkedin", "github", "cv_url", "cv_score",
+    "dark_mode", "notifications_email", "notifications_push",
+)
+
+# session:profile:<generation>:<user_id> -> JSON {"user": {...}, "candidate_profile": {...} | null}
+# Kept in Redis so one invalidation reaches every worker. Dropping everyone's
+# profile bumps the generation (one INCR); entries of older generations are
+# no longer read and expire with their TTL.
+KEY_PREFIX = "session:profile:"
+GENERATION_KEY = "session:profile:generation"
+
+
+def _key(user_id):
+    generation = redis_client.get(GENERATION_KEY) or 0
+    return f"{KEY_PREFIX}{generation}:{int(user_id)}"
+
+
+def _load(user_id):
+    user = User.query.options(load_only(*(getattr(User, f) for f in USER_FIELDS))).get(user_id)
+    if user is None:
+        return None
+
+    row = db.session.query(*(getattr(Candidate, f) for f in CANDIDATE_FIELDS))\
+        .filter(Candidate.user_id == user_id).first()
+
+    return {
+        "user": {
+            "id": user.id,
+            "email": user.email,
+            "role": user.role,
+            "enrollment_completed": user.enrollment_completed,
+            "created_at": user.created_at.isoformat() if user.created_at else None,
+            "profile": user.profile or {},
+        },
+        "candidate_profile": dict(row._mapping) if row is not None else None,
+    }
+
+
+def get_session_profile(user_id):
+    """
+    Compact profile for the signed-in user, or None if the user does not exist.
+    Cached in Redis for SESSION_PROFILE_CACHE_TTL seconds and deleted when the
+    user's User or Candidate row is committed, so every worker sees the change
+    on its next request.
+    """
+    key = _key(user_id)
+    cached = redis_client.get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    profile = _load(int(user_id))
+    if profile is not None:
+        redis_client.set(
+            key,
+            json.dumps(profile, default=str),
+            ex=current_app.config.get("SESSION_PROFILE_CACHE_TTL", 300)
+        )
+    return profile
+
+
+def project(payload, fields):
+    """
+    Keep only the requested keys. `fields` is a list of top-level keys
+    ("role", "user") or dotted keys ("user.email", "candidate_profile.full_name").
+    """
+    if not fields:
+        return payload
+
+    result = {}
+    for field in fields:
+        section, _, key = field.partition(".")
+        if section not in payload:
+            continue
+        if not key:
+            result[section] = payload[section]
+        elif isinstance(payload[section], dict) and key in payload[section]:
+            result.setdefault(section, {})[key] = payload[section][key]
+    return result
+
+
+def etag_for(payload):
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+
+def invalidate_session_profile(user_id=None):
+    """
+    Drop one user's cached profile (or everyone's when user_id is None).
+    Writes that bypass the ORM hooks below (bulk query.update(), raw SQL)
+    must call this for the users they touch.
+    """
+    if user_id is None:
+        redis_client.incr(GENERATION_KEY)
+    else:
+        redis_client.delete(_key(user_id))
+
+
+# ------------------- Invalidation hooks -------------------
+# Profile and settings writes go through the User / Candidate rows; once the
+# transaction commits the owner's cached profile is deleted from Redis.
+def _mark_user(mapper, connection, target):
+    _mark(target, target.id)
+
+
+def _mark_candidate(mapper, connection, target):
+    _mark(target, target.user_id)
+
+
+def _mark(target, user_id):
+    session = object_session(target)
+    if session is not None and user_id is not None:
+        session.info.setdefault("session_profile_changed", set()).add(user_id)
+
+
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop("session_profile_changed", ()):
+        invalidate_session_profile(user_id)
+
+
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop("session_profile_changed", None)
+
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(User, _event, _mark_user)
+    event.listen(Candidate, _event, _mark_candidate)
+event.listen(Session, "after_commit", _invalidate_after_commit)
+event.listen(Session, "after_soft_rollback", _discard_after_rollback)
@@ -0,0 +1,119 @@
+# utils/smtp_sink.py
+import socketserver
+import threading
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib to deliver a message."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        sink = self.server.sink
+        envelope = {"mail_from": None, "rcpt_tos": []}
+        self.reply("220 localhost SMTP sink ready")
+
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            command = line[:4].upper()
+
+            if command == "EHLO":
+                self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+            elif command == "HELO":
+                self.reply("250 localhost")
+            elif command == "AUTH":
+                self.reply("235 Authentication successful")
+            elif command == "MAIL":
+                envelope = {"mail_from": line.split(":", 1)[1].strip().strip("<>"), "rcpt_tos": []}
+                self.reply("250 OK")
+            elif command == "RCPT":
+                envelope["rcpt_tos"].append(line.split(":", 1)[1].strip().strip("<>"))
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b".\r\n", b".\n"):
+                        break
+                    data.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                sink.record(envelope["mail_from"], envelope["rcpt_tos"], b"".join(data))
+                envelope = {"mail_from": None, "rcpt_tos": []}
+                self.reply("250 OK: queued")
+            elif command == "RSET":
+                envelope = {"mail_from": None, "rcpt_tos": []}
+                self.reply("250 OK")
+            elif command == "NOOP":
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _ThreadingSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    """
+    Local SMTP server that accepts every message and keeps it in memory.
+    Point MAIL_SERVER/MAIL_PORT at it (with MAIL_USE_TLS=false) in tests and
+    local development to exercise the real SMTP path without a provider.
+
+        with SMTPSink(port=0) as sink:
+            app.config.update(MAIL_SERVER=sink.host, MAIL_PORT=sink.port)
+            ...
+            assert sink.messages[0]["rcpt_tos"] == ["a@example.com"]
+    """
+
+    def __init__(self, host="127.0.0.1", port=1025, on_message=None):
+        self.host = host
+        self.port = port
+        self.on_message = on_message
+        self.messages = []
+        self.connections = 0
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def record(self, mail_from, rcpt_tos, data):
+        message = {"mail_from": mail_from, "rcpt_tos": list(rcpt_tos), "data": data}
+        with self._lock:
+            self.messages.append(message)
+        if self.on_message:
+            self.on_message(message)
+
+    def start(self):
+        sink = self
+
+        class Handler(_SMTPHandler):
+            def setup(self):
+                super().setup()
+                with sink._lock:
+                    sink.connections += 1
+
+        self._server = _ThreadingSMTPServer((self.host, self.port), Handler)
+        self._server.sink = self
+        self.port = self._server.server_address[1]  # resolves port=0
+        self._thread = threading.Thread(target=self._server.serve_forever, name="smtp-sink", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,130 @@
+# utils/stub_idp.py
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from authlib.jose import JsonWebKey, jwt
+
+
+class _IdPHandler(BaseHTTPRequestHandler):
+    """Serves the discovery document and JWKS of the owning StubIdP."""
+
+    def do_GET(self):
+        idp = self.server.idp
+        path = self.path.split("?", 1)[0]
+        idp.record(path)
+
+        if idp.delay:
+            time.sleep(idp.delay)
+        if idp.fail:
+            return self.send_json(503, {"error": "unavailable"})
+
+        if path == "/.well-known/openid-configuration":
+            return self.send_json(200, idp.discovery())
+        if path == "/jwks":
+            return self.send_json(200, idp.jwks())
+        self.send_json(404, {"error": "not found"})
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubIdP:
+    """
+    Local stand-in OpenID provider for tests and development. Serves
+    /.well-known/openid-configuration and /jwks from memory and signs ID
+    tokens with its current key.
+
+        with StubIdP(port=0) as idp:
+            app.config["SSO_METADATA_URL"] = idp.metadata_url
+            token = idp.issue_id_token({"sub": "1", "email": "a@example.com", "aud": "client"})
+            idp.rotate_key()            # next token has a kid the cache has not seen
+            idp.fail = True             # discovery/JWKS now answer 503
+            assert idp.requests["/jwks"] == 1
+    """
+
+    def __init__(self, host="127.0.0.1", port=8089, delay=0.0):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.fail = False
+        self.requests = {}
+        self._keys = []
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.rotate_key()
+
+    @property
+    def issuer(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def metadata_url(self):
+        return f"{self.issuer}/.well-known/openid-configuration"
+
+    def record(self, path):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def discovery(self):
+        return {
+            "issuer": self.issuer,
+            "authorization_endpoint": f"{self.issuer}/authorize",
+            "token_endpoint": f"{self.issuer}/token",
+            "userinfo_endpoint": f"{self.issuer}/userinfo",
+            "end_session_endpoint": f"{self.issuer}/logout",
+            "jwks_uri": f"{self.issuer}/jwks",
+            "id_token_signing_alg_values_supported": ["RS256"],
+        }
+
+    def jwks(self):
+        with self._lock:
+            return {"keys": [key.as_dict(is_private=False) for key in self._keys]}
+
+    def rotate_key(self, keep_old=True):
+        """Add a new signing key (the old one stays published unless keep_old=False)."""
+        key = JsonWebKey.generate_key("RSA", 2048, is_private=True,
+                                      options={"kid": uuid.uuid4().hex, "use": "sig", "alg": "RS256"})
+        with self._lock:
+            self._keys = (self._keys if keep_old else []) + [key]
+        return key.kid
+
+    def issue_id_token(self, claims, expires_in=300):
+        with self._lock:
+            key = self._keys[-1]
+        now = int(time.time())
+        payload = {"iss": self.issuer, "iat": now, "exp": now + expires_in, **claims}
+        header = {"alg": "RS256", "kid": key.kid}
+        return jwt.encode(header, payload, key).decode()
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _IdPHandler)
+        self._server.daemon_threads = True
+        self._server.idp = self
+        self.port = self._server.server_address[1]  # resolves port=0
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-idp", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
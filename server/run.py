@@ -1,5 +1,5 @@
 from app import create_app
-from app.extensions import db
+from app.extensions import db, socketio
 
 app = create_app()
 
@@ -7,4 +7,4 @@ with app.app_context():
     db.create_all()
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    socketio.run(app, host="0.0.0.0", port=5000, debug=True)